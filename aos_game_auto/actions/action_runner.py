@@ -2,10 +2,13 @@ import logging
 import shutil
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+
+import cv2
 
 from adb.adb_controller import AdbController
-from vision.image_matcher import MatchResult
+from adb.gesture_script import GestureScript
+from vision.image_matcher import ImageMatcher, MatchResult
 
 
 class ActionResult:
@@ -19,12 +22,29 @@ class ActionResult:
 class ActionRunner:
     """Executes configured actions using ADB and the current match result."""
 
-    def __init__(self, adb: AdbController, screenshots_dir: Path):
+    def __init__(
+        self,
+        adb: AdbController,
+        screenshots_dir: Path,
+        matcher: Optional[ImageMatcher] = None,
+        base_dir: Optional[Path] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
         self.adb = adb
         self.screenshots_dir = screenshots_dir
+        self.matcher = matcher
+        self.base_dir = base_dir or Path.cwd()
+        self.sleep = sleep
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def run(self, action: Dict[str, Any], match: MatchResult, current_screenshot: Path, iteration: int) -> ActionResult:
+    def run(
+        self,
+        action: Dict[str, Any],
+        match: MatchResult,
+        current_screenshot: Path,
+        iteration: int,
+        screenshot_image: Any = None,
+    ) -> ActionResult:
         action_type = action.get("type", "tap")
         self.logger.info("Running action '%s'", action_type)
 
@@ -34,50 +54,76 @@ class ActionRunner:
             self.adb.tap(x, y)
             wait_seconds = float(action.get("seconds", 0))
             if wait_seconds > 0:
-                time.sleep(wait_seconds)
+                self.sleep(wait_seconds)
+            return ActionResult()
+
+        if action_type == "tap_all":
+            matches = [match]
+            if self.matcher is not None:
+                matches = self.matcher.find_all_matches(
+                    current_screenshot,
+                    match.scenario,
+                    self.base_dir,
+                    screenshot_image=screenshot_image,
+                    max_results=int(action.get("max_taps", 20)),
+                    overlap=float(action.get("overlap", 0.3)),
+                ) or [match]
+            if str(action.get("order", "position")).lower() == "position":
+                matches.sort(key=lambda item: (item.center_y, item.center_x))
+            interval = float(action.get("interval_seconds", 0.3))
+            script = GestureScript()
+            for index, target in enumerate(matches):
+                if index:
+                    script.sleep(interval)
+                x = target.center_x + int(action.get("offset_x", 0))
+                y = target.center_y + int(action.get("offset_y", 0))
+                script.tap(x, y)
+            self.adb.run_gesture(script)
+            self.logger.info("Tapped %s match(es) in one pass", len(matches))
+            wait_seconds = float(action.get("seconds", 0))
+            if wait_seconds > 0:
+                self.sleep(wait_seconds)
             return ActionResult()
 
         if action_type == "tap_wait":
             x = match.center_x + int(action.get("offset_x", 0))
             y = match.center_y + int(action.get("offset_y", 0))
             self.adb.tap(x, y)
-            time.sleep(float(action.get("seconds", 1)))
+            self.sleep(float(action.get("seconds", 1)))
             return ActionResult()
 
         if action_type == "tap_text":
             x = match.center_x + int(action.get("offset_x", 0))
             y = match.center_y + int(action.get("offset_y", 0))
-            self.adb.tap(x, y)
-            time.sleep(float(action.get("delay_before_text", 0.3)))
-            self.adb.input_text(str(action.get("text", "")))
+            script = GestureScript().tap(x, y).sleep(float(action.get("delay_before_text", 0.3)))
+            script.text(str(action.get("text", "")))
             if action.get("press_enter", False):
-                self.adb.keyevent("ENTER")
+                script.keyevent("ENTER")
+            self.adb.run_gesture(script)
             wait_seconds = float(action.get("seconds", 0))
             if wait_seconds > 0:
-                time.sleep(wait_seconds)
+                self.sleep(wait_seconds)
             return ActionResult()
 
         if action_type == "tap_swipe":
             x = match.center_x + int(action.get("offset_x", 0))
             y = match.center_y + int(action.get("offset_y", 0))
-            self.adb.tap(x, y)
-            time.sleep(float(action.get("delay_seconds", 0.2)))
+            script = GestureScript().tap(x, y).sleep(float(action.get("delay_seconds", 0.2)))
             distance = int(action.get("distance", 900))
             duration = int(action.get("duration_ms", 500))
             direction = str(action.get("direction", "down")).lower()
             if direction == "up":
-                self.adb.swipe(x, y, x, max(0, y - distance), duration)
+                script.swipe(x, y, x, max(0, y - distance), duration)
             else:
-                self.adb.swipe(x, y, x, y + distance, duration)
+                script.swipe(x, y, x, y + distance, duration)
+            self.adb.run_gesture(script)
             return ActionResult()
 
         if action_type == "double_tap":
             x = match.center_x + int(action.get("offset_x", 0))
             y = match.center_y + int(action.get("offset_y", 0))
             interval = float(action.get("interval_seconds", 0.12))
-            self.adb.tap(x, y)
-            time.sleep(interval)
-            self.adb.tap(x, y)
+            self.adb.run_gesture(GestureScript().tap(x, y).sleep(interval).tap(x, y))
             return ActionResult()
 
         if action_type == "swipe":
@@ -91,24 +137,30 @@ class ActionRunner:
             return ActionResult()
 
         if action_type == "wait":
-            time.sleep(float(action.get("seconds", 1)))
+            self.sleep(float(action.get("seconds", 1)))
             return ActionResult()
 
         if action_type == "save_screenshot":
-            saved_path = self._save_screenshot_copy(current_screenshot, iteration, "manual")
+            saved_path = self._save_screenshot_copy(current_screenshot, iteration, "manual", screenshot_image)
             return ActionResult(saved_screenshot_path=saved_path)
 
         if action_type == "stop":
             return ActionResult(should_stop=True)
 
         if action_type == "stop_and_save":
-            saved_path = self._save_screenshot_copy(current_screenshot, iteration, "stop")
+            saved_path = self._save_screenshot_copy(current_screenshot, iteration, "stop", screenshot_image)
             return ActionResult(should_stop=True, saved_screenshot_path=saved_path)
 
         raise ValueError(f"Unsupported action type: {action_type}")
 
-    def _save_screenshot_copy(self, current_screenshot: Path, iteration: int, reason: str) -> Path:
+    def _save_screenshot_copy(
+        self, current_screenshot: Path, iteration: int, reason: str, screenshot_image: Any = None
+    ) -> Path:
+        """Copy the current screenshot file, or encode the in-memory frame when none was written."""
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
         destination = self.screenshots_dir / f"saved_{reason}_{iteration:04d}_{int(time.time())}.png"
-        shutil.copy2(current_screenshot, destination)
+        if current_screenshot.exists() or screenshot_image is None:
+            shutil.copy2(current_screenshot, destination)
+        elif not cv2.imwrite(str(destination), screenshot_image):
+            raise OSError(f"Could not write screenshot: {destination}")
         return destination
@@ -4,7 +4,22 @@ import subprocess
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from adb.gesture_script import GestureScript, escape_input_text
+from adb.host_protocol import AdbHostClient, AdbProtocolError, AdbServerUnavailable, DeviceTracker
+from adb.raw_screencap import parse_raw_screencap
+from adb.touch_input import (
+    ABS_MT_POSITION_X,
+    ABS_MT_POSITION_Y,
+    SendeventTouch,
+    find_touchscreen,
+    parse_display_rotation,
+    parse_getevent_devices,
+)
 
 
 class AdbError(RuntimeError):
@@ -26,9 +41,9 @@ class Device:
 def parse_adb_devices(output: str) -> List[Device]:
     """Parse `adb devices -l` output into Device objects."""
     devices: List[Device] = []
-    for raw_line in output.splitlines()[1:]:
+    for raw_line in output.splitlines():
         line = raw_line.strip()
-        if not line or line.startswith("*"):
+        if not line or line.startswith("*") or line.startswith("List of devices"):
             continue
 
         parts = line.split()
@@ -48,11 +63,33 @@ def parse_adb_devices(output: str) -> List[Device]:
 class AdbController:
     """Small wrapper around adb commands used by the automation runner."""
 
-    def __init__(self, adb_path: str = "adb", device_id: Optional[str] = None, timeout: int = 15):
+    def __init__(
+        self,
+        adb_path: str = "adb",
+        device_id: Optional[str] = None,
+        timeout: int = 15,
+        persistent_shell: bool = False,
+        native_protocol: bool = False,
+        watch_devices: bool = False,
+        input_backend: str = "input",
+    ):
         self.adb_path = adb_path
         self.device_id = device_id
         self.timeout = timeout
+        self.persistent_shell = persistent_shell
+        self._shell_session = None
+        self._shell_session_device: Optional[str] = None
+        self.native_protocol = native_protocol
+        self._host_client: Optional[AdbHostClient] = None
+        self.watch_devices = watch_devices
+        self._device_tracker: Optional[DeviceTracker] = None
+        self.input_backend = str(input_backend or "input").lower()
+        self._touch: Optional[SendeventTouch] = None
+        self._touch_device: Optional[str] = None
         self.logger = logging.getLogger(self.__class__.__name__)
+        if self.input_backend not in ("input", "sendevent"):
+            self.logger.warning("Unknown input_backend '%s'. Using 'input'.", input_backend)
+            self.input_backend = "input"
 
     def _base_command(self) -> List[str]:
         command = [self.adb_path]
@@ -61,7 +98,7 @@ class AdbController:
         return command
 
     @staticmethod
-    def _startupinfo() -> subprocess.STARTUPINFO | None:
+    def _startupinfo() -> "subprocess.STARTUPINFO | None":
         if not hasattr(subprocess, "STARTUPINFO"):
             return None
         info = subprocess.STARTUPINFO()
@@ -80,26 +117,28 @@ class AdbController:
     ) -> subprocess.CompletedProcess:
         command = self._base_command() + list(args)
         self.logger.debug("Running adb command: %s", " ".join(command))
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=not binary,
-                timeout=timeout or self.timeout,
-                startupinfo=self._startupinfo(),
-                check=False,
-            )
-        except FileNotFoundError as exc:
-            raise AdbError("adb executable was not found. Install Android Platform Tools and add adb to PATH.") from exc
-        except PermissionError as exc:
-            raise AdbError(
-                f"Cannot execute adb path '{self.adb_path}'. "
-                "Make sure this points to adb.exe, not a folder, and that Windows has not blocked the file."
-            ) from exc
-        except subprocess.TimeoutExpired as exc:
-            raise AdbError(f"adb command timed out: {' '.join(command)}") from exc
-        except OSError as exc:
-            raise AdbError(f"Failed to execute adb path '{self.adb_path}': {exc}") from exc
+        result = self._run_native(args, timeout=timeout, binary=binary) if self.native_protocol else None
+        if result is None:
+            try:
+                result = subprocess.run(
+                    command,
+                    capture_output=True,
+                    text=not binary,
+                    timeout=timeout or self.timeout,
+                    startupinfo=self._startupinfo(),
+                    check=False,
+                )
+            except FileNotFoundError as exc:
+                raise AdbError("adb executable was not found. Install Android Platform Tools and add adb to PATH.") from exc
+            except PermissionError as exc:
+                raise AdbError(
+                    f"Cannot execute adb path '{self.adb_path}'. "
+                    "Make sure this points to adb.exe, not a folder, and that Windows has not blocked the file."
+                ) from exc
+            except subprocess.TimeoutExpired as exc:
+                raise AdbError(f"adb command timed out: {' '.join(command)}") from exc
+            except OSError as exc:
+                raise AdbError(f"Failed to execute adb path '{self.adb_path}': {exc}") from exc
 
         if result.returncode != 0:
             stderr = result.stderr if isinstance(result.stderr, str) else result.stderr.decode(errors="replace")
@@ -109,7 +148,8 @@ class AdbController:
                 previous_device_id = self.device_id
                 self.logger.warning("ADB device disappeared. Refreshing device list and retrying once.")
                 self.device_id = None
-                time.sleep(0.5)
+                if self._device_tracker is None:
+                    time.sleep(0.5)
                 self.ensure_device(preferred_device_id=previous_device_id)
                 return self._run_once_with_reconnect(args, timeout=timeout, binary=binary, allow_reconnect=False)
             self.logger.error("ADB command failed: %s", message)
@@ -117,7 +157,114 @@ class AdbController:
 
         return result
 
+    def _native_client(self) -> AdbHostClient:
+        if self._host_client is None:
+            self._host_client = AdbHostClient(timeout=self.timeout)
+        return self._host_client
+
+    def _run_native(
+        self, args: Sequence[str], timeout: Optional[int] = None, binary: bool = False
+    ) -> Optional[subprocess.CompletedProcess]:
+        """Run `shell` and `exec-out` commands over the adb server socket instead of adb.exe.
+
+        Returns None for other commands, or when the adb server is not running yet or drops
+        the connection, so the caller falls back to adb.exe (which also starts the server). Server errors such as
+        `device 'x' not found` come back as a failed result and get the usual reconnect handling.
+        """
+        if not args or args[0] not in ("shell", "exec-out"):
+            return None
+        client = self._native_client()
+        command = " ".join(args[1:])
+        try:
+            if args[0] == "exec-out":
+                returncode = 0
+                stdout = client.exec_out(self.device_id, command, timeout=timeout or self.timeout)
+                stderr = b""
+            else:
+                exit_code, stdout, stderr = client.shell(self.device_id, command, timeout=timeout or self.timeout)
+                returncode = exit_code or 0
+        except AdbServerUnavailable as exc:
+            self.logger.info("%s. Falling back to the adb executable.", exc)
+            return None
+        except AdbProtocolError as exc:
+            returncode, stdout, stderr = 1, b"", str(exc).encode("utf-8")
+        if not binary:
+            return subprocess.CompletedProcess(
+                list(args),
+                returncode,
+                stdout.decode("utf-8", errors="replace").replace("\r\n", "\n"),
+                stderr.decode("utf-8", errors="replace").replace("\r\n", "\n"),
+            )
+        return subprocess.CompletedProcess(list(args), returncode, stdout, stderr)
+
+    def _shell(self, args: Sequence[str], timeout: Optional[int] = None) -> str:
+        """Run a device shell command, through the persistent session when it is enabled.
+
+        adb joins shell arguments with spaces for the device shell, and the session does
+        the same, so quoting behaves identically in both paths. If the session is dead or
+        cannot be written to, the command is retried once as a normal adb call, which keeps
+        the reconnect handling of `_run_once_with_reconnect`. A command that was already
+        sent (no reply in time, or the session ended while running it) is not repeated,
+        because a tap or swipe may have reached the device; the error is raised instead.
+        The next call starts a fresh session.
+        """
+        if not self.persistent_shell:
+            return self._run(["shell", *args], timeout=timeout).stdout
+
+        from adb.shell_session import AdbShellSession, AdbShellSessionError
+
+        try:
+            if self._shell_session is None or not self._shell_session.alive or self._shell_session_device != self.device_id:
+                self._close_shell_session()
+                self._shell_session = AdbShellSession(self._base_command() + ["shell"], startupinfo=self._startupinfo())
+                self._shell_session_device = self.device_id
+            return self._shell_session.run(" ".join(args), timeout or self.timeout)
+        except AdbShellSessionError as exc:
+            self._close_shell_session()
+            if exc.sent:
+                raise
+            self.logger.warning("Persistent adb shell failed: %s. Retrying with a one-shot adb call.", exc)
+            return self._run(["shell", *args], timeout=timeout).stdout
+
+    def _close_shell_session(self) -> None:
+        if self._shell_session is not None:
+            self._shell_session.close()
+            self._shell_session = None
+
+    def close(self) -> None:
+        """Stop the persistent shell session and the device tracker, if running."""
+        self._close_shell_session()
+        if self._device_tracker is not None:
+            self._device_tracker.stop()
+            self._device_tracker = None
+
     def list_device_infos(self) -> List[Device]:
+        return self._device_snapshot()[1]
+
+    def _device_snapshot(self) -> Tuple[Optional[int], List[Device]]:
+        """Return (tracker generation, devices) from the device tracker when watch_devices is on.
+
+        The generation is None when the list came from a one-off `adb devices` query:
+        the tracker is off, has not received its first list yet, or lost the adb server.
+        """
+        if self.watch_devices:
+            if self._device_tracker is None:
+                self._device_tracker = DeviceTracker(self._native_client()).start()
+                self._device_tracker.wait_for_change(0, timeout=1.0)
+            snapshot = self._device_tracker.snapshot()
+            if snapshot is not None:
+                return snapshot[0], parse_adb_devices(snapshot[1])
+        return None, self._query_device_infos()
+
+    def _query_device_infos(self) -> List[Device]:
+        if self.native_protocol:
+            try:
+                return parse_adb_devices(self._native_client().devices())
+            except AdbServerUnavailable as exc:
+                self.logger.info("%s. Falling back to the adb executable.", exc)
+            except AdbProtocolError as exc:
+                raise AdbError(str(exc)) from exc
+
         try:
             result = subprocess.run(
                 [self.adb_path, "devices", "-l"],
@@ -156,7 +303,7 @@ class AdbController:
         target = preferred_device_id or self.device_id
 
         while True:
-            last_devices = self.list_device_infos()
+            generation, last_devices = self._device_snapshot()
             online = [device for device in last_devices if device.state == "device"]
 
             if target:
@@ -186,7 +333,10 @@ class AdbController:
                 raise AdbError(f"No online adb device found. Connected: {connected}")
 
             self.logger.info("Waiting for an online adb device. Current: %s", ", ".join(device.label for device in last_devices) or "none")
-            time.sleep(0.75)
+            if generation is None:
+                time.sleep(0.75)
+            else:
+                self._device_tracker.wait_for_change(generation, max(0.0, deadline - time.time()))
 
     def get_resolution(self) -> Tuple[int, int]:
         result = self._run(["shell", "wm", "size"])
@@ -195,20 +345,67 @@ class AdbController:
             raise AdbError(f"Could not parse device resolution from: {result.stdout.strip()}")
         return int(match.group(1)), int(match.group(2))
 
-    def capture_screen(self, output_path: Path) -> Path:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    def capture_screen(self, output_path: Optional[Path] = None) -> Any:
+        """Capture a PNG screenshot and return it decoded as a BGR array.
+
+        The PNG bytes are written to output_path only when one is given, so callers that
+        just match the frame never touch the disk.
+        """
         last_error = ""
         for attempt in range(1, 4):
             result = self._run(["exec-out", "screencap", "-p"], timeout=30, binary=True)
             data = result.stdout
             if data.startswith(b"\x89PNG\r\n\x1a\n"):
-                output_path.write_bytes(data)
-                return output_path
+                image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is not None:
+                    if output_path is not None:
+                        output_path.parent.mkdir(parents=True, exist_ok=True)
+                        output_path.write_bytes(data)
+                    return image
             last_error = f"invalid PNG data from screencap on attempt {attempt}"
             self.logger.warning("%s", last_error)
             time.sleep(0.3)
         raise AdbError(f"Failed to capture a valid PNG screenshot: {last_error}")
 
+    def capture_frame(self) -> Any:
+        """Capture the screen as a BGR array from raw `screencap` output.
+
+        The device skips PNG encoding and the host skips the file write and PNG decode.
+        Write the array with cv2.imwrite only when the screenshot has to be kept.
+        """
+        last_error = ""
+        for attempt in range(1, 4):
+            result = self._run(["exec-out", "screencap"], timeout=30, binary=True)
+            try:
+                return parse_raw_screencap(result.stdout).to_bgr()
+            except ValueError as exc:
+                last_error = f"{exc} on attempt {attempt}"
+            self.logger.warning("%s", last_error)
+            time.sleep(0.3)
+        raise AdbError(f"Failed to capture a raw screenshot: {last_error}")
+
+    def push(self, local_path: Path, remote_path: str) -> None:
+        self._run(["push", str(local_path), remote_path], timeout=60)
+
+    def forward(self, local: str, remote: str) -> None:
+        self._run(["forward", local, remote])
+
+    def remove_forward(self, local: str) -> None:
+        self._run(["forward", "--remove", local])
+
+    def spawn_shell(self, args: Sequence[str]) -> subprocess.Popen:
+        """Start a long-running device shell command and return without waiting for it."""
+        try:
+            return subprocess.Popen(
+                self._base_command() + ["shell", *args],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                startupinfo=self._startupinfo(),
+            )
+        except OSError as exc:
+            raise AdbError(f"Failed to execute adb path '{self.adb_path}': {exc}") from exc
+
     def list_user_packages(self) -> List[str]:
         """Return sorted third-party package names installed on the device."""
         result = self._run(["shell", "pm", "list", "packages", "-3"], timeout=30)
@@ -236,21 +433,71 @@ class AdbController:
                 return package, activity
         raise AdbError("Could not detect the foreground app from dumpsys window.")
 
+    def discover_touchscreen(self) -> SendeventTouch:
+        """Find the touchscreen node, its axis ranges, and the display rotation for sendevent input."""
+        touchscreen = find_touchscreen(parse_getevent_devices(self._shell(["getevent", "-p"])))
+        if touchscreen is None:
+            raise AdbError("No multi-touch screen found in getevent -p output.")
+        if "writable" not in self._shell([f"test -w {touchscreen.path} && echo writable"]):
+            raise AdbError(f"{touchscreen.path} is not writable by the adb shell user.")
+        natural_size = self.get_resolution()
+        rotation = parse_display_rotation(self._shell(["dumpsys", "input"]))
+        self.logger.info(
+            "sendevent input: %s (%s), x %s..%s, y %s..%s, rotation %s.",
+            touchscreen.path,
+            touchscreen.name or "unnamed",
+            touchscreen.axes[ABS_MT_POSITION_X].minimum,
+            touchscreen.axes[ABS_MT_POSITION_X].maximum,
+            touchscreen.axes[ABS_MT_POSITION_Y].minimum,
+            touchscreen.axes[ABS_MT_POSITION_Y].maximum,
+            rotation * 90,
+        )
+        return SendeventTouch(touchscreen, natural_size, rotation)
+
+    def _sendevent_touch(self) -> Optional[SendeventTouch]:
+        """Return the sendevent renderer when that backend is active, discovering it once per device.
+
+        If discovery fails, input falls back to `input tap/swipe` for the rest of the run.
+        """
+        if self.input_backend != "sendevent":
+            return None
+        if self._touch is None or self._touch_device != self.device_id:
+            try:
+                self._touch = self.discover_touchscreen()
+                self._touch_device = self.device_id
+            except AdbError as exc:
+                self.logger.warning("sendevent input is unavailable: %s Using adb input instead.", exc)
+                self.input_backend = "input"
+                self._touch = None
+                return None
+        return self._touch
+
     def tap(self, x: int, y: int) -> None:
-        self._run(["shell", "input", "tap", str(x), str(y)])
+        touch = self._sendevent_touch()
+        if touch is not None:
+            self._shell([touch.tap(x, y)])
+            return
+        self._shell(["input", "tap", str(x), str(y)])
 
     def input_text(self, text: str) -> None:
         """Type text through adb input. Spaces are escaped for Android input."""
-        escaped = text.replace("\\", "\\\\").replace(" ", "%s")
-        self._run(["shell", "input", "text", escaped])
+        self._shell(["input", "text", escape_input_text(text)])
 
     def keyevent(self, key: str) -> None:
-        self._run(["shell", "input", "keyevent", key])
+        self._shell(["input", "keyevent", key])
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 500) -> None:
-        self._run(
-            ["shell", "input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)]
-        )
+        touch = self._sendevent_touch()
+        if touch is not None:
+            self._shell([touch.swipe(x1, y1, x2, y2, duration_ms)], timeout=self.timeout + duration_ms // 1000 + 1)
+            return
+        self._shell(["input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)])
+
+    def run_gesture(self, script: GestureScript) -> None:
+        """Run every step of the script in one device shell call, with the pauses timed on the device."""
+        if not script:
+            return
+        self._shell([script.to_shell(self._sendevent_touch())], timeout=self.timeout + int(script.duration_seconds + 1))
 
     def start_app(self, package: str, activity: str) -> None:
         component = f"{package}/{activity}"
@@ -0,0 +1,80 @@
+import shlex
+from typing import List, Optional, Tuple
+
+from adb.touch_input import SendeventTouch
+
+
+def escape_input_text(text: str) -> str:
+    """Escape text for `input text`: Android reads `%s` as a space."""
+    return text.replace("\\", "\\\\").replace(" ", "%s")
+
+
+def quote_input_text(text: str) -> str:
+    """Quote text for `input text` inside a shell script.
+
+    Single quotes keep backslashes literal, so only spaces are rewritten, unlike
+    `escape_input_text`, whose doubled backslashes lose one level in the unquoted shell.
+    """
+    return shlex.quote(text.replace(" ", "%s"))
+
+
+class GestureScript:
+    """A sequence of input steps that runs as one device shell command.
+
+    Steps are joined with `&&`, so the device shell runs them back to back and the
+    pauses between them are `sleep` calls on the device instead of host-side sleeps
+    between separate adb round-trips. A failing step stops the rest of the script.
+    Text steps are shell-quoted because the whole script is parsed by the device shell.
+    """
+
+    def __init__(self) -> None:
+        self.steps: List[Tuple[str, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def tap(self, x: int, y: int) -> "GestureScript":
+        self.steps.append(("tap", str(x), str(y)))
+        return self
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 500) -> "GestureScript":
+        self.steps.append(("swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)))
+        return self
+
+    def text(self, text: str) -> "GestureScript":
+        self.steps.append(("text", text))
+        return self
+
+    def keyevent(self, key: str) -> "GestureScript":
+        self.steps.append(("keyevent", key))
+        return self
+
+    def sleep(self, seconds: float) -> "GestureScript":
+        if seconds > 0:
+            self.steps.append(("sleep", f"{seconds:.3f}".rstrip("0").rstrip(".")))
+        return self
+
+    @property
+    def duration_seconds(self) -> float:
+        """Time the script spends in on-device sleeps and swipes, used to extend the command timeout."""
+        total = 0.0
+        for step in self.steps:
+            if step[0] == "sleep":
+                total += float(step[1])
+            elif step[0] == "swipe":
+                total += int(step[5]) / 1000
+        return total
+
+    def to_shell(self, touch: Optional[SendeventTouch] = None) -> str:
+        """Render the script. With `touch`, taps and swipes become sendevent calls instead of `input`."""
+        commands = []
+        for kind, *args in self.steps:
+            if touch is not None and kind in ("tap", "swipe"):
+                commands.append(getattr(touch, kind)(*(int(arg) for arg in args)))
+            elif kind == "sleep":
+                commands.append(f"sleep {args[0]}")
+            elif kind == "text":
+                commands.append(f"input text {quote_input_text(args[0])}")
+            else:
+                commands.append(" ".join(["input", kind, *(shlex.quote(arg) for arg in args)]))
+        return " && ".join(commands)
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Any
+
+import cv2
+import numpy as np
+
+RAW_FORMAT_RGBA_8888 = 1
+RAW_FORMAT_RGBX_8888 = 2
+RAW_FORMAT_BGRA_8888 = 5
+
+_TO_BGR = {
+    RAW_FORMAT_RGBA_8888: cv2.COLOR_RGBA2BGR,
+    RAW_FORMAT_RGBX_8888: cv2.COLOR_RGBA2BGR,
+    RAW_FORMAT_BGRA_8888: cv2.COLOR_BGRA2BGR,
+}
+
+
+@dataclass
+class RawScreencap:
+    width: int
+    height: int
+    pixel_format: int
+    pixels: Any
+
+    def to_bgr(self) -> Any:
+        """Return the 3-channel BGR image the matcher works on (one color conversion pass)."""
+        return cv2.cvtColor(self.pixels, _TO_BGR[self.pixel_format])
+
+
+def parse_raw_screencap(data: bytes) -> RawScreencap:
+    """Wrap `screencap` output without `-p` as an (height, width, 4) array without copying.
+
+    The output is a little-endian header (width, height, pixel format, plus a color
+    space word since Android 9) followed by the 4-byte pixels, so the header size is
+    whatever precedes width * height * 4 bytes of pixel data.
+    """
+    if len(data) < 12:
+        raise ValueError(f"raw screencap output is too short ({len(data)} bytes)")
+    width, height, pixel_format = np.frombuffer(data, dtype="<u4", count=3)
+    width, height, pixel_format = int(width), int(height), int(pixel_format)
+    if pixel_format not in _TO_BGR:
+        raise ValueError(f"unsupported raw screencap pixel format {pixel_format}")
+    header_size = len(data) - width * height * 4
+    if header_size not in (12, 16):
+        raise ValueError(f"raw screencap size {len(data)} does not match {width}x{height}")
+    pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * 4, offset=header_size)
+    return RawScreencap(width, height, pixel_format, pixels.reshape(height, width, 4))
@@ -0,0 +1,107 @@
+import logging
+import shutil
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import cv2
+
+from adb.adb_controller import AdbError, Device
+from adb.gesture_script import GestureScript
+
+REPLAY_DEVICE_ID = "replay"
+
+
+class ReplayAdbController:
+    """Stand-in for AdbController that serves saved screenshots instead of a device.
+
+    Frames are the PNG files of a folder in file name order, so the
+    `run_XXX_screen_YYYY_*.png` files written by the loop replay in capture order.
+    Input commands are only recorded, never sent anywhere.
+    """
+
+    def __init__(self, frames_dir: Path):
+        self.frames_dir = frames_dir
+        self.frames: List[Path] = sorted(path for path in frames_dir.glob("*.png") if path.is_file())
+        self.device_id = REPLAY_DEVICE_ID
+        self.position = 0
+        self.commands: List[Tuple[str, ...]] = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+        if not self.frames:
+            raise AdbError(f"No PNG screenshots found to replay in {frames_dir}")
+
+    def next_frame(self) -> Optional[Path]:
+        """Return the next saved screenshot, or None once every frame was replayed."""
+        if self.position >= len(self.frames):
+            return None
+        frame = self.frames[self.position]
+        self.position += 1
+        return frame
+
+    def list_device_infos(self) -> List[Device]:
+        return [Device(serial=REPLAY_DEVICE_ID, state="device", model=self.frames_dir.name)]
+
+    def list_devices(self) -> List[str]:
+        return [REPLAY_DEVICE_ID]
+
+    def online_devices(self) -> List[Device]:
+        return self.list_device_infos()
+
+    def ensure_device(self, preferred_device_id: Optional[str] = None, wait_seconds: float = 6.0) -> str:
+        return self.device_id
+
+    def get_resolution(self) -> Tuple[int, int]:
+        """Return the first frame's size, read from the PNG IHDR chunk."""
+        with self.frames[0].open("rb") as file:
+            header = file.read(24)
+        if not header.startswith(b"\x89PNG\r\n\x1a\n"):
+            raise AdbError(f"Replay frame is not a PNG file: {self.frames[0]}")
+        return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+    def capture_screen(self, output_path: Optional[Path] = None) -> Any:
+        image = self.capture_frame()
+        if output_path is not None:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.frames[self.position - 1], output_path)
+        return image
+
+    def capture_frame(self) -> Any:
+        frame = self.next_frame()
+        if frame is None:
+            raise AdbError("Replay has no screenshots left.")
+        image = cv2.imread(str(frame), cv2.IMREAD_COLOR)
+        if image is None:
+            raise AdbError(f"Could not read replay frame: {frame}")
+        return image
+
+    def tap(self, x: int, y: int) -> None:
+        self._record("tap", str(x), str(y))
+
+    def input_text(self, text: str) -> None:
+        self._record("text", text)
+
+    def keyevent(self, key: str) -> None:
+        self._record("keyevent", key)
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 500) -> None:
+        self._record("swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms))
+
+    def run_gesture(self, script: GestureScript) -> None:
+        for step in script.steps:
+            if step[0] != "sleep":
+                self._record(*step)
+
+    def start_app(self, package: str, activity: str) -> None:
+        self._record("start_app", package, activity)
+
+    def start_package(self, package: str) -> None:
+        self._record("start_package", package)
+
+    def stop_app(self, package: str) -> None:
+        self._record("stop_app", package)
+
+    def close(self) -> None:
+        pass
+
+    def _record(self, *command: str) -> None:
+        self.logger.debug("Replay ignored input: %s", " ".join(command))
+        self.commands.append(command)
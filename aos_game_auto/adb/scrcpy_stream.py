@@ -0,0 +1,300 @@
+import logging
+import random
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+from adb.adb_controller import AdbController, AdbError
+
+try:
+    import av
+except ImportError:  # PyAV is only needed for the scrcpy capture mode.
+    av = None
+
+SCRCPY_SERVER_VERSION = "3.2"
+DEVICE_SERVER_PATH = "/data/local/tmp/scrcpy-server.jar"
+READ_CHUNK = 64 * 1024
+
+
+class StreamFrameSource:
+    """Decodes an H.264 Annex B byte stream in a background thread and keeps the newest frame.
+
+    Readers never wait for a capture: `latest_frame` returns the last decoded frame and
+    `wait_frame` blocks only until a frame newer than the one the caller already saw
+    arrives. `read` is any callable returning the next bytes and b"" at the end of the
+    stream, so a device socket and a recorded `.h264` file decode the same way.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[int], bytes],
+        name: str = "stream",
+        record_path: Optional[Path] = None,
+        frame_interval: float = 0.0,
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        if av is None:
+            raise AdbError("PyAV is not installed. Run: pip install av")
+        self.name = name
+        self.record_path = record_path
+        self.frame_interval = frame_interval
+        self.frames_decoded = 0
+        self.error: Optional[str] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._read = read
+        self._on_close = on_close
+        self._frame: Optional[Any] = None
+        self._frame_index = 0
+        self._image: Optional[Any] = None
+        self._image_index = 0
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._finished = False
+        self._started_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_file(cls, path: Path, fps: float = 0.0) -> "StreamFrameSource":
+        """Decode a recorded stream. With fps > 0, frames are released at that rate like a live device."""
+        file = path.open("rb")
+        return cls(file.read, name=path.name, frame_interval=1.0 / fps if fps > 0 else 0.0, on_close=file.close)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def frame_index(self) -> int:
+        return self._frame_index
+
+    @property
+    def finished(self) -> bool:
+        """True once the stream ended or failed; `wait_frame` then raises until a restart."""
+        return self._finished
+
+    def start(self) -> "StreamFrameSource":
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._decode_loop, name=f"{self.name}-decoder", daemon=True)
+        self._thread.start()
+        return self
+
+    def latest_frame(self) -> Optional[Any]:
+        with self._condition:
+            return self._image_locked() if self._frame is not None else None
+
+    def wait_frame(self, after_index: int = 0, timeout: float = 5.0) -> Tuple[int, Any]:
+        """Return (index, frame) for the newest frame with an index above after_index."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._frame_index <= after_index:
+                if self._finished:
+                    raise AdbError(self.error or f"{self.name} ended after {self.frames_decoded} frame(s).")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdbError(f"No new frame from {self.name} within {timeout:.1f}s.")
+                self._condition.wait(remaining)
+            return self._frame_index, self._image_locked()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._close_input()
+        if self._thread is not None:
+            self._thread.join(timeout=3)
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        if self.frames_decoded:
+            self.logger.info(
+                "%s: decoded %s frame(s), %.1f frames/s.",
+                self.name,
+                self.frames_decoded,
+                self.frames_decoded / elapsed if elapsed > 0 else 0.0,
+            )
+
+    def _image_locked(self) -> Any:
+        """Convert the newest decoded frame to BGR once, on the first read, not for every decoded frame."""
+        if self._image_index != self._frame_index:
+            self._image = self._frame.to_ndarray(format="bgr24")
+            self._image_index = self._frame_index
+        return self._image
+
+    def _close_input(self) -> None:
+        if self._on_close is not None:
+            self._on_close()
+
+    def _decode_loop(self) -> None:
+        codec = av.CodecContext.create("h264", "r")
+        record: Optional[BinaryIO] = None
+        try:
+            if self.record_path is not None:
+                self.record_path.parent.mkdir(parents=True, exist_ok=True)
+                # After a restart the new stream is appended; H.264 Annex B streams concatenate.
+                record = self.record_path.open("ab" if self.frames_decoded else "wb")
+            while not self._stopping.is_set():
+                data = self._read(READ_CHUNK)
+                if not data:
+                    break
+                if record is not None:
+                    record.write(data)
+                for packet in codec.parse(data):
+                    self._decode_packet(codec, packet)
+            if not self._stopping.is_set():
+                for packet in codec.parse(None):
+                    self._decode_packet(codec, packet)
+                self._decode_packet(codec, None)
+        except (OSError, ValueError, av.FFmpegError) as exc:
+            if not self._stopping.is_set():
+                self.error = f"{self.name} stream failed: {exc}"
+                self.logger.error("%s", self.error)
+        finally:
+            if record is not None:
+                record.close()
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def _decode_packet(self, codec: Any, packet: Any) -> None:
+        for frame in codec.decode(packet):
+            if self.frame_interval:
+                self._stopping.wait(self.frame_interval)
+            with self._condition:
+                self._frame = frame
+                self._frame_index += 1
+                self.frames_decoded += 1
+                self._condition.notify_all()
+
+
+class ScrcpyFrameSource(StreamFrameSource):
+    """Live device frames from scrcpy-server, read over an adb forward without per-frame adb calls.
+
+    The server is pushed and started with `raw_stream=true`, so the socket carries plain
+    H.264 without scrcpy's packet headers. Control and audio are disabled; input still
+    goes through AdbController. `record_path` keeps a copy of the stream for replay.
+    """
+
+    def __init__(
+        self,
+        adb: AdbController,
+        server_path: Path,
+        max_size: int = 0,
+        max_fps: int = 60,
+        bit_rate: int = 8_000_000,
+        port: int = 27183,
+        record_path: Optional[Path] = None,
+    ):
+        super().__init__(self._recv, name="scrcpy", record_path=record_path)
+        self.adb = adb
+        self.server_path = server_path
+        self.max_size = max_size
+        self.max_fps = max_fps
+        self.bit_rate = bit_rate
+        self.port = port
+        self._scid = f"{random.getrandbits(31):08x}"
+        self._socket: Optional[socket.socket] = None
+        self._server_process: Optional[subprocess.Popen] = None
+        self._first_chunk = b""
+
+    def start(self) -> "ScrcpyFrameSource":
+        if not self.server_path.is_file():
+            raise AdbError(f"scrcpy-server was not found: {self.server_path}")
+        self.adb.push(self.server_path, DEVICE_SERVER_PATH)
+        self.adb.forward(f"tcp:{self.port}", f"localabstract:scrcpy_{self._scid}")
+        server_args = [
+            f"CLASSPATH={DEVICE_SERVER_PATH}",
+            "app_process",
+            "/",
+            "com.genymobile.scrcpy.Server",
+            SCRCPY_SERVER_VERSION,
+            f"scid={self._scid}",
+            "log_level=warn",
+            "tunnel_forward=true",
+            "audio=false",
+            "control=false",
+            "cleanup=true",
+            "raw_stream=true",
+            "video_codec=h264",
+            f"max_size={self.max_size}",
+            f"max_fps={self.max_fps}",
+            f"video_bit_rate={self.bit_rate}",
+        ]
+        try:
+            self._server_process = self.adb.spawn_shell(server_args)
+            self._connect()
+        except (OSError, AdbError) as exc:
+            self._close_input()
+            raise AdbError(f"scrcpy-server did not start: {exc}") from exc
+        self.logger.info("scrcpy stream started on tcp:%s (max_size=%s, max_fps=%s).", self.port, self.max_size, self.max_fps)
+        return super().start()
+
+    def restart(self) -> "ScrcpyFrameSource":
+        """Start a new server and decoder after the stream ended (device replugged, server killed).
+
+        Frame indexes keep counting up, so a caller's last seen index stays valid. If the
+        restart fails, the source stays finished and the next call can try again.
+        """
+        self.stop()
+        self._scid = f"{random.getrandbits(31):08x}"
+        self._first_chunk = b""
+        self.error = None
+        self._stopping.clear()
+        with self._condition:
+            self._finished = False
+        try:
+            return self.start()
+        except AdbError:
+            with self._condition:
+                self._finished = True
+            raise
+
+    def _connect(self, timeout: float = 5.0) -> None:
+        """Connect through the forward. Until the server listens, adb accepts and closes at once."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._server_process is not None and self._server_process.poll() is not None:
+                raise AdbError(f"server process exited with code {self._server_process.returncode}")
+            try:
+                connection = socket.create_connection(("127.0.0.1", self.port), timeout=2.0)
+                first_chunk = connection.recv(READ_CHUNK)
+            except OSError:
+                first_chunk = b""
+                connection = None
+            if first_chunk:
+                connection.settimeout(None)
+                self._socket = connection
+                self._first_chunk = first_chunk
+                return
+            if connection is not None:
+                connection.close()
+            time.sleep(0.1)
+        raise AdbError(f"no video stream on tcp:{self.port} within {timeout:.0f}s")
+
+    def _recv(self, size: int) -> bytes:
+        if self._first_chunk:
+            data, self._first_chunk = self._first_chunk, b""
+            return data
+        connection = self._socket
+        if connection is None:
+            return b""
+        return connection.recv(size)
+
+    def _close_input(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        if self._server_process is not None:
+            if self._server_process.poll() is None:
+                self._server_process.terminate()
+                try:
+                    self._server_process.wait(timeout=3)
+                except subprocess.TimeoutExpired:
+                    self._server_process.kill()
+            self._server_process = None
+            try:
+                self.adb.remove_forward(f"tcp:{self.port}")
+            except AdbError as exc:
+                self.logger.debug("Could not remove adb forward: %s", exc)
@@ -0,0 +1,116 @@
+import logging
+import queue
+import subprocess
+import threading
+import uuid
+from typing import Any, List, Optional
+
+from adb.adb_controller import AdbError
+
+
+class AdbShellSessionError(AdbError):
+    """Raised when the persistent shell itself fails (process exited, pipe closed, no reply).
+
+    `sent` is True when the command was already written to the session, so it may have
+    run on the device and must not be repeated.
+    """
+
+    def __init__(self, message: str, sent: bool = False):
+        super().__init__(message)
+        self.sent = sent
+
+
+class AdbShellSession:
+    """One long-lived `adb shell` process that runs commands written to its stdin.
+
+    Each command is followed by an `echo` of a unique sentinel and the command's exit
+    status, so the reply ends exactly at the sentinel (which shares a line with the
+    output when that has no final newline). stderr is merged into the
+    reply. A dead or unresponsive session raises AdbShellSessionError and has to be
+    replaced by a new instance.
+    """
+
+    def __init__(self, command: List[str], startupinfo: Any = None):
+        self.command = command
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._token = f"__AOS_DONE_{uuid.uuid4().hex}__"
+        self._sequence = 0
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                startupinfo=startupinfo,
+            )
+        except OSError as exc:
+            raise AdbShellSessionError(f"Failed to start adb shell session: {exc}") from exc
+        self._reader = threading.Thread(target=self._read_lines, name="adb-shell-reader", daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def run(self, command: str, timeout: float) -> str:
+        """Run one shell command line and return its output. A non-zero exit raises AdbError."""
+        with self._lock:
+            if not self.alive:
+                raise AdbShellSessionError(f"adb shell session exited with code {self._process.returncode}")
+            self._sequence += 1
+            sentinel = f"{self._token}{self._sequence}"
+            script = f"{{ {command} ; }} 2>&1; echo \"{sentinel} $?\"\n"
+            try:
+                self._process.stdin.write(script.encode("utf-8"))
+                self._process.stdin.flush()
+            except OSError as exc:
+                self.close()
+                raise AdbShellSessionError(f"adb shell session pipe closed: {exc}") from exc
+
+            output: List[str] = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=timeout)
+                except queue.Empty:
+                    self.close()
+                    raise AdbShellSessionError(f"adb shell session timed out: {command}", sent=True) from None
+                if line is None:
+                    try:
+                        exit_code = self._process.wait(timeout=1)
+                    except subprocess.TimeoutExpired:
+                        exit_code = None
+                    message = "".join(output).strip() or f"exit code {exit_code}"
+                    raise AdbShellSessionError(f"adb shell session ended: {message}", sent=True)
+                position = line.find(sentinel)
+                if position >= 0:
+                    # Output without a final newline ends on the sentinel's line.
+                    if position:
+                        output.append(line[:position])
+                    status = line[position + len(sentinel) :].strip()
+                    break
+                output.append(line)
+
+        text = "".join(output)
+        if status != "0":
+            raise AdbError((text or f"shell command failed with exit code {status}: {command}").strip())
+        return text
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._process.kill()
+        try:
+            self._process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def _read_lines(self) -> None:
+        stream = self._process.stdout
+        for raw_line in iter(stream.readline, b""):
+            self._lines.put(raw_line.decode("utf-8", errors="replace").replace("\r\n", "\n"))
+        self._lines.put(None)
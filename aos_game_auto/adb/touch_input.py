@@ -0,0 +1,192 @@
+"""Raw touchscreen input through `sendevent`, without the `input` command's Java start-up.
+
+`adb shell input tap` starts an app_process VM for every call, which costs hundreds of
+milliseconds. `sendevent` writes kernel input events to the touchscreen device node
+directly. The touchscreen node, its axis ranges, and the display rotation are read
+once (`getevent -p`, `dumpsys input`). Each tap or swipe is then rendered as one
+`&&`-joined line of `sendevent` calls for a single shell round-trip.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+EV_SYN = 0
+EV_KEY = 1
+EV_ABS = 3
+SYN_REPORT = 0
+SYN_MT_REPORT = 2
+BTN_TOUCH = 0x14A
+ABS_MT_SLOT = 0x2F
+ABS_MT_TOUCH_MAJOR = 0x30
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+ABS_MT_TRACKING_ID = 0x39
+ABS_MT_PRESSURE = 0x3A
+
+SWIPE_STEP_MS = 20
+MAX_SWIPE_STEPS = 30
+
+
+@dataclass(frozen=True)
+class AxisRange:
+    minimum: int
+    maximum: int
+
+    def scale(self, value: int, size: int) -> int:
+        """Map a pixel position in [0, size) onto this axis."""
+        raw = self.minimum + int(value * (self.maximum - self.minimum + 1) / max(1, size))
+        return max(self.minimum, min(self.maximum, raw))
+
+
+@dataclass
+class TouchDevice:
+    path: str
+    name: str = ""
+    axes: Dict[int, AxisRange] = field(default_factory=dict)
+    keys: Set[int] = field(default_factory=set)
+    direct: bool = False
+
+    @property
+    def is_touchscreen(self) -> bool:
+        return ABS_MT_POSITION_X in self.axes and ABS_MT_POSITION_Y in self.axes
+
+
+def parse_getevent_devices(text: str) -> List[TouchDevice]:
+    """Parse `getevent -p` output into the devices with their ABS ranges and KEY codes."""
+    devices: List[TouchDevice] = []
+    device: Optional[TouchDevice] = None
+    section = ""
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        match = re.match(r"add device \d+:\s*(\S+)", line)
+        if match:
+            device = TouchDevice(path=match.group(1))
+            devices.append(device)
+            section = ""
+            continue
+        if device is None or not line:
+            continue
+        if line.startswith("name:"):
+            device.name = line.split(":", 1)[1].strip().strip('"')
+            continue
+        if line.startswith("input props:"):
+            section = "props"
+            continue
+        match = re.match(r"(\w+)\s*\(([0-9a-fA-F]{4})\):\s*(.*)", line)
+        if match:
+            section = match.group(1)
+            line = match.group(3)
+        if section == "ABS":
+            match = re.match(r"([0-9a-fA-F]{4})\s*:.*?min (-?\d+), max (-?\d+)", line)
+            if match:
+                device.axes[int(match.group(1), 16)] = AxisRange(int(match.group(2)), int(match.group(3)))
+        elif section == "KEY":
+            device.keys.update(int(code, 16) for code in re.findall(r"\b([0-9a-fA-F]{4})\b", line))
+        elif section == "props" and "INPUT_PROP_DIRECT" in line:
+            device.direct = True
+    return devices
+
+
+def find_touchscreen(devices: List[TouchDevice]) -> Optional[TouchDevice]:
+    """Pick the multi-touch device, preferring one marked INPUT_PROP_DIRECT (a screen, not a touchpad)."""
+    candidates = [device for device in devices if device.is_touchscreen]
+    candidates.sort(key=lambda device: not device.direct)
+    return candidates[0] if candidates else None
+
+
+def parse_display_rotation(text: str) -> int:
+    """Return the display rotation (0-3) from `dumpsys input`, or 0 when it is not reported."""
+    match = re.search(r"SurfaceOrientation:\s*(\d+)", text) or re.search(r"orientation=(?:ROTATION_)?(\d+)", text)
+    if not match:
+        return 0
+    value = int(match.group(1))
+    return value // 90 % 4 if value >= 90 else value % 4
+
+
+class SendeventTouch:
+    """Renders taps and swipes as `sendevent` command lines for one touchscreen.
+
+    Coordinates are in screenshot pixels of the current orientation. They are rotated
+    back to the panel's natural orientation (`natural_size` is `wm size`) and scaled to
+    the axis ranges. Multi-touch protocol B devices (with tracking IDs) get one slot per
+    gesture; older protocol A devices get SYN_MT_REPORT frames.
+    """
+
+    def __init__(self, device: TouchDevice, natural_size: Tuple[int, int], rotation: int = 0):
+        if not device.is_touchscreen:
+            raise ValueError(f"{device.path} has no multi-touch position axes")
+        self.device = device
+        self.natural_size = natural_size
+        self.rotation = rotation % 4
+        self._tracking_id = 0
+
+    def to_raw(self, x: int, y: int) -> Tuple[int, int]:
+        width, height = self.natural_size
+        if self.rotation == 1:
+            x, y = width - 1 - y, x
+        elif self.rotation == 2:
+            x, y = width - 1 - x, height - 1 - y
+        elif self.rotation == 3:
+            x, y = y, height - 1 - x
+        x = max(0, min(width - 1, x))
+        y = max(0, min(height - 1, y))
+        axes = self.device.axes
+        return axes[ABS_MT_POSITION_X].scale(x, width), axes[ABS_MT_POSITION_Y].scale(y, height)
+
+    def tap(self, x: int, y: int) -> str:
+        return self._join(self._down(x, y) + self._up())
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 500) -> str:
+        steps = max(1, min(MAX_SWIPE_STEPS, duration_ms // SWIPE_STEP_MS))
+        pause = f"sleep {duration_ms / steps / 1000:.3f}"
+        commands = self._down(x1, y1)
+        for step in range(1, steps + 1):
+            commands.append(pause)
+            commands += self._move(x1 + (x2 - x1) * step // steps, y1 + (y2 - y1) * step // steps)
+        return self._join(commands + self._up())
+
+    @property
+    def _protocol_b(self) -> bool:
+        return ABS_MT_TRACKING_ID in self.device.axes
+
+    def _down(self, x: int, y: int) -> List[str]:
+        axes = self.device.axes
+        events: List[Tuple[int, int, int]] = []
+        if self._protocol_b:
+            self._tracking_id = self._tracking_id % 0xFFFF + 1
+            if ABS_MT_SLOT in axes:
+                events.append((EV_ABS, ABS_MT_SLOT, 0))
+            events.append((EV_ABS, ABS_MT_TRACKING_ID, self._tracking_id))
+        if BTN_TOUCH in self.device.keys:
+            events.append((EV_KEY, BTN_TOUCH, 1))
+        for code in (ABS_MT_TOUCH_MAJOR, ABS_MT_PRESSURE):
+            if code in axes:
+                events.append((EV_ABS, code, max(1, (axes[code].minimum + axes[code].maximum) // 2)))
+        return self._events(events) + self._move(x, y)
+
+    def _move(self, x: int, y: int) -> List[str]:
+        raw_x, raw_y = self.to_raw(x, y)
+        events = [(EV_ABS, ABS_MT_POSITION_X, raw_x), (EV_ABS, ABS_MT_POSITION_Y, raw_y)]
+        if not self._protocol_b:
+            events.append((EV_SYN, SYN_MT_REPORT, 0))
+        return self._events(events + [(EV_SYN, SYN_REPORT, 0)])
+
+    def _up(self) -> List[str]:
+        events: List[Tuple[int, int, int]] = []
+        if self._protocol_b:
+            if ABS_MT_SLOT in self.device.axes:
+                events.append((EV_ABS, ABS_MT_SLOT, 0))
+            events.append((EV_ABS, ABS_MT_TRACKING_ID, -1))
+        else:
+            events.append((EV_SYN, SYN_MT_REPORT, 0))
+        if BTN_TOUCH in self.device.keys:
+            events.append((EV_KEY, BTN_TOUCH, 0))
+        return self._events(events + [(EV_SYN, SYN_REPORT, 0)])
+
+    def _events(self, events: List[Tuple[int, int, int]]) -> List[str]:
+        return [f"sendevent {self.device.path} {kind} {code} {value}" for kind, code, value in events]
+
+    @staticmethod
+    def _join(commands: List[str]) -> str:
+        return " && ".join(commands)
@@ -0,0 +1,69 @@
+"""Compare tap latency of the `input` and `sendevent` input backends on a connected device.
+
+Every tap really touches the screen, so pick a spot without buttons. Run from the
+aos_game_auto folder:
+
+    python -m benchmarks.input_latency --x 20 --y 20 --taps 20 --persistent-shell
+"""
+
+import argparse
+import time
+from typing import Optional
+
+from adb.adb_controller import AdbController, AdbError
+from utils.stats import summarize_latency
+
+
+def measure(adb: AdbController, x: int, y: int, taps: int, interval: float) -> Optional[dict[str, float]]:
+    durations: list[float] = []
+    try:
+        adb.ensure_device(adb.device_id)
+        adb.tap(x, y)
+        for _ in range(taps):
+            time.sleep(interval)
+            started = time.perf_counter()
+            adb.tap(x, y)
+            durations.append((time.perf_counter() - started) * 1000.0)
+    except AdbError as exc:
+        print(f"{adb.input_backend}: failed ({exc})")
+        return None
+    finally:
+        adb.close()
+    return summarize_latency(durations)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure per-tap latency of each adb input backend.")
+    parser.add_argument("--adb", default="adb", help="Path to adb.exe.")
+    parser.add_argument("--device", default=None, help="Device serial when more than one is connected.")
+    parser.add_argument("--x", type=int, required=True, help="Tap x coordinate (screenshot pixels).")
+    parser.add_argument("--y", type=int, required=True, help="Tap y coordinate (screenshot pixels).")
+    parser.add_argument("--taps", type=int, default=20, help="Timed taps per backend after one warm-up tap.")
+    parser.add_argument("--interval", type=float, default=0.3, help="Seconds between taps, so they are not read as double taps.")
+    parser.add_argument("--persistent-shell", action="store_true", help="Send taps through one long-lived adb shell.")
+    parser.add_argument("--native-protocol", action="store_true", help="Talk to the adb server socket instead of adb.exe.")
+    args = parser.parse_args()
+
+    results = {}
+    for backend in ("input", "sendevent"):
+        adb = AdbController(
+            adb_path=args.adb,
+            device_id=args.device,
+            persistent_shell=args.persistent_shell,
+            native_protocol=args.native_protocol,
+            input_backend=backend,
+        )
+        result = measure(adb, args.x, args.y, max(1, args.taps), args.interval)
+        if adb.input_backend != backend:
+            print(f"{backend}: unavailable on this device")
+            continue
+        if result:
+            results[backend] = result
+            print(f"{backend}: mean {result['mean_ms']:.1f} ms, p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
+    if len(results) == 2 and results["sendevent"]["p50_ms"] > 0:
+        print(f"sendevent p50 is {results['input']['p50_ms'] / results['sendevent']['p50_ms']:.1f}x faster than input")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+"""Compare per-call latency of the available OCR backends.
+
+Run from the aos_game_auto folder:
+
+    python -m benchmarks.ocr_latency --tesseract-cmd "C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+"""
+
+import argparse
+import time
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+
+from utils.stats import summarize_latency
+from vision.ocr_backend import OcrBackend, OcrBackendError, PytesseractBackend, TesserocrBackend, tessdata_dir_for
+
+
+def synthetic_text_image(width: int = 640, height: int = 160) -> Any:
+    image = np.full((height, width), 255, dtype=np.uint8)
+    cv2.putText(image, "START GAME", (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 0, 3)
+    cv2.putText(image, "Confirm  Cancel", (20, 135), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    return image
+
+
+def measure(backend: OcrBackend, image: Any, lang: str, calls: int) -> Optional[dict[str, float]]:
+    durations: list[float] = []
+    try:
+        backend.image_to_data(image, lang)
+        for _ in range(calls):
+            started = time.perf_counter()
+            backend.image_to_data(image, lang)
+            durations.append((time.perf_counter() - started) * 1000.0)
+    except OcrBackendError as exc:
+        print(f"{backend.name}: failed ({exc})")
+        return None
+    finally:
+        backend.close()
+    return summarize_latency(durations)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure per-call latency of each OCR backend.")
+    parser.add_argument("--tesseract-cmd", default="", help="Path to tesseract.exe.")
+    parser.add_argument("--lang", default="eng", help="Tesseract language.")
+    parser.add_argument("--calls", type=int, default=20, help="Timed calls per backend after one warm-up call.")
+    args = parser.parse_args()
+
+    image = synthetic_text_image()
+    factories = [
+        ("pytesseract", lambda: PytesseractBackend(args.tesseract_cmd or None)),
+        ("tesserocr", lambda: TesserocrBackend(tessdata_dir_for(args.tesseract_cmd or None))),
+    ]
+    for name, factory in factories:
+        try:
+            backend = factory()
+        except OcrBackendError as exc:
+            print(f"{name}: unavailable ({exc})")
+            continue
+        result = measure(backend, image, args.lang, max(1, args.calls))
+        if result:
+            print(f"{name}: mean {result['mean_ms']:.1f} ms, p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
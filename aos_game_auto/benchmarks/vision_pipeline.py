@@ -0,0 +1,249 @@
+"""Benchmark ImageMatcher across screen resolutions and template counts.
+
+Run from the aos_game_auto folder:
+
+    python -m benchmarks.vision_pipeline --output logs/bench.json
+    python -m benchmarks.vision_pipeline --output logs/bench_new.json --baseline logs/bench.json
+
+Screens and templates are generated, so results only depend on the matcher code,
+its options and the machine. Each case reports ops/sec, p50/p95 latency and the
+peak memory allocated during one call (numpy and Python allocations via tracemalloc).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import cv2
+import numpy as np
+
+from utils.stats import summarize_latency
+from vision.image_matcher import ImageMatcher
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "1440p": (2560, 1440)}
+DEFAULT_TEMPLATE_COUNTS = [1, 10, 50, 200]
+OCR_TEXT = "START GAME"
+
+
+def synthetic_screen(width: int, height: int, seed: int) -> Any:
+    """Return a game-like screen: smooth gradient, soft noise and a few flat UI panels."""
+    rng = np.random.default_rng(seed)
+    x, y = np.meshgrid(np.linspace(0, 1, width, dtype=np.float32), np.linspace(0, 1, height, dtype=np.float32))
+    base = np.stack([60 + 80 * x, 40 + 60 * y, 90 + 40 * x * y], axis=-1)
+    noise = rng.normal(0, 6, (height, width, 3)).astype(np.float32)
+    screen = np.clip(base + cv2.GaussianBlur(noise, (5, 5), 0), 0, 255).astype(np.uint8)
+    for _ in range(8):
+        left = int(rng.integers(0, width - width // 6))
+        top = int(rng.integers(0, height - height // 6))
+        color = tuple(int(value) for value in rng.integers(20, 200, 3))
+        cv2.rectangle(screen, (left, top), (left + width // 6, top + height // 8), color, -1)
+    return screen
+
+
+def synthetic_template(index: int, scale: float) -> Any:
+    """Return a button-sized patch of seeded blocky noise sized for a screen whose short side is 1080 * scale.
+
+    Patches from different seeds are uncorrelated, so no template matches another
+    one and a scan has to reach the planted template.
+    """
+    rng = np.random.default_rng(10_000 + index)
+    width, height = max(24, int(220 * scale)), max(12, int(72 * scale))
+    block = max(2, int(8 * scale))
+    cells = rng.integers(0, 256, (max(1, height // block), max(1, width // block), 3), dtype=np.uint8)
+    return cv2.resize(cells, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def timed_runs(call: Callable[[], Any], repeat: int) -> list[float]:
+    call()
+    durations: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        durations.append((time.perf_counter() - started) * 1000.0)
+    return durations
+
+
+def peak_memory_mb(call: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def summarize(durations: list[float]) -> Dict[str, float]:
+    latency = summarize_latency(durations)
+    return {"ops_per_sec": 1000.0 / latency["mean_ms"] if latency["mean_ms"] else 0.0, **latency}
+
+
+def build_matcher(args: argparse.Namespace) -> ImageMatcher:
+    return ImageMatcher(
+        template_cache_mb=args.template_cache_mb,
+        match_strategy=args.strategy,
+        match_workers=args.workers,
+        prefilter=args.prefilter,
+        ocr_cache_entries=0,
+    )
+
+
+def run_cases(args: argparse.Namespace, work_dir: Path) -> list[Dict[str, Any]]:
+    results: list[Dict[str, Any]] = []
+    matcher = build_matcher(args)
+    if args.tesseract_cmd:
+        matcher.configure_tesseract(args.tesseract_cmd)
+    screenshot_path = work_dir / "screen.png"
+    try:
+        for label in args.resolutions:
+            width, height = RESOLUTIONS[label]
+            scale = min(width, height) / 1080.0
+            screen = synthetic_screen(width, height, seed=width)
+            max_count = max(args.templates)
+            template_paths: list[Path] = []
+            for index in range(max_count):
+                path = work_dir / f"{label}_template_{index:03d}.png"
+                cv2.imwrite(str(path), synthetic_template(index, scale))
+                template_paths.append(path)
+
+            def record(op: str, count: int, call: Callable[[], Any]) -> None:
+                result = {"op": op, "resolution": label, "templates": count, "runs": args.repeat}
+                result.update(summarize(timed_runs(call, args.repeat)))
+                result["peak_memory_mb"] = peak_memory_mb(call)
+                results.append(result)
+                print(
+                    f"{op:16} {label:6} templates={count:<4} {result['ops_per_sec']:8.2f} ops/s  "
+                    f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                    f"peak {result['peak_memory_mb']:7.1f} MB",
+                    flush=True,
+                )
+
+            # The last template is placed on screen, so a scan visits every scenario before matching.
+            for count in args.templates:
+                frame = screen.copy()
+                target = cv2.imread(str(template_paths[count - 1]), cv2.IMREAD_COLOR)
+                top, left = height // 2, width // 3
+                frame[top : top + target.shape[0], left : left + target.shape[1]] = target
+                scenarios = [
+                    {"name": f"s{index}", "template": str(path), "threshold": 0.9}
+                    for index, path in enumerate(template_paths[:count])
+                ]
+                match = matcher.find_first_match(screenshot_path, scenarios, work_dir, screenshot_image=frame)
+                if match is None or match.scenario.get("name") != f"s{count - 1}":
+                    found = match.scenario.get("name") if match else "nothing"
+                    raise RuntimeError(f"{label} with {count} templates matched {found} instead of s{count - 1}")
+                if count == args.templates[0]:
+                    record(
+                        "find_template",
+                        1,
+                        lambda: matcher.find_template(
+                            screenshot_path, template_paths[count - 1], 0.9, screenshot_image=frame
+                        ),
+                    )
+                record(
+                    "find_first_match",
+                    count,
+                    lambda: matcher.find_first_match(screenshot_path, scenarios, work_dir, screenshot_image=frame),
+                )
+
+            if matcher.ocr_backend is None:
+                print(f"find_ocr_text    {label:6} skipped: no OCR backend installed", flush=True)
+                continue
+            ocr_frame = screen.copy()
+            cv2.putText(ocr_frame, OCR_TEXT, (width // 4, height // 3), cv2.FONT_HERSHEY_SIMPLEX, 2.0 * scale, (255, 255, 255), 4)
+            ocr_config = {"type": "ocr", "text": OCR_TEXT, "lang": args.lang, "threshold": 0.0}
+            record("find_ocr_text", 0, lambda: matcher.find_ocr_text(screenshot_path, ocr_frame, ocr_config))
+    finally:
+        matcher.close()
+    return results
+
+
+def compare(results: list[Dict[str, Any]], baseline_path: Path, tolerance: float) -> int:
+    """Print p50 changes against a stored baseline and return the number of regressions."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(item["op"], item["resolution"], item["templates"]): item for item in baseline.get("results", [])}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (regression when p50 is more than {tolerance:.0f}% slower):")
+    for result in results:
+        old = previous.get((result["op"], result["resolution"], result["templates"]))
+        if old is None or not old.get("p50_ms"):
+            continue
+        change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100.0
+        regressed = change > tolerance
+        regressions += int(regressed)
+        print(
+            f"{result['op']:16} {result['resolution']:6} templates={result['templates']:<4} "
+            f"p50 {old['p50_ms']:8.2f} -> {result['p50_ms']:8.2f} ms ({change:+6.1f}%)"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vision pipeline on synthetic screens.")
+    parser.add_argument("--resolutions", default="720p,1080p,1440p", help="Comma-separated: 720p, 1080p, 1440p.")
+    parser.add_argument(
+        "--templates",
+        default=",".join(str(count) for count in DEFAULT_TEMPLATE_COUNTS),
+        help="Comma-separated template counts for find_first_match.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per case after one warm-up call.")
+    parser.add_argument("--strategy", default="full", choices=["full", "pyramid"], help="Template match strategy.")
+    parser.add_argument("--workers", type=int, default=0, help="match_workers (0 = CPU count, 1 = serial).")
+    parser.add_argument("--prefilter", action="store_true", help="Enable the color-histogram prefilter.")
+    parser.add_argument("--template-cache-mb", type=float, default=256, help="Template cache budget.")
+    parser.add_argument("--tesseract-cmd", default="", help="Path to tesseract.exe for the OCR case.")
+    parser.add_argument("--lang", default="eng", help="Tesseract language for the OCR case.")
+    parser.add_argument("--output", default="", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", default="", help="Compare with a JSON file written by an earlier run.")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed p50 slowdown in percent.")
+    args = parser.parse_args()
+
+    args.resolutions = [value.strip() for value in args.resolutions.split(",") if value.strip()]
+    unknown = [value for value in args.resolutions if value not in RESOLUTIONS]
+    if unknown:
+        parser.error(f"Unknown resolution(s): {', '.join(unknown)}")
+    args.templates = sorted({max(1, int(value)) for value in args.templates.split(",") if value.strip()})
+    args.repeat = max(1, args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="aos_bench_") as temp_dir:
+        results = run_cases(args, Path(temp_dir))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": sys.version.split()[0],
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "options": {
+            "strategy": args.strategy,
+            "workers": args.workers,
+            "prefilter": args.prefilter,
+            "template_cache_mb": args.template_cache_mb,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written: {output_path}")
+
+    if args.baseline:
+        return 1 if compare(results, Path(args.baseline), args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,9 +10,18 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+import cv2
+
 from actions.action_runner import ActionRunner
 from adb.adb_controller import AdbController, AdbError
+from adb.replay_controller import ReplayAdbController
+from adb.scrcpy_stream import ScrcpyFrameSource
+from utils.stats import percentile
+from vision.frame_fingerprint import FrameChangeDetector, FrameFingerprint, fingerprint_frame
 from vision.image_matcher import ImageMatcher, MatchResult
+from vision.scenario_scheduler import ScenarioScheduler
+from vision.screen_state import build_state_classifier
+from vision.template_bundle import TemplateBundle, write_bundle
 
 
 def get_app_dir() -> Path:
@@ -27,6 +36,8 @@ DEFAULT_CONFIG = PROJECT_DIR / "config" / "scenarios.json"
 LOGS_DIR = PROJECT_DIR / "logs"
 SCREENSHOTS_DIR = PROJECT_DIR / "screenshots"
 REPORTS_DIR = PROJECT_DIR / "reports"
+HIT_HISTORY_FILES = 5
+DEFAULT_TEMPLATE_BUNDLE = "templates/templates.bundle"
 
 
 def setup_logging() -> None:
@@ -39,6 +50,14 @@ def setup_logging() -> None:
     )
 
 
+def resolve_project_path(value: Any) -> Optional[Path]:
+    """Return a config path as an absolute path, relative values being under the project folder."""
+    if not value:
+        return None
+    path = Path(str(value))
+    return path if path.is_absolute() else PROJECT_DIR / path
+
+
 def load_config(config_path: Path) -> Dict[str, Any]:
     try:
         with config_path.open("r", encoding="utf-8-sig") as file:
@@ -130,6 +149,81 @@ def resolve_adb_path(adb_arg: str) -> str:
     return adb_arg
 
 
+def resolve_scrcpy_server_path(configured: Any, adb_path: str) -> Optional[Path]:
+    """Find scrcpy-server from config, next to adb (the scrcpy zip ships both), the exe folder, or Downloads."""
+    configured_path = resolve_project_path(configured)
+    if configured_path is not None:
+        return configured_path if _is_file(configured_path) else None
+
+    candidates = [
+        Path(adb_path).parent / "scrcpy-server",
+        PROJECT_DIR / "scrcpy-server",
+        PROJECT_DIR / "scrcpy" / "scrcpy-server",
+    ]
+    downloads = Path.home() / "Downloads"
+    if downloads.exists():
+        candidates.append(downloads / "scrcpy-win64-v3.2" / "scrcpy-win64-v3.2" / "scrcpy-server")
+        candidates.append(downloads / "scrcpy-win64-v3.2" / "scrcpy-server")
+        candidates.extend(downloads.glob("scrcpy*/**/scrcpy-server"))
+    for candidate in candidates:
+        if _is_file(candidate):
+            return candidate
+    return None
+
+
+def scale_to_device(image: Any, device_resolution: tuple[int, int]) -> Any:
+    """Resize a downscaled stream frame to the device size, so match centers are tap coordinates.
+
+    The longest sides are compared because the stream follows the screen rotation while
+    `wm size` reports the natural orientation.
+    """
+    height, width = image.shape[:2]
+    scale = max(device_resolution) / max(width, height)
+    if abs(scale - 1.0) < 0.01:
+        return image
+    return cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_LINEAR)
+
+
+def start_scrcpy_stream(adb: AdbController, adb_config: Dict[str, Any]) -> ScrcpyFrameSource:
+    server_path = resolve_scrcpy_server_path(adb_config.get("scrcpy_server"), adb.adb_path)
+    if server_path is None:
+        raise AdbError("scrcpy-server was not found. Set adb.scrcpy_server in scenarios.json.")
+    record_path = resolve_project_path(adb_config.get("scrcpy_record"))
+    return ScrcpyFrameSource(
+        adb,
+        server_path,
+        max_size=int(adb_config.get("scrcpy_max_size", 0)),
+        max_fps=int(adb_config.get("scrcpy_max_fps", 60)),
+        bit_rate=int(adb_config.get("scrcpy_bit_rate", 8_000_000)),
+        port=int(adb_config.get("scrcpy_port", 27183)),
+        record_path=record_path,
+    ).start()
+
+
+def read_stream_frame(frame_source: ScrcpyFrameSource, adb: AdbController, last_frame_index: int) -> tuple[int, Any]:
+    """Return (frame index, frame) from the stream, restarting it when it has ended.
+
+    While the stream cannot be restarted, a screencap stands in for the frame, so the
+    loop keeps running and the next iteration tries the stream again.
+    """
+    logger = logging.getLogger("main")
+    if frame_source.finished:
+        logger.warning("scrcpy stream ended (%s). Restarting it.", frame_source.error or "closed by the device")
+        try:
+            adb.ensure_device(adb.device_id)
+            frame_source.restart()
+        except AdbError as exc:
+            logger.warning("Could not restart the scrcpy stream: %s", exc)
+    if not frame_source.finished:
+        try:
+            return frame_source.wait_frame(last_frame_index)
+        except AdbError:
+            if not frame_source.finished:
+                raise
+    logger.info("Using a screencap while the scrcpy stream is down.")
+    return last_frame_index, adb.capture_screen()
+
+
 def resolve_tesseract_path(tesseract_arg: str) -> str:
     """Find tesseract.exe from CLI arg, environment, common install paths, or PATH."""
     candidates: list[Path] = []
@@ -191,6 +285,9 @@ def open_csv_log() -> tuple[Path, Any, csv.DictWriter]:
         "message",
         "screenshot_path",
         "saved_screenshot_path",
+        "frame_skipped",
+        "match_ms",
+        "capture_ms",
     ]
     writer = csv.DictWriter(file, fieldnames=fieldnames)
     writer.writeheader()
@@ -201,12 +298,15 @@ def write_iteration_log(
     writer: csv.DictWriter,
     run_index: int,
     iteration: int,
-    screenshot_path: Path,
+    screenshot_path: Optional[Path],
     match: Optional[MatchResult],
     action: Optional[Dict[str, Any]],
     success: bool,
     message: str = "",
     saved_screenshot_path: Optional[Path] = None,
+    frame_skipped: bool = False,
+    match_ms: Optional[float] = None,
+    capture_ms: Optional[float] = None,
 ) -> None:
     writer.writerow(
         {
@@ -223,12 +323,37 @@ def write_iteration_log(
             "action": json.dumps(action or {}, ensure_ascii=False),
             "success": success,
             "message": message,
-            "screenshot_path": str(screenshot_path),
+            "screenshot_path": str(screenshot_path or ""),
             "saved_screenshot_path": str(saved_screenshot_path or ""),
+            "frame_skipped": frame_skipped,
+            "match_ms": f"{match_ms:.2f}" if match_ms is not None else "",
+            "capture_ms": f"{capture_ms:.2f}" if capture_ms is not None else "",
         }
     )
 
 
+def save_frame(path: Path, image: Any) -> bool:
+    """Write an in-memory frame as PNG. Returns False instead of raising so logging can go on."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return bool(cv2.imwrite(str(path), image))
+    except (OSError, cv2.error) as exc:
+        logging.getLogger("main").warning("Could not save frame %s: %s", path, exc)
+        return False
+
+
+def same_candidates(previous_decision: tuple[list[int], Optional[MatchResult]], candidate_ids: list[int]) -> bool:
+    """Return True when a previous match decision is still valid for the current candidate list.
+
+    A no-match holds for any order of the same scenarios. A match only holds when the
+    order is identical, because an earlier scenario could otherwise win on this frame.
+    """
+    previous_ids, previous_match = previous_decision
+    if previous_match is None:
+        return sorted(previous_ids) == sorted(candidate_ids)
+    return previous_ids == candidate_ids
+
+
 def create_markdown_report(
     result_log_path: Path,
     config: Dict[str, Any],
@@ -237,6 +362,8 @@ def create_markdown_report(
     started_at: datetime,
     finished_at: datetime,
     finish_reason: str,
+    matcher_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    replay_dir: Optional[Path] = None,
 ) -> Path:
     """Create a human-readable automation summary from the CSV result log."""
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -248,6 +375,7 @@ def create_markdown_report(
     matched_rows = [row for row in rows if row.get("scenario_name")]
     no_match_rows = [row for row in rows if row.get("message") == "no match"]
     failed_rows = [row for row in rows if str(row.get("success", "")).lower() not in ("true", "1", "yes")]
+    skipped_rows = [row for row in rows if str(row.get("frame_skipped", "")).lower() in ("true", "1", "yes")]
     run_indices = sorted({row.get("run_index", "") for row in rows if row.get("run_index", "")})
 
     scenario_stats: dict[str, dict[str, Any]] = {}
@@ -296,6 +424,7 @@ def create_markdown_report(
         f"- Duration: {duration}",
         f"- Finish reason: {finish_reason}",
         f"- Script: {script_name or 'all'}",
+        *([f"- Replay: {replay_dir}"] if replay_dir else []),
         f"- App package: {package or '(not set)'}",
         f"- App activity: {activity or '(not set)'}",
         f"- Configured scenarios: {len(active_config.get('scenarios', []))}",
@@ -304,6 +433,7 @@ def create_markdown_report(
         f"- Matched iterations: {len(matched_rows)}",
         f"- No-match iterations: {len(no_match_rows)}",
         f"- Failed iterations: {len(failed_rows)}",
+        f"- Unchanged-frame skips: {len(skipped_rows)}",
         f"- Best score: {max(scores):.4f}" if scores else "- Best score: N/A",
         f"- Average score: {sum(scores) / len(scores):.4f}" if scores else "- Average score: N/A",
         f"- CSV log: {result_log_path}",
@@ -332,6 +462,53 @@ def create_markdown_report(
     else:
         lines.append("- No actions executed.")
 
+    timed_rows: list[tuple[float, Dict[str, str]]] = []
+    for row in rows:
+        try:
+            timed_rows.append((float(row.get("match_ms", "")), row))
+        except ValueError:
+            pass
+    if timed_rows:
+        timings = [value for value, _ in timed_rows]
+        mean = sum(timings) / len(timings)
+        lines.extend(
+            [
+                "",
+                "## Frame Timings",
+                "",
+                f"- Timed frames: {len(timings)}",
+                f"- Mean: {mean:.2f} ms ({1000.0 / mean if mean else 0.0:.1f} frames/s)",
+                f"- p50: {percentile(timings, 0.50):.2f} ms",
+                f"- p95: {percentile(timings, 0.95):.2f} ms",
+                f"- Max: {max(timings):.2f} ms",
+            ]
+        )
+        capture_timings: list[float] = []
+        for value, row in timed_rows:
+            try:
+                capture_timings.append(float(row.get("capture_ms", "")) + value)
+            except ValueError:
+                pass
+        if capture_timings:
+            lines.extend(
+                [
+                    f"- Capture to match p50: {percentile(capture_timings, 0.50):.2f} ms",
+                    f"- Capture to match p95: {percentile(capture_timings, 0.95):.2f} ms",
+                ]
+            )
+        lines.extend(
+            [
+                "",
+                "| Run | Iteration | Match ms | Scenario | Screenshot |",
+                "|---:|---:|---:|---|---|",
+            ]
+        )
+        for value, row in sorted(timed_rows, key=lambda item: item[0], reverse=True)[:10]:
+            lines.append(
+                f"| {row.get('run_index', '')} | {row.get('iteration', '')} | {value:.2f} | "
+                f"{row.get('scenario_name', '') or '-'} | {Path(row.get('screenshot_path', '')).name} |"
+            )
+
     lines.extend(
         [
             "",
@@ -357,6 +534,56 @@ def create_markdown_report(
     if not matched_rows:
         lines.append("| - | - | - | - | - | - | - | - |")
 
+    if matcher_stats:
+        lines.extend(["", "## Matcher Stats", ""])
+        template_cache = matcher_stats.get("template_cache")
+        if template_cache:
+            lines.append(
+                f"- Template cache: {template_cache['hits']} hits / {template_cache['misses']} misses "
+                f"({template_cache['hit_rate'] * 100:.1f}% hit rate), {template_cache['evictions']} evictions, "
+                f"{template_cache['entries']} entries, {template_cache['bytes'] / (1024 * 1024):.1f} MB "
+                f"of {template_cache['max_bytes'] / (1024 * 1024):.0f} MB"
+            )
+        adaptive_roi = matcher_stats.get("adaptive_roi")
+        if adaptive_roi and (adaptive_roi["prior_hits"] or adaptive_roi["prior_misses"]):
+            lines.append(
+                f"- Adaptive ROI: {adaptive_roi['prior_hits']} prior-region hits / "
+                f"{adaptive_roi['prior_misses']} full-area fallbacks"
+            )
+        pyramid = matcher_stats.get("pyramid")
+        if pyramid and pyramid["searches"]:
+            lines.append(
+                f"- Pyramid matching: {pyramid['full_fallbacks']} of {pyramid['searches']} coarse searches "
+                "fell back to a full-resolution match"
+            )
+        ocr = matcher_stats.get("ocr")
+        if ocr and ocr["lookups"]:
+            lines.append(f"- OCR: {ocr['runs']} tesseract runs for {ocr['lookups']} OCR config checks")
+        prefilter = matcher_stats.get("prefilter")
+        if prefilter and prefilter["checked"]:
+            lines.append(
+                f"- Prefilter: {prefilter['skipped']} of {prefilter['checked']} template matches skipped "
+                f"({prefilter['skipped'] / prefilter['checked'] * 100:.1f}%)"
+            )
+        screen_state = matcher_stats.get("screen_state")
+        if screen_state and (screen_state["recognized"] or screen_state["unknown"]):
+            lines.append(
+                f"- Screen state: {screen_state['recognized']} frames recognized / {screen_state['unknown']} unknown, "
+                f"{screen_state['scenarios_skipped']} scenario checks skipped"
+            )
+        features = matcher_stats.get("features")
+        if features and features["lookups"]:
+            lines.append(
+                f"- Feature matching: {features['frame_passes']} frame descriptor passes for "
+                f"{features['lookups']} features template checks"
+            )
+        ocr_cache = matcher_stats.get("ocr_cache")
+        if ocr_cache and (ocr_cache["hits"] or ocr_cache["misses"]):
+            lines.append(
+                f"- OCR result cache: {ocr_cache['hits']} hits / {ocr_cache['misses']} misses "
+                f"({ocr_cache['hit_rate'] * 100:.1f}% hit rate), {ocr_cache['entries']} entries"
+            )
+
     if failed_rows:
         lines.extend(["", "## Failures", "", "| Iteration | Message | Screenshot |", "|---:|---|---|"])
         for row in failed_rows[-20:]:
@@ -378,8 +605,12 @@ def create_markdown_report(
     return report_path
 
 
-def validate_templates(config: Dict[str, Any], base_dir: Path) -> list[Path]:
-    """Return configured template paths that are missing or not PNG-looking files."""
+def validate_templates(config: Dict[str, Any], base_dir: Path, bundle: Optional[TemplateBundle] = None) -> list[Path]:
+    """Return configured template paths that are missing or not PNG-looking files.
+
+    Templates that are up to date in the compiled bundle were already decoded once,
+    so they are not opened again.
+    """
     invalid_paths: list[Path] = []
     for scenario in config.get("scenarios", []):
         if scenario.get("enabled", True) is False:
@@ -393,6 +624,8 @@ def validate_templates(config: Dict[str, Any], base_dir: Path) -> list[Path]:
             if not template_path.exists() or template_path.stat().st_size == 0:
                 invalid_paths.append(template_path)
                 continue
+            if bundle is not None and bundle.is_fresh(template_path):
+                continue
 
             try:
                 with template_path.open("rb") as file:
@@ -403,6 +636,72 @@ def validate_templates(config: Dict[str, Any], base_dir: Path) -> list[Path]:
     return invalid_paths
 
 
+def enabled_scenarios(config: Dict[str, Any]) -> list[Dict[str, Any]]:
+    return [scenario for scenario in config.get("scenarios", []) if scenario.get("enabled", True) is not False]
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    try:
+        width, height = (int(part) for part in value.lower().split("x", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected WIDTHxHEIGHT, got {value!r}") from None
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"Expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def compile_template_bundle(
+    config: Dict[str, Any],
+    matcher: ImageMatcher,
+    bundle_path: Path,
+    device_resolutions: list[tuple[int, int]],
+) -> int:
+    """Decode every enabled scenario's templates and write them to one bundle file."""
+    sources = matcher.template_bundle_sources(enabled_scenarios(config), PROJECT_DIR, device_resolutions)
+    templates: Dict[Path, Dict[str, Any]] = {}
+    for template_path, scales in sources.items():
+        variants = matcher.compile_template_variants(template_path, scales)
+        if variants:
+            templates[template_path] = variants
+    return write_bundle(bundle_path, templates, device_resolutions)
+
+
+def refresh_template_bundle(
+    config: Dict[str, Any],
+    matcher: ImageMatcher,
+    bundle_path: Path,
+    device_resolution: tuple[int, int],
+) -> Optional[TemplateBundle]:
+    """Open the compiled bundle and rebuild it when templates changed or a scale is missing.
+
+    Returns None when no bundle was compiled, so the runner keeps decoding templates lazily.
+    """
+    logger = logging.getLogger("main")
+    bundle = TemplateBundle.open(bundle_path)
+    if bundle is None:
+        return None
+    sources = matcher.template_bundle_sources(enabled_scenarios(config), PROJECT_DIR, [device_resolution])
+    stale_paths = [
+        path
+        for path, scales in sources.items()
+        if not bundle.is_fresh(path)
+        or any(scale != 1.0 and f"scale_{scale:.4f}" not in bundle.variants(path) for scale in scales)
+    ]
+    if not stale_paths:
+        return bundle
+
+    # Keep the scales compiled earlier with --bundle-resolution next to the connected device's.
+    resolutions = list(dict.fromkeys([*bundle.resolutions, tuple(device_resolution)]))
+    logger.info("Template bundle is out of date for %s template(s). Rebuilding %s", len(stale_paths), bundle_path)
+    bundle.close()
+    try:
+        compile_template_bundle(config, matcher, bundle_path, resolutions)
+    except OSError as exc:
+        logger.warning("Could not rebuild template bundle: %s", exc)
+        return bundle
+    return TemplateBundle.open(bundle_path)
+
+
 def scenario_template_values(scenario: Dict[str, Any]) -> list[str]:
     """Return every template path referenced by legacy, match, or match_any config."""
     values: list[str] = []
@@ -464,6 +763,25 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Fail immediately when configured template files are missing.",
     )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        metavar="DIR",
+        help="Run the scenarios against the PNG screenshots in DIR instead of a device. Input actions are not sent.",
+    )
+    parser.add_argument(
+        "--compile-templates",
+        action="store_true",
+        help="Decode all configured templates into the template bundle and exit.",
+    )
+    parser.add_argument(
+        "--bundle-resolution",
+        action="append",
+        type=parse_resolution,
+        default=[],
+        metavar="WIDTHxHEIGHT",
+        help="With --compile-templates, also store templates pre-scaled for this device resolution. Repeatable.",
+    )
     parser.add_argument(
         "--no-pause",
         action="store_true",
@@ -503,9 +821,30 @@ def main() -> int:
         ]
         active_config = {**config, "scenarios": active_scenarios}
 
-    invalid_templates = validate_templates(active_config, PROJECT_DIR)
+    bundle_path = resolve_project_path(config.get("loop", {}).get("template_bundle", DEFAULT_TEMPLATE_BUNDLE))
+    if args.compile_templates:
+        if bundle_path is None:
+            logger.error("loop.template_bundle is empty; nowhere to write the template bundle.")
+            return 2
+        compile_matcher = ImageMatcher(template_resolution=config.get("loop", {}).get("template_resolution"))
+        try:
+            compiled = compile_template_bundle(config, compile_matcher, bundle_path, args.bundle_resolution)
+        except OSError as exc:
+            logger.error("Template bundle compile failed: %s", exc)
+            return 2
+        finally:
+            compile_matcher.close()
+        logger.info("Compiled %s template(s) into %s", compiled, bundle_path)
+        return 0
+
+    template_bundle = TemplateBundle.open(bundle_path) if bundle_path else None
+    invalid_templates = validate_templates(active_config, PROJECT_DIR, template_bundle)
     should_auto_capture_templates = bool(
-        invalid_templates and not args.allow_missing_templates and not args.capture_only and not args.list_devices
+        invalid_templates
+        and not args.allow_missing_templates
+        and not args.capture_only
+        and not args.list_devices
+        and not args.replay
     )
     if should_auto_capture_templates and args.strict_templates:
         logger.error("Template preflight failed. The following configured template PNG files are missing or invalid:")
@@ -515,15 +854,73 @@ def main() -> int:
         pause_on_fatal_exit()
         return 4
 
-    adb_path = resolve_adb_path(args.adb)
-    logger.info("Using adb executable: %s", adb_path)
-    adb = AdbController(adb_path=adb_path, device_id=args.device)
-    matcher = ImageMatcher()
+    replay_dir = Path(args.replay).resolve() if args.replay else None
+    adb_config = config.get("adb", {})
+    capture_mode = "png" if replay_dir is not None else str(adb_config.get("capture_mode", "png")).lower()
+    frame_source: Optional[ScrcpyFrameSource] = None
+    if replay_dir is not None:
+        try:
+            adb = ReplayAdbController(replay_dir)
+        except AdbError as exc:
+            logger.error("%s", exc)
+            pause_on_fatal_exit()
+            return 2
+        logger.info("Replaying %s screenshot(s) from %s", len(adb.frames), replay_dir)
+        for template_path in invalid_templates:
+            logger.warning("Template missing or invalid: %s", template_path)
+    else:
+        adb_path = resolve_adb_path(args.adb)
+        logger.info("Using adb executable: %s", adb_path)
+        adb = AdbController(
+            adb_path=adb_path,
+            device_id=args.device,
+            persistent_shell=bool(adb_config.get("persistent_shell", False)),
+            native_protocol=bool(adb_config.get("native_protocol", False)),
+            watch_devices=bool(adb_config.get("watch_devices", False)),
+            input_backend=str(adb_config.get("input_backend", "input")),
+        )
+    matcher_config = config.get("loop", {})
+    matcher = ImageMatcher(
+        template_cache_mb=float(matcher_config.get("template_cache_mb", 256)),
+        match_strategy=str(matcher_config.get("match_strategy", "full")),
+        match_workers=int(matcher_config.get("match_workers", 0)),
+        adaptive_roi=bool(matcher_config.get("adaptive_roi", False)),
+        roi_padding=int(matcher_config.get("roi_padding", 48)),
+        early_exit_score=matcher_config.get("early_exit_score"),
+        prefilter=bool(matcher_config.get("prefilter", False)),
+        prefilter_margin=float(matcher_config.get("prefilter_margin", 0.25)),
+        ocr_backend=str(matcher_config.get("ocr_backend", "pytesseract")),
+        ocr_cache_entries=int(matcher_config.get("ocr_cache_entries", 512)),
+        ocr_cache_path=resolve_project_path(matcher_config.get("ocr_cache_file")),
+        template_resolution=matcher_config.get("template_resolution"),
+        feature_keypoints=int(matcher_config.get("feature_keypoints", 3000)),
+    )
+    if bool(matcher_config.get("state_classifier", False)):
+        matcher.state_classifier = build_state_classifier(
+            enabled_scenarios(active_config),
+            PROJECT_DIR,
+            resolve_project_path(matcher_config.get("states_dir", "states")),
+            neighbors=int(matcher_config.get("state_neighbors", 3)),
+            max_distance=float(matcher_config.get("state_max_distance", 0.2)),
+        )
+        logger.info("Screen state classifier: %s labeled screenshot(s).", len(matcher.state_classifier))
+    if matcher.adaptive_roi:
+        history_paths = sorted(LOGS_DIR.glob("results_*.csv"))[-HIT_HISTORY_FILES:]
+        loaded = matcher.load_hit_history(history_paths)
+        logger.info("Loaded %s template hit region(s) from %s result log(s).", loaded, len(history_paths))
     tesseract_path = resolve_tesseract_path(args.tesseract_cmd)
     if tesseract_path:
         logger.info("Using tesseract executable: %s", tesseract_path)
     matcher.configure_tesseract(tesseract_path)
-    action_runner = ActionRunner(adb, SCREENSHOTS_DIR)
+    if matcher.ocr_backend is not None:
+        logger.info("OCR backend: %s", matcher.ocr_backend.name)
+    action_runner = ActionRunner(
+        adb,
+        SCREENSHOTS_DIR,
+        matcher=matcher,
+        base_dir=PROJECT_DIR,
+        sleep=(lambda seconds: None) if replay_dir else time.sleep,
+    )
 
     result_log_path, result_log_file, result_writer = open_csv_log()
     logger.info("Result CSV log: %s", result_log_path)
@@ -539,12 +936,21 @@ def main() -> int:
 
         device_id = adb.ensure_device()
         logger.info("Using adb device: %s", device_id)
-        logger.info("Device resolution: %sx%s", *adb.get_resolution())
+        device_resolution = adb.get_resolution()
+        logger.info("Device resolution: %sx%s", *device_resolution)
+        if bundle_path is not None:
+            template_bundle = refresh_template_bundle(config, matcher, bundle_path, device_resolution)
+            if template_bundle is not None:
+                loaded_templates = matcher.load_template_bundle(template_bundle)
+                logger.info("Loaded %s template(s) from bundle %s", loaded_templates, bundle_path)
+        prepared_templates = matcher.prepare_template_bank(active_config.get("scenarios", []), PROJECT_DIR, device_resolution)
+        if prepared_templates:
+            logger.info("Pre-scaled %s template(s) for the device resolution.", prepared_templates)
 
         app_config = config.get("app", {})
         package = app_config.get("package")
         activity = app_config.get("activity")
-        if not args.skip_start_app and package:
+        if not args.skip_start_app and package and replay_dir is None:
             try:
                 if activity:
                     adb.start_app(package, activity)
@@ -573,8 +979,8 @@ def main() -> int:
             return 0
 
         loop_config = config.get("loop", {})
-        interval_seconds = float(loop_config.get("interval_seconds", 1))
-        max_iterations = int(loop_config.get("max_iterations", 300))
+        interval_seconds = 0.0 if replay_dir else float(loop_config.get("interval_seconds", 1))
+        max_iterations = len(adb.frames) if replay_dir else int(loop_config.get("max_iterations", 300))
         run_mode = args.run_mode or str(loop_config.get("run_mode", "")).lower().strip()
         if run_mode not in ("scan", "sequence"):
             run_mode = "sequence" if args.script else "scan"
@@ -587,7 +993,23 @@ def main() -> int:
         if not scenarios:
             logger.warning("No scenarios configured.")
         logger.info("Run mode: %s", run_mode)
+        scheduler: Optional[ScenarioScheduler] = None
+        if run_mode == "scan" and bool(loop_config.get("adaptive_order", False)):
+            scheduler = ScenarioScheduler(decay=float(loop_config.get("adaptive_order_decay", 0.95)))
+            logger.info("Adaptive scenario ordering enabled.")
+        change_detector: Optional[FrameChangeDetector] = None
+        if bool(loop_config.get("skip_unchanged_frames", False)):
+            change_detector = FrameChangeDetector(
+                pixel_tolerance=float(loop_config.get("frame_change_tolerance", 8.0)),
+                max_changed_pixels=int(loop_config.get("frame_changed_pixels", 0)),
+                max_hash_distance=int(loop_config.get("frame_hash_distance", 2)),
+            )
+            logger.info("Unchanged-frame skipping enabled.")
+        save_every_frame = str(loop_config.get("save_screenshots", "on_demand")).lower() == "all"
         finish_reason = "requested runs completed"
+        if capture_mode == "scrcpy":
+            frame_source = start_scrcpy_stream(adb, adb_config)
+        last_frame_index = 0
 
         run_index = 1
         while True:
@@ -600,17 +1022,47 @@ def main() -> int:
             logger.info("Starting run %s.", run_index)
             run_stopped = False
             next_scenario_index = 0
+            previous_fingerprint: Optional[FrameFingerprint] = None
+            previous_decision: Optional[tuple[list[int], Optional[MatchResult]]] = None
             for iteration in range(1, max_iterations + 1):
                 if monitor_deadline and time.time() >= monitor_deadline:
                     finish_reason = "monitor duration reached"
                     run_stopped = True
                     break
 
-                screenshot_path = SCREENSHOTS_DIR / f"run_{run_index:03d}_screen_{iteration:04d}_{int(time.time())}.png"
+                if replay_dir is not None:
+                    replay_frame = adb.next_frame()
+                    if replay_frame is None:
+                        finish_reason = "replay finished"
+                        run_stopped = True
+                        break
+                    screenshot_path = replay_frame
+                else:
+                    screenshot_path = SCREENSHOTS_DIR / f"run_{run_index:03d}_screen_{iteration:04d}_{int(time.time())}.png"
 
+                # Live frames stay in memory; a PNG is written only for save_screenshots "all",
+                # a screenshot action, or a failed iteration.
+                logged_screenshot_path: Optional[Path] = screenshot_path if replay_dir is not None else None
+                screenshot_image = None
+                capture_ms: Optional[float] = None
                 try:
-                    adb.capture_screen(screenshot_path)
+                    capture_started = time.perf_counter()
+                    if frame_source is not None:
+                        last_frame_index, screenshot_image = read_stream_frame(frame_source, adb, last_frame_index)
+                        screenshot_image = scale_to_device(screenshot_image, device_resolution)
+                    elif capture_mode == "raw":
+                        screenshot_image = adb.capture_frame()
+                    elif replay_dir is None:
+                        screenshot_image = adb.capture_screen(screenshot_path if save_every_frame else None)
+                        if save_every_frame:
+                            logged_screenshot_path = screenshot_path
+                    if replay_dir is None:
+                        capture_ms = (time.perf_counter() - capture_started) * 1000.0
+                        if save_every_frame and logged_screenshot_path is None and save_frame(screenshot_path, screenshot_image):
+                            logged_screenshot_path = screenshot_path
                     candidate_scenarios = scenarios
+                    if scheduler is not None:
+                        candidate_scenarios = scheduler.order(scenarios)
                     if run_mode == "sequence":
                         candidate_scenarios = scenarios[next_scenario_index:]
                         if not candidate_scenarios:
@@ -619,11 +1071,59 @@ def main() -> int:
                             run_stopped = True
                             break
 
-                    match = matcher.find_first_match(screenshot_path, candidate_scenarios, PROJECT_DIR)
+                    frame_skipped = False
+                    candidate_ids = [id(scenario) for scenario in candidate_scenarios]
+                    if change_detector is not None:
+                        if screenshot_image is None:
+                            screenshot_image = matcher.read_screenshot(screenshot_path)
+                        fingerprint = fingerprint_frame(screenshot_image)
+                        frame_skipped = (
+                            previous_decision is not None
+                            and change_detector.is_unchanged(previous_fingerprint, fingerprint)
+                            and same_candidates(previous_decision, candidate_ids)
+                        )
+                        if not frame_skipped:
+                            previous_fingerprint = fingerprint
+
+                    match_ms: Optional[float] = None
+                    if frame_skipped and previous_decision is not None:
+                        match = previous_decision[1]
+                        logger.info("[run %s/%s] Frame unchanged. Reusing previous decision.", run_index, iteration)
+                    else:
+                        match_started = time.perf_counter()
+                        match = matcher.find_first_match(
+                            screenshot_path, candidate_scenarios, PROJECT_DIR, screenshot_image=screenshot_image
+                        )
+                        match_ms = (time.perf_counter() - match_started) * 1000.0
+                        if capture_ms is not None:
+                            logger.debug(
+                                "[run %s/%s] Capture %.1f ms, match %.1f ms, capture to match %.1f ms.",
+                                run_index,
+                                iteration,
+                                capture_ms,
+                                match_ms,
+                                capture_ms + match_ms,
+                            )
+                    if change_detector is not None:
+                        previous_decision = (candidate_ids, match)
+                    if scheduler is not None:
+                        scheduler.record(match.scenario if match else None)
 
                     if not match:
                         logger.info("[run %s/%s] No scenario matched.", run_index, iteration)
-                        write_iteration_log(result_writer, run_index, iteration, screenshot_path, None, None, True, "no match")
+                        write_iteration_log(
+                            result_writer,
+                            run_index,
+                            iteration,
+                            logged_screenshot_path,
+                            None,
+                            None,
+                            True,
+                            "no match",
+                            frame_skipped=frame_skipped,
+                            match_ms=match_ms,
+                            capture_ms=capture_ms,
+                        )
                         result_log_file.flush()
                         time.sleep(interval_seconds)
                         continue
@@ -651,17 +1151,20 @@ def main() -> int:
                         match.center_y,
                     )
 
-                    action_result = action_runner.run(action, match, screenshot_path, iteration)
+                    action_result = action_runner.run(action, match, screenshot_path, iteration, screenshot_image)
                     write_iteration_log(
                         result_writer,
                         run_index,
                         iteration,
-                        screenshot_path,
+                        logged_screenshot_path,
                         match,
                         action,
                         True,
                         "action executed",
                         action_result.saved_screenshot_path,
+                        frame_skipped=frame_skipped,
+                        match_ms=match_ms,
+                        capture_ms=capture_ms,
                     )
                     result_log_file.flush()
 
@@ -672,13 +1175,22 @@ def main() -> int:
 
                 except (AdbError, ValueError, KeyError, OSError) as exc:
                     logger.exception("[run %s/%s] Iteration failed: %s", run_index, iteration, exc)
-                    write_iteration_log(result_writer, run_index, iteration, screenshot_path, None, None, False, str(exc))
+                    previous_fingerprint = None
+                    previous_decision = None
+                    if logged_screenshot_path is None and screenshot_image is not None and save_frame(screenshot_path, screenshot_image):
+                        logged_screenshot_path = screenshot_path
+                    write_iteration_log(
+                        result_writer, run_index, iteration, logged_screenshot_path, None, None, False, str(exc)
+                    )
                     result_log_file.flush()
 
                 time.sleep(interval_seconds)
 
             logger.info("Run %s finished.", run_index)
             run_index += 1
+            if replay_dir is not None and adb.position >= len(adb.frames):
+                finish_reason = "replay finished"
+                break
             if run_stopped and not monitor_deadline:
                 if run_index > requested_runs:
                     break
@@ -695,6 +1207,10 @@ def main() -> int:
         return 3
     finally:
         result_log_file.close()
+        matcher.close()
+        if frame_source is not None:
+            frame_source.stop()
+        adb.close()
 
     report_path = create_markdown_report(
         result_log_path=result_log_path,
@@ -704,6 +1220,8 @@ def main() -> int:
         started_at=started_at,
         finished_at=datetime.now(),
         finish_reason=finish_reason,
+        matcher_stats=matcher.stats(),
+        replay_dir=replay_dir,
     )
     logger.info("Report written: %s", report_path)
     logger.info("Automation finished.")
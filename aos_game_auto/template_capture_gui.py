@@ -13,6 +13,7 @@ import cv2
 import numpy as np
 
 from adb.adb_controller import AdbController, AdbError
+from vision.template_bundle import TemplateBundle
 
 
 def get_app_dir() -> Path:
@@ -26,6 +27,9 @@ APP_DIR = get_app_dir()
 CONFIG_PATH = APP_DIR / "config" / "scenarios.json"
 SCREENSHOTS_DIR = APP_DIR / "screenshots"
 TEMPLATES_DIR = APP_DIR / "templates"
+TEMPLATE_BUNDLE_PATH = TEMPLATES_DIR / "templates.bundle"
+REFERENCE_SCREENS_DIR = TEMPLATES_DIR / "screens"
+REFERENCE_SCREEN_WIDTH = 480
 LOGS_DIR = APP_DIR / "logs"
 
 WINDOW_NAME = "AOS Template Tool"
@@ -205,6 +209,8 @@ class TemplateCaptureWindow:
         self.saving_template = False
         self.pressed_button: Optional[str] = None
         self.thumbnail_cache: dict[str, np.ndarray] = {}
+        self.template_bundle: Optional[TemplateBundle] = None
+        self.template_bundle_mtime_ns = 0
 
         self.buttons: dict[str, Tuple[int, int, int, int]] = {}
         self.font_small = cv_font("small")
@@ -451,8 +457,7 @@ class TemplateCaptureWindow:
             serial = self.adb.ensure_device()
             SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
             path = SCREENSHOTS_DIR / f"gui_capture_{int(time.time())}.png"
-            self.adb.capture_screen(path)
-            self.original_image = read_image(path)
+            self.original_image = self.adb.capture_screen(path)
             self.selection_display = None
             self.drag_start = None
             self.device_label = f"Device: {serial}"
@@ -504,13 +509,27 @@ class TemplateCaptureWindow:
         try:
             output_paths = self._save_template_burst(name, selection, burst_count, first_image)
             saved_label = output_paths[0].name if len(output_paths) == 1 else f"{len(output_paths)} templates"
+            capture_resolution = [int(first_image.shape[1]), int(first_image.shape[0])]
+            reference_screen = self._save_reference_screen(name, first_image)
             if auto_register:
                 if self._scenario_exists(name):
-                    self._register_scenario(name, output_paths, update_existing=True)
+                    self._register_scenario(
+                        name,
+                        output_paths,
+                        update_existing=True,
+                        capture_resolution=capture_resolution,
+                        reference_screen=reference_screen,
+                    )
                     self.pending_scenario_update = None
                     self.status = f"Saved and updated: {saved_label}"
                 else:
-                    self._register_scenario(name, output_paths, update_existing=False)
+                    self._register_scenario(
+                        name,
+                        output_paths,
+                        update_existing=False,
+                        capture_resolution=capture_resolution,
+                        reference_screen=reference_screen,
+                    )
                     self.status = f"Saved and registered: {saved_label}"
             else:
                 self.status = f"Saved template: {saved_label}"
@@ -569,7 +588,9 @@ class TemplateCaptureWindow:
     ) -> None:
         try:
             output_paths = self._save_template_burst(name, selection, burst_count, first_image)
-            self._replace_scenario_template_paths(scenario_index, output_paths)
+            capture_resolution = [int(first_image.shape[1]), int(first_image.shape[0])]
+            reference_screen = self._save_reference_screen(name, first_image)
+            self._replace_scenario_template_paths(scenario_index, output_paths, capture_resolution, reference_screen)
             self.thumbnail_cache.clear()
             saved_label = output_paths[0].name if len(output_paths) == 1 else f"{len(output_paths)} templates"
             self.status = f"Replaced scenario template: {name} ({saved_label})"
@@ -578,6 +599,15 @@ class TemplateCaptureWindow:
         finally:
             self.saving_template = False
 
+    def _save_reference_screen(self, name: str, image: np.ndarray) -> Path:
+        """Keep a small copy of the screen a template was cut from, as a screen-state sample."""
+        height, width = image.shape[:2]
+        scale = min(1.0, REFERENCE_SCREEN_WIDTH / max(1, width))
+        small = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        path = REFERENCE_SCREENS_DIR / f"{name}.png"
+        write_png(path, small)
+        return path
+
     def _save_template_burst(
         self,
         name: str,
@@ -598,9 +628,7 @@ class TemplateCaptureWindow:
                 image = first_image
             else:
                 self.status = f"Saving template {index}/{count}..."
-                capture_path = SCREENSHOTS_DIR / f"burst_{name}_{index:03d}_{int(time.time())}.png"
-                self.adb.capture_screen(capture_path)
-                image = read_image(capture_path)
+                image = self.adb.capture_screen()
                 time.sleep(0.12)
             if image is None:
                 raise ValueError("Capture image is missing.")
@@ -610,7 +638,13 @@ class TemplateCaptureWindow:
             output_paths.append(output_path)
         return output_paths
 
-    def _replace_scenario_template_paths(self, scenario_index: int, template_paths: list[Path]) -> None:
+    def _replace_scenario_template_paths(
+        self,
+        scenario_index: int,
+        template_paths: list[Path],
+        capture_resolution: Optional[list[int]] = None,
+        reference_screen: Optional[Path] = None,
+    ) -> None:
         config = self._load_config()
         scenarios = config.get("scenarios", [])
         if scenario_index < 0 or scenario_index >= len(scenarios):
@@ -625,6 +659,10 @@ class TemplateCaptureWindow:
             scenario.pop("templates", None)
         scenario.pop("match", None)
         scenario.pop("match_any", None)
+        if capture_resolution:
+            scenario["capture_resolution"] = capture_resolution
+        if reference_screen:
+            scenario["reference_screen"] = reference_screen.relative_to(APP_DIR).as_posix()
         self._write_config(config)
 
     def _draw(self) -> None:
@@ -1014,10 +1052,15 @@ class TemplateCaptureWindow:
         cached = self.thumbnail_cache.get(cache_key)
         if cached is not None:
             return cached
-        try:
-            image = read_image(path)
-        except (OSError, ValueError):
-            return None
+        image = None
+        bundle = self._template_bundle()
+        if bundle is not None and bundle.is_fresh(path):
+            image = bundle.read_image(path)
+        if image is None:
+            try:
+                image = read_image(path)
+            except (OSError, ValueError):
+                return None
         h, w = image.shape[:2]
         scale = min(max_w / max(1, w), max_h / max(1, h), 1.0)
         resized = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
@@ -1026,6 +1069,18 @@ class TemplateCaptureWindow:
         self.thumbnail_cache[cache_key] = resized
         return resized
 
+    def _template_bundle(self) -> Optional[TemplateBundle]:
+        """Return the compiled template bundle, reopening it when main.py has rebuilt it."""
+        try:
+            mtime_ns = TEMPLATE_BUNDLE_PATH.stat().st_mtime_ns
+        except OSError:
+            self.template_bundle = None
+            return None
+        if self.template_bundle is None or mtime_ns != self.template_bundle_mtime_ns:
+            self.template_bundle = TemplateBundle.open(TEMPLATE_BUNDLE_PATH)
+            self.template_bundle_mtime_ns = mtime_ns
+        return self.template_bundle
+
     def _draw_scenarios_overlay(self) -> None:
         x = 26
         y = TOOLBAR_HEIGHT + 24
@@ -1441,10 +1496,17 @@ class TemplateCaptureWindow:
         config = self._load_config()
         return any(scenario.get("name") == name for scenario in config.get("scenarios", []))
 
-    def _register_scenario(self, name: str, template_paths: list[Path], update_existing: bool) -> None:
+    def _register_scenario(
+        self,
+        name: str,
+        template_paths: list[Path],
+        update_existing: bool,
+        capture_resolution: Optional[list[int]] = None,
+        reference_screen: Optional[Path] = None,
+    ) -> None:
         config = self._load_config()
         scenarios = config.setdefault("scenarios", [])
-        scenario = self._scenario_from_template_paths(name, template_paths)
+        scenario = self._scenario_from_template_paths(name, template_paths, capture_resolution, reference_screen)
 
         for index, existing in enumerate(scenarios):
             if existing.get("name") == name:
@@ -1459,7 +1521,13 @@ class TemplateCaptureWindow:
         scenarios.append(scenario)
         self._write_config(config)
 
-    def _scenario_from_template_paths(self, name: str, template_paths: list[Path]) -> dict[str, Any]:
+    def _scenario_from_template_paths(
+        self,
+        name: str,
+        template_paths: list[Path],
+        capture_resolution: Optional[list[int]] = None,
+        reference_screen: Optional[Path] = None,
+    ) -> dict[str, Any]:
         relative_templates = [path.relative_to(APP_DIR).as_posix() for path in template_paths]
         scenario: dict[str, Any] = {
             "name": name,
@@ -1470,6 +1538,10 @@ class TemplateCaptureWindow:
         }
         if len(relative_templates) > 1:
             scenario["templates"] = relative_templates
+        if capture_resolution:
+            scenario["capture_resolution"] = capture_resolution
+        if reference_screen:
+            scenario["reference_screen"] = reference_screen.relative_to(APP_DIR).as_posix()
         return scenario
 
     def _find_saved_template_paths(self, name: str) -> list[Path]:
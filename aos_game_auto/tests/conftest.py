@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Modules import each other as top-level packages (`from adb.adb_controller import ...`),
+# the same way they resolve when main.py is run from this folder.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
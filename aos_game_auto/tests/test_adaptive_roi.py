@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+import pytest
+
+from test_feature_matching import textured_screen
+from vision.image_matcher import ImageMatcher
+
+
+@pytest.fixture
+def button(tmp_path):
+    patch = cv2.resize(
+        np.random.default_rng(11).integers(0, 256, (6, 12, 3), dtype=np.uint8), (96, 48), interpolation=cv2.INTER_NEAREST
+    )
+    cv2.imwrite(str(tmp_path / "button.png"), patch)
+    return patch
+
+
+def frame_with(button, left, top):
+    frame = textured_screen(seed=3)
+    frame[top : top + button.shape[0], left : left + button.shape[1]] = button
+    return frame
+
+
+def find(matcher, frame, tmp_path, **match_config):
+    scenario = {"name": "button", "match_any": [{"type": "template", "template": "button.png", **match_config}]}
+    return matcher.find_first_match(None, [scenario], tmp_path, screenshot_image=frame)
+
+
+def test_prior_region_is_searched_first_and_falls_back_to_the_full_area(button, tmp_path):
+    matcher = ImageMatcher(adaptive_roi=True, roi_padding=16)
+    first = find(matcher, frame_with(button, 100, 80), tmp_path)
+    assert (first.top_left_x, first.top_left_y) == (100, 80)
+    assert matcher.counters["adaptive_roi"] == {"prior_hits": 0, "prior_misses": 0}
+
+    again = find(matcher, frame_with(button, 104, 84), tmp_path)
+    assert (again.top_left_x, again.top_left_y) == (104, 84)
+    assert matcher.counters["adaptive_roi"]["prior_hits"] == 1
+
+    moved = find(matcher, frame_with(button, 480, 360), tmp_path)
+    assert (moved.top_left_x, moved.top_left_y) == (480, 360)
+    assert matcher.counters["adaptive_roi"] == {"prior_hits": 1, "prior_misses": 1}
+    assert matcher.hit_regions[str(tmp_path / "button.png")] == (moved.center_x, moved.center_y)
+
+
+def test_search_area_limits_template_matches(button, tmp_path):
+    matcher = ImageMatcher()
+    frame = frame_with(button, 480, 360)
+    assert find(matcher, frame, tmp_path, search_area={"x": 0, "y": 0, "w": 320, "h": 240}) is None
+    inside = find(matcher, frame, tmp_path, search_area={"x": 400, "y": 300, "w": 240, "h": 180})
+    assert (inside.top_left_x, inside.top_left_y) == (480, 360)
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+from adb.adb_controller import AdbController, AdbError
+from adb.shell_session import AdbShellSession, AdbShellSessionError
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell script as a fake adb")
+
+
+class FakeTracker:
+    def __init__(self):
+        self.stopped = 0
+
+    def stop(self):
+        self.stopped += 1
+
+
+@pytest.fixture
+def fake_adb(tmp_path):
+    """An `adb` that runs every shell command, and the interactive `adb shell`, in a local sh."""
+    script = tmp_path / "adb"
+    script.write_text(
+        "#!/bin/sh\n"
+        'while [ "$#" -gt 0 ] && [ "$1" != shell ]; do shift; done\n'
+        "shift\n"
+        'if [ "$#" -eq 0 ]; then exec sh; fi\n'
+        f'echo "$*" >> "{tmp_path / "one_shot.log"}"\n'
+        'exec sh -c "$*"\n'
+    )
+    os.chmod(script, 0o755)
+    return str(script)
+
+
+def test_shell_session_restarts_keep_device_tracker(fake_adb):
+    adb = AdbController(adb_path=fake_adb, device_id="emu-1", persistent_shell=True)
+    tracker = FakeTracker()
+    adb._device_tracker = tracker
+    try:
+        assert adb._shell(["echo", "first"]) == "first\n"
+        adb._shell_session.close()
+        assert adb._shell(["echo", "respawned"]) == "respawned\n"
+        adb.device_id = "emu-2"
+        assert adb._shell(["echo", "switched"]) == "switched\n"
+        assert tracker.stopped == 0
+        assert adb._device_tracker is tracker
+    finally:
+        adb.close()
+    assert tracker.stopped == 1
+    assert adb._shell_session is None
+
+
+def test_timed_out_session_command_is_not_repeated(fake_adb, tmp_path):
+    adb = AdbController(adb_path=fake_adb, device_id="emu-1", persistent_shell=True)
+    try:
+        with pytest.raises(AdbError, match="timed out"):
+            adb._shell(["sleep", "3"], timeout=1)
+        assert adb._shell_session is None
+        assert not (tmp_path / "one_shot.log").exists()
+    finally:
+        adb.close()
+
+
+def test_unsent_session_command_falls_back_to_one_shot_call(fake_adb, tmp_path, monkeypatch):
+    def broken_pipe(self, command, timeout):
+        raise AdbShellSessionError("adb shell session pipe closed: [Errno 32] Broken pipe")
+
+    monkeypatch.setattr(AdbShellSession, "run", broken_pipe)
+    adb = AdbController(adb_path=fake_adb, device_id="emu-1", persistent_shell=True)
+    try:
+        assert adb._shell(["echo", "again"]) == "again\n"
+        assert (tmp_path / "one_shot.log").read_text() == "echo again\n"
+    finally:
+        adb.close()
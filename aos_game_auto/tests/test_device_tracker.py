@@ -0,0 +1,68 @@
+import queue
+import socket
+import struct
+import threading
+
+from adb.host_protocol import AdbHostClient, DeviceTracker
+
+
+class FakeTrackServer:
+    """Serves host:track-devices-l; each accepted connection gets the lists put on `lists`.
+
+    Putting None aborts the connection with RST, like a killed adb server.
+    """
+
+    def __init__(self):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.lists: "queue.Queue" = queue.Queue()
+        self.connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with connection:
+                length = int(connection.recv(4), 16)
+                assert connection.recv(length) == b"host:track-devices-l"
+                connection.sendall(b"OKAY")
+                while True:
+                    text = self.lists.get()
+                    if text is None:
+                        connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                        break
+                    connection.sendall(f"{len(text):04x}{text}".encode())
+
+    def close(self) -> None:
+        self.listener.close()
+
+
+def test_tracker_clears_table_and_reconnects_after_reset():
+    server = FakeTrackServer()
+    changes = []
+    tracker = DeviceTracker(AdbHostClient(port=server.port, timeout=3), on_change=changes.append, retry_seconds=0.05)
+    try:
+        server.lists.put("emu-1\tdevice model:Pixel\n")
+        tracker.start()
+        assert tracker.wait_for_change(0, timeout=3)
+        generation, _ = tracker.snapshot()
+        assert tracker.table() == {"emu-1": {"state": "device", "model": "Pixel"}}
+
+        server.lists.put(None)
+        assert tracker.wait_for_change(generation, timeout=3)
+        assert tracker.snapshot() is None
+
+        server.lists.put("emu-2\tdevice\n")
+        assert tracker.wait_for_change(generation + 1, timeout=3)
+        assert tracker.table() == {"emu-2": {"state": "device"}}
+        assert changes[-1] == {"emu-2": {"state": "device"}}
+        assert server.connections == 2
+    finally:
+        tracker.stop()
+        server.close()
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pytest
+
+from vision.image_matcher import ImageMatcher
+
+
+def textured_screen(seed: int = 7) -> np.ndarray:
+    """Blocky color noise: plenty of distinct ORB corners everywhere on the screen."""
+    small = np.random.default_rng(seed).integers(0, 255, (60, 80, 3), dtype=np.uint8)
+    return cv2.resize(small, (640, 480), interpolation=cv2.INTER_NEAREST)
+
+
+@pytest.fixture
+def setup(tmp_path):
+    screen = textured_screen()
+    crops = {"left": screen[60:220, 40:240], "right": screen[240:400, 380:580]}
+    for name, crop in crops.items():
+        cv2.imwrite(str(tmp_path / f"{name}.png"), crop)
+    scenarios = [
+        {"name": "left", "match_any": [{"type": "features", "template": "left.png", "threshold": 0.3}]},
+        {"name": "right", "match_any": [{"type": "features", "template": "right.png", "threshold": 0.3}]},
+    ]
+    return screen, scenarios
+
+
+def test_find_all_matches_keeps_the_full_feature_index(setup, tmp_path):
+    screen, scenarios = setup
+    matcher = ImageMatcher()
+    first = matcher.find_first_match(None, scenarios, tmp_path, screenshot_image=screen)
+    assert first is not None and first.scenario["name"] == "left"
+    version = matcher.feature_index.version
+
+    matches = matcher.find_all_matches(None, scenarios[1], tmp_path, screenshot_image=screen)
+    assert [match.scenario["name"] for match in matches] == ["right"]
+    matcher.find_first_match(None, scenarios, tmp_path, screenshot_image=screen)
+    assert matcher.feature_index.version == version
+
+
+def test_find_all_matches_adds_templates_missing_from_the_index(setup, tmp_path):
+    screen, scenarios = setup
+    matcher = ImageMatcher()
+    matcher.find_first_match(None, scenarios[:1], tmp_path, screenshot_image=screen)
+    matches = matcher.find_all_matches(None, scenarios[1], tmp_path, screenshot_image=screen)
+    assert len(matches) == 1
+    assert abs(matches[0].center_x - 480) <= 4 and abs(matches[0].center_y - 320) <= 4
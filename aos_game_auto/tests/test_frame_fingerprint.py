@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+from test_feature_matching import textured_screen
+from vision.frame_fingerprint import FrameChangeDetector, FrameFingerprint, fingerprint_frame
+
+
+def with_dhash(fingerprint, bits):
+    return FrameFingerprint(fingerprint.shape, fingerprint.dhash ^ bits, fingerprint.thumbnail)
+
+
+def test_hash_distance_threshold():
+    fingerprint = fingerprint_frame(textured_screen())
+    detector = FrameChangeDetector(max_hash_distance=2)
+    assert detector.is_unchanged(fingerprint, with_dhash(fingerprint, 0b11))
+    assert not detector.is_unchanged(fingerprint, with_dhash(fingerprint, 0b111))
+    assert FrameChangeDetector(max_hash_distance=3).is_unchanged(fingerprint, with_dhash(fingerprint, 0b111))
+
+
+def test_sensor_noise_is_unchanged_but_a_small_button_is_not():
+    screen = cv2.GaussianBlur(textured_screen(), (31, 31), 0)
+    detector = FrameChangeDetector()
+    noisy = np.clip(screen.astype(np.int16) + np.random.default_rng(1).integers(-2, 3, screen.shape), 0, 255)
+    assert detector.is_unchanged(fingerprint_frame(screen), fingerprint_frame(noisy.astype(np.uint8)))
+
+    popup = screen.copy()
+    cv2.rectangle(popup, (300, 200), (340, 230), (255, 255, 255), -1)
+    first, second = fingerprint_frame(screen), fingerprint_frame(popup)
+    assert bin(first.dhash ^ second.dhash).count("1") <= detector.max_hash_distance
+    assert not detector.is_unchanged(first, second)
+
+
+def test_first_frame_and_resolution_change_are_always_matched():
+    screen = textured_screen()
+    detector = FrameChangeDetector()
+    assert not detector.is_unchanged(None, fingerprint_frame(screen))
+    rotated = fingerprint_frame(cv2.resize(screen, (480, 640)))
+    assert not detector.is_unchanged(fingerprint_frame(screen), rotated)
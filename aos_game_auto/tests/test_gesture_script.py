@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+from adb.gesture_script import GestureScript, escape_input_text
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="parses the script with a local POSIX sh")
+
+# Stand-in for the device's `input` command: prints each argument it receives on its own line.
+FAKE_INPUT = 'input() { for arg in "$@"; do printf "%s\\n" "$arg"; done; }; '
+
+
+def device_args(script: str) -> list[str]:
+    return subprocess.run(["sh", "-c", FAKE_INPUT + script], capture_output=True, text=True, check=True).stdout.splitlines()
+
+
+def test_text_step_reaches_input_unchanged_apart_from_spaces():
+    text = r"a b\c;d&e 'f' $HOME"
+    script = GestureScript().text(text).keyevent("KEYCODE_ENTER")
+    assert device_args(script.to_shell()) == [
+        "text",
+        r"a%sb\c;d&e%s'f'%s$HOME",
+        "keyevent",
+        "KEYCODE_ENTER",
+    ]
+
+
+def test_text_step_types_the_same_as_input_text():
+    # AdbController.input_text sends the escaped text unquoted, so the device shell removes one backslash level.
+    text = r"C:\path with space"
+    unquoted = device_args(f"input text {escape_input_text(text)}")
+    assert device_args(GestureScript().text(text).to_shell()) == unquoted == ["text", r"C:\path%swith%sspace"]
+
+
+def test_steps_are_joined_with_sleeps():
+    script = GestureScript().tap(10, 20).sleep(0.25).swipe(1, 2, 3, 4, 300)
+    assert script.to_shell() == "input tap 10 20 && sleep 0.25 && input swipe 1 2 3 4 300"
+    assert script.duration_seconds == pytest.approx(0.55)
@@ -0,0 +1,192 @@
+import socket
+import struct
+import threading
+from pathlib import Path
+
+import pytest
+
+from adb.host_protocol import AdbConnectionLost, AdbHostClient, AdbProtocolError, parse_device_table
+
+DEVICE_LIST = "emu-1\tdevice product:sdk model:Pixel_7 transport_id:1\nold-1\tdevice model:Nexus\n"
+FEATURES = {"emu-1": "shell_v2,cmd,stat_v2", "old-1": ""}
+PULLED = b"x" * 100_000
+
+
+def _read_exact(connection: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("client closed")
+        data += chunk
+    return data
+
+
+def _read_request(connection: socket.socket) -> str:
+    length = int(_read_exact(connection, 4), 16)
+    return _read_exact(connection, length).decode()
+
+
+def _okay(connection: socket.socket, payload: str = None) -> None:
+    reply = b"OKAY"
+    if payload is not None:
+        reply += f"{len(payload):04x}{payload}".encode()
+    connection.sendall(reply)
+
+
+def _fail(connection: socket.socket, message: str) -> None:
+    connection.sendall(f"FAIL{len(message):04x}{message}".encode())
+
+
+def _shell_v2_packet(packet_id: int, payload: bytes) -> bytes:
+    return struct.pack("<BI", packet_id, len(payload)) + payload
+
+
+class FakeAdbServer:
+    """Answers the host-protocol services the client uses, one connection per request."""
+
+    def __init__(self):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.reset_next = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection: socket.socket) -> None:
+        with connection:
+            try:
+                self._serve(connection)
+            except (ConnectionError, OSError):
+                pass
+
+    def _serve(self, connection: socket.socket) -> None:
+        request = _read_request(connection)
+        if self.reset_next:
+            # Abort with RST, like a killed adb server.
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            return
+        if request == "host:devices-l":
+            _okay(connection, DEVICE_LIST)
+            return
+        if request.startswith("host-serial:") and request.endswith(":features"):
+            serial = request.split(":")[1]
+            if serial in FEATURES:
+                _okay(connection, FEATURES[serial])
+            else:
+                _fail(connection, f"device '{serial}' not found")
+            return
+        if not request.startswith("host:transport:"):
+            _fail(connection, f"unknown host service {request}")
+            return
+        serial = request.split(":", 2)[2]
+        if serial not in FEATURES:
+            _fail(connection, f"device '{serial}' not found")
+            return
+        _okay(connection)
+        service = _read_request(connection)
+        _okay(connection)
+        if service.startswith("shell,v2,raw:"):
+            connection.sendall(
+                _shell_v2_packet(1, b"out ")
+                + _shell_v2_packet(2, b"err")
+                + _shell_v2_packet(1, b"more")
+                + _shell_v2_packet(3, b"\x03")
+            )
+        elif service.startswith("shell:"):
+            connection.sendall(b"legacy " + service[len("shell:") :].encode())
+        elif service.startswith("exec:"):
+            connection.sendall(b"\x00\x01\xffbinary")
+        elif service == "sync:":
+            self._serve_sync(connection)
+
+    def _serve_sync(self, connection: socket.socket) -> None:
+        kind, length = _read_exact(connection, 4), struct.unpack("<I", _read_exact(connection, 4))[0]
+        path = _read_exact(connection, length).decode()
+        assert kind == b"RECV"
+        if path == "/sdcard/missing.txt":
+            message = b"No such file or directory"
+            connection.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+            return
+        for start in range(0, len(PULLED), 64 * 1024):
+            chunk = PULLED[start : start + 64 * 1024]
+            connection.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+        connection.sendall(b"DONE" + struct.pack("<I", 0))
+        assert _read_exact(connection, 8)[:4] == b"QUIT"
+
+    def close(self) -> None:
+        self.listener.close()
+
+
+@pytest.fixture
+def server():
+    fake = FakeAdbServer()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def client(server):
+    return AdbHostClient(port=server.port, timeout=5)
+
+
+def test_devices_long_listing(client):
+    text = client.devices()
+    assert text == DEVICE_LIST
+    table = parse_device_table(text)
+    assert table["emu-1"] == {"state": "device", "product": "sdk", "model": "Pixel_7", "transport_id": "1"}
+    assert table["old-1"]["model"] == "Nexus"
+
+
+def test_shell_v2_separates_stderr_and_reports_exit_code(client):
+    assert client.shell("emu-1", "ls /nope") == (3, b"out more", b"err")
+
+
+def test_shell_without_v2_returns_everything_as_stdout(client):
+    assert client.shell("old-1", "echo hi") == (None, b"legacy echo hi", b"")
+
+
+def test_exec_out_returns_raw_bytes(client):
+    assert client.exec_out("emu-1", "screencap") == b"\x00\x01\xffbinary"
+
+
+def test_unknown_device_raises_protocol_error(client):
+    with pytest.raises(AdbProtocolError, match="not found"):
+        client.shell("gone-1", "true")
+
+
+def test_pull_writes_file_from_data_chunks(client, tmp_path):
+    target = tmp_path / "out" / "log.txt"
+    assert client.pull("emu-1", "/sdcard/log.txt", target) == len(PULLED)
+    assert target.read_bytes() == PULLED
+    assert not target.with_name("log.txt.part").exists()
+
+
+def test_pull_fail_reply_raises(client, tmp_path):
+    with pytest.raises(AdbProtocolError, match="No such file"):
+        client.pull("emu-1", "/sdcard/missing.txt", tmp_path / "missing.txt")
+    assert not (tmp_path / "missing.txt").exists()
+    assert not (tmp_path / "missing.txt.part").exists()
+
+
+def test_connection_reset_becomes_protocol_error(server, client):
+    server.reset_next = True
+    with pytest.raises(AdbConnectionLost):
+        client.devices()
+
+
+def test_qa_collector_copy_matches():
+    """qa-issue-collector cannot import this package, so it ships a copy that must stay identical."""
+    copy = Path(__file__).resolve().parents[2] / "qa-issue-collector" / "src" / "adb_protocol.py"
+    if not copy.exists():
+        pytest.skip("qa-issue-collector is not checked out next to aos_game_auto")
+    original = Path(__file__).resolve().parents[1] / "adb" / "host_protocol.py"
+    assert copy.read_bytes() == original.read_bytes(), "Copy adb/host_protocol.py to qa-issue-collector/src/adb_protocol.py"
@@ -0,0 +1,30 @@
+import logging
+
+import pytest
+
+from vision import ocr_backend
+from vision.ocr_backend import OcrBackend, PytesseractBackend, TesserocrBackend, create_ocr_backend
+
+
+@pytest.fixture
+def both_installed(monkeypatch):
+    monkeypatch.setattr(ocr_backend, "pytesseract", object())
+    monkeypatch.setattr(ocr_backend, "tesserocr", object())
+
+
+def test_backend_must_implement_image_to_data():
+    with pytest.raises(TypeError):
+        OcrBackend()
+
+
+def test_pytesseract_stays_the_default_when_tesserocr_is_installed(both_installed):
+    assert isinstance(create_ocr_backend(), PytesseractBackend)
+    assert isinstance(create_ocr_backend("auto"), TesserocrBackend)
+    assert isinstance(create_ocr_backend("tesserocr"), TesserocrBackend)
+
+
+def test_unknown_backend_name_warns(both_installed, caplog):
+    with caplog.at_level(logging.WARNING):
+        backend = create_ocr_backend("tesseract")
+    assert isinstance(backend, PytesseractBackend)
+    assert "Unknown ocr_backend 'tesseract'" in caplog.text
@@ -0,0 +1,49 @@
+import numpy as np
+
+from vision.ocr_cache import OcrResultCache
+
+OCR_DATA = {"text": ["START"], "conf": [91.0], "left": [4], "top": [2], "width": [40], "height": [12], "level": [5]}
+
+
+def roi(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (20, 30), dtype=np.uint8)
+
+
+def test_key_covers_pixels_shape_language_and_backend():
+    image = roi()
+    key = OcrResultCache.key(image, "eng", "tesserocr")
+    assert OcrResultCache.key(image.copy(), "eng", "tesserocr") == key
+    wide = np.zeros((20, 60), dtype=np.uint8)
+    wide[:, ::2] = image
+    assert OcrResultCache.key(wide[:, ::2], "eng", "tesserocr") == key
+    assert OcrResultCache.key(roi(1), "eng", "tesserocr") != key
+    assert OcrResultCache.key(image, "kor+eng", "tesserocr") != key
+    assert OcrResultCache.key(image, "eng", "pytesseract") != key
+    assert OcrResultCache.key(image.reshape(30, 20), "eng", "tesserocr") != key
+
+
+def test_lru_keeps_only_the_matching_columns():
+    cache = OcrResultCache(max_entries=2)
+    stored = cache.put("a", OCR_DATA)
+    assert "level" not in stored and stored["text"] == ["START"]
+    cache.put("b", OCR_DATA)
+    assert cache.get("a") is not None
+    cache.put("c", OCR_DATA)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = OcrResultCache(max_entries=0)
+    assert cache.put("a", OCR_DATA)["text"] == ["START"]
+    assert cache.get("a") is None
+
+
+def test_entries_persist_between_runs(tmp_path):
+    path = tmp_path / "ocr_cache.json"
+    cache = OcrResultCache(max_entries=8, persist_path=path)
+    key = OcrResultCache.key(roi(), "eng", "tesserocr")
+    cache.put(key, OCR_DATA)
+    cache.save()
+    assert OcrResultCache(max_entries=8, persist_path=path).get(key)["text"] == ["START"]
@@ -0,0 +1,53 @@
+import os
+
+import cv2
+import pytest
+
+from test_feature_matching import textured_screen
+from vision.image_matcher import ImageMatcher
+
+
+@pytest.fixture
+def scenarios(tmp_path):
+    screen = textured_screen()
+    cv2.imwrite(str(tmp_path / "a.png"), screen[60:120, 40:120])
+    cv2.imwrite(str(tmp_path / "b.png"), screen[300:360, 400:480])
+    return screen, [
+        {"name": "missing", "match_any": [{"type": "template", "template": "b.png", "threshold": 1.01}]},
+        {"name": "b", "match_any": [{"type": "template", "template": "b.png"}]},
+        {"name": "a", "match_any": [{"type": "template", "template": "a.png"}]},
+    ]
+
+
+def test_pool_is_sized_to_the_cpu_cores_by_default():
+    assert ImageMatcher().match_workers == (os.cpu_count() or 1)
+    assert ImageMatcher(match_workers=3).match_workers == 3
+
+
+@pytest.mark.parametrize("workers", [1, 2, 8])
+def test_parallel_pool_picks_the_serial_match(scenarios, tmp_path, workers):
+    screen, configs = scenarios
+    matcher = ImageMatcher(match_workers=workers)
+    try:
+        match = matcher.find_first_match(None, configs, tmp_path, screenshot_image=screen)
+    finally:
+        matcher.close()
+    assert match.scenario["name"] == "b"
+    assert (match.center_x, match.center_y) == (440, 330)
+    # Scenario "a" also matches when the window reaches it, but only the winner becomes an ROI prior.
+    assert matcher.hit_regions == {str(tmp_path / "b.png"): (440, 330)}
+
+
+def test_pool_stops_submitting_after_a_match(scenarios, tmp_path, monkeypatch):
+    screen, configs = scenarios
+    many = [configs[1]] + [dict(configs[2], name=f"later{index}") for index in range(20)]
+    matcher = ImageMatcher(match_workers=2)
+    calls = []
+    original = matcher._match_template
+    monkeypatch.setattr(matcher, "_match_template", lambda *args: calls.append(args[1]) or original(*args))
+    try:
+        match = matcher.find_first_match(None, many, tmp_path, screenshot_image=screen)
+    finally:
+        matcher.close()
+    assert match.scenario["name"] == "b"
+    assert len(calls) <= 2
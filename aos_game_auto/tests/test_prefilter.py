@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.vision_pipeline import synthetic_screen
+from vision.image_matcher import ImageMatcher
+
+
+@pytest.fixture(scope="module")
+def screen():
+    return synthetic_screen(1280, 720, seed=1280)
+
+
+def crops(screen, count, seed=4):
+    rng = np.random.default_rng(seed)
+    height, width = screen.shape[:2]
+    for _ in range(count):
+        crop_w, crop_h = int(rng.integers(24, 200)), int(rng.integers(16, 120))
+        x, y = int(rng.integers(0, width - crop_w)), int(rng.integers(0, height - crop_h))
+        yield x, y, screen[y : y + crop_h, x : x + crop_w]
+
+
+@pytest.mark.parametrize("noise", [0, 3])
+def test_prefilter_never_rejects_a_template_on_screen(screen, tmp_path, noise):
+    # Exact crops must pass even without a margin; noisy frames rely on the default margin.
+    margin = 0.0 if noise == 0 else 0.25
+    frame = screen
+    if noise:
+        jitter = np.random.default_rng(9).integers(-noise, noise + 1, screen.shape)
+        frame = np.clip(screen.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+    matcher = ImageMatcher(prefilter=True, prefilter_margin=margin)
+    unfiltered = ImageMatcher()
+    for index, (x, y, crop) in enumerate(crops(screen, 15)):
+        path = tmp_path / f"crop_{index}.png"
+        cv2.imwrite(str(path), crop)
+        expected = unfiltered.find_template(None, path, 0.5, screenshot_image=frame)
+        match = matcher.find_template(None, path, 0.5, screenshot_image=frame)
+        assert expected is not None
+        assert match is not None, f"crop {index} at {(x, y)} was rejected"
+        assert (match.score, match.top_left_x, match.top_left_y) == (expected.score, expected.top_left_x, expected.top_left_y)
+    assert matcher.counters["prefilter"] == {"checked": 15, "skipped": 0}
+
+
+def test_prefilter_skips_colors_the_screen_does_not_have(screen, tmp_path):
+    path = tmp_path / "magenta.png"
+    patch = np.zeros((40, 80, 3), dtype=np.uint8)
+    patch[:, :40] = (255, 0, 255)
+    patch[:, 40:] = (0, 255, 0)
+    cv2.imwrite(str(path), patch)
+    matcher = ImageMatcher(prefilter=True)
+    assert matcher.find_template(None, path, 0.8, screenshot_image=screen) is None
+    assert matcher.counters["prefilter"] == {"checked": 1, "skipped": 1}
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.vision_pipeline import synthetic_screen
+from vision.image_matcher import ImageMatcher
+
+THRESHOLD = 0.95
+
+
+@pytest.fixture(scope="module")
+def screen():
+    return synthetic_screen(1920, 1080, seed=1920)
+
+
+def random_crops(screen, count, seed=3):
+    rng = np.random.default_rng(seed)
+    height, width = screen.shape[:2]
+    for _ in range(count):
+        crop_w, crop_h = int(rng.integers(40, 260)), int(rng.integers(30, 160))
+        x, y = int(rng.integers(0, width - crop_w)), int(rng.integers(0, height - crop_h))
+        yield x, y, screen[y : y + crop_h, x : x + crop_w]
+
+
+def test_pyramid_finds_every_crop_full_finds(screen, tmp_path):
+    # On the gradient background the coarse map is close to 1.0 in many places, so the
+    # true position is not always among the refined peaks; the full-resolution fallback must catch it.
+    matcher = ImageMatcher()
+    for index, (x, y, crop) in enumerate(random_crops(screen, 22)):
+        path = tmp_path / f"crop_{index}.png"
+        cv2.imwrite(str(path), crop)
+        full = matcher.find_template(None, path, THRESHOLD, screenshot_image=screen, strategy="full")
+        pyramid = matcher.find_template(None, path, THRESHOLD, screenshot_image=screen, strategy="pyramid")
+        assert full is not None
+        assert pyramid is not None, f"crop {index} at {(x, y)} was missed by the pyramid"
+        assert pyramid.score == pytest.approx(full.score, abs=1e-3)
+
+
+def test_pyramid_does_not_fall_back_when_the_template_is_clearly_absent(screen, tmp_path):
+    rng = np.random.default_rng(5)
+    noise = cv2.resize(rng.integers(0, 256, (12, 20, 3), dtype=np.uint8), (160, 96), interpolation=cv2.INTER_NEAREST)
+    path = tmp_path / "absent.png"
+    cv2.imwrite(str(path), noise)
+    matcher = ImageMatcher()
+    assert matcher.find_template(None, path, 0.9, screenshot_image=screen, strategy="pyramid") is None
+    assert matcher.counters["pyramid"] == {"searches": 1, "full_fallbacks": 0}
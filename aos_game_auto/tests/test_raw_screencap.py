@@ -0,0 +1,54 @@
+import struct
+
+import numpy as np
+import pytest
+
+from adb.raw_screencap import RAW_FORMAT_BGRA_8888, RAW_FORMAT_RGBA_8888, parse_raw_screencap
+
+WIDTH, HEIGHT = 4, 3
+
+
+def rgba_pixels():
+    pixels = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    pixels[..., 0] = 200  # red
+    pixels[..., 1] = 100  # green
+    pixels[..., 2] = 10  # blue
+    pixels[..., 3] = 255
+    return pixels
+
+
+@pytest.mark.parametrize("color_space", [None, 1])
+def test_header_with_and_without_color_space(color_space):
+    header = struct.pack("<3I", WIDTH, HEIGHT, RAW_FORMAT_RGBA_8888)
+    if color_space is not None:
+        header += struct.pack("<I", color_space)
+    capture = parse_raw_screencap(header + rgba_pixels().tobytes())
+    assert (capture.width, capture.height, capture.pixel_format) == (WIDTH, HEIGHT, RAW_FORMAT_RGBA_8888)
+    bgr = capture.to_bgr()
+    assert bgr.shape == (HEIGHT, WIDTH, 3)
+    assert tuple(bgr[0, 0]) == (10, 100, 200)
+
+
+def test_bgra_pixels_keep_their_channel_order():
+    pixels = rgba_pixels()[..., [2, 1, 0, 3]]
+    data = struct.pack("<3I", WIDTH, HEIGHT, RAW_FORMAT_BGRA_8888) + np.ascontiguousarray(pixels).tobytes()
+    assert tuple(parse_raw_screencap(data).to_bgr()[2, 3]) == (10, 100, 200)
+
+
+def test_pixels_are_a_view_of_the_buffer():
+    data = struct.pack("<3I", WIDTH, HEIGHT, RAW_FORMAT_RGBA_8888) + rgba_pixels().tobytes()
+    assert np.shares_memory(parse_raw_screencap(data).pixels, np.frombuffer(data, dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"\x00" * 8, "too short"),
+        (struct.pack("<3I", WIDTH, HEIGHT, 99) + bytes(WIDTH * HEIGHT * 4), "pixel format 99"),
+        (struct.pack("<3I", WIDTH, HEIGHT, RAW_FORMAT_RGBA_8888) + bytes(WIDTH * HEIGHT * 4 - 1), "does not match"),
+        (struct.pack("<3I", WIDTH, HEIGHT, RAW_FORMAT_RGBA_8888) + bytes(WIDTH * HEIGHT * 4 + 8), "does not match"),
+    ],
+)
+def test_malformed_output_is_rejected(data, message):
+    with pytest.raises(ValueError, match=message):
+        parse_raw_screencap(data)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def write_report(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "REPORTS_DIR", tmp_path / "reports")
+    log_path = tmp_path / "results.csv"
+    log_path.write_text("time,run_index,iteration,scenario_name,message,success\n", encoding="utf-8")
+
+    def write(replay_dir=None) -> str:
+        started = datetime(2026, 1, 1, 12, 0, 0)
+        finished = datetime(2026, 1, 1, 12, 5, 0)
+        path = main.create_markdown_report(log_path, {}, {}, None, started, finished, "done", replay_dir=replay_dir)
+        return path.read_text(encoding="utf-8")
+
+    return write
+
+
+def test_replay_line_only_in_replay_mode(write_report, tmp_path):
+    assert "Replay" not in write_report()
+    assert f"- Replay: {tmp_path / 'frames'}" in write_report(tmp_path / "frames")
@@ -0,0 +1,41 @@
+from vision.scenario_scheduler import ScenarioScheduler
+
+
+def names(scenarios):
+    return [scenario["name"] for scenario in scenarios]
+
+
+def test_hits_move_scenarios_forward_within_a_priority():
+    a, b, c = {"name": "a"}, {"name": "b"}, {"name": "c"}
+    scheduler = ScenarioScheduler(decay=0.5)
+    assert names(scheduler.order([a, b, c])) == ["a", "b", "c"]
+    scheduler.record(c)
+    scheduler.record(b)
+    assert names(scheduler.order([a, b, c])) == ["b", "c", "a"]
+    scheduler.record(c)
+    assert names(scheduler.order([a, b, c])) == ["c", "b", "a"]
+    assert (scheduler.hits, scheduler.iterations) == (3, 3)
+
+
+def test_old_hits_fade_out():
+    a, b = {"name": "a"}, {"name": "b"}
+    scheduler = ScenarioScheduler(decay=0.5)
+    for _ in range(3):
+        scheduler.record(b)
+    scheduler.record(a)
+    scheduler.record(a)
+    scheduler.record(a)
+    # b: 1.75 * 0.125 = 0.22; a: 1 + 0.5 + 0.25 = 1.75
+    assert names(scheduler.order([a, b])) == ["a", "b"]
+    for _ in range(40):
+        scheduler.record(None)
+    assert names(scheduler.order([b, a])) == ["b", "a"]
+
+
+def test_priority_always_wins_over_learned_order():
+    popup = {"name": "popup", "priority": 10}
+    a, b = {"name": "a"}, {"name": "b", "priority": "bad"}
+    scheduler = ScenarioScheduler()
+    for _ in range(5):
+        scheduler.record(b)
+    assert names(scheduler.order([a, b, popup])) == ["popup", "b", "a"]
@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+av = pytest.importorskip("av")
+
+from adb.scrcpy_stream import ScrcpyFrameSource, StreamFrameSource  # noqa: E402
+
+WIDTH, HEIGHT, FRAMES = 64, 48, 12
+
+
+def encode_h264(frame_count: int = FRAMES) -> bytes:
+    """Encode a short Annex B H.264 stream whose frames get brighter one step at a time."""
+    try:
+        codec = av.CodecContext.create("h264", "w")
+    except (av.FFmpegError, ValueError) as exc:
+        pytest.skip(f"no H.264 encoder in this PyAV build: {exc}")
+    codec.width, codec.height, codec.pix_fmt = WIDTH, HEIGHT, "yuv420p"
+    codec.framerate = 30
+    codec.options = {"preset": "ultrafast", "tune": "zerolatency"}
+    data = b""
+    for index in range(frame_count):
+        image = np.full((HEIGHT, WIDTH, 3), index * 20, dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(image, format="bgr24")
+        frame.pts = index
+        data += b"".join(bytes(packet) for packet in codec.encode(frame))
+    data += b"".join(bytes(packet) for packet in codec.encode(None))
+    return data
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("stream") / "rec.h264"
+    path.write_bytes(encode_h264())
+    return path
+
+
+def test_from_file_decodes_every_frame(recording):
+    source = StreamFrameSource.from_file(recording).start()
+    try:
+        index, image = source.wait_frame(0, timeout=5)
+        assert index >= 1
+        assert image.shape == (HEIGHT, WIDTH, 3)
+        source._thread.join(timeout=5)
+        assert source.finished
+        assert source.frames_decoded == FRAMES
+        # The last frame is the brightest; the YUV round-trip shifts levels by a few steps.
+        assert abs(int(source.latest_frame().mean()) - (FRAMES - 1) * 20) < 10
+    finally:
+        source.stop()
+
+
+class FakeAdb:
+    def __init__(self):
+        self.calls = []
+
+    def push(self, local_path, remote_path):
+        self.calls.append("push")
+
+    def forward(self, local, remote):
+        self.calls.append("forward")
+
+    def remove_forward(self, local):
+        self.calls.append("remove_forward")
+
+    def spawn_shell(self, args):
+        self.calls.append("spawn_shell")
+        return FinishedProcess()
+
+
+class FinishedProcess:
+    returncode = 0
+
+    def poll(self):
+        return 0
+
+
+class RecordedScrcpySource(ScrcpyFrameSource):
+    """ScrcpyFrameSource whose "socket" replays a recording and then closes, like a replugged device."""
+
+    def __init__(self, adb, server_path, data):
+        super().__init__(adb, server_path)
+        self.data = data
+        self.connects = 0
+
+    def _connect(self, timeout=5.0):
+        self.connects += 1
+        self._first_chunk = self.data
+
+
+def test_restart_after_stream_end_keeps_counting_frames(recording, tmp_path):
+    server = tmp_path / "scrcpy-server"
+    server.write_bytes(b"jar")
+    adb = FakeAdb()
+    source = RecordedScrcpySource(adb, server, recording.read_bytes()).start()
+    try:
+        last_index, _ = source.wait_frame(0, timeout=5)
+        source._thread.join(timeout=5)
+        assert source.finished
+        first_run = source.frame_index
+
+        source.restart()
+        index, image = source.wait_frame(first_run, timeout=5)
+        assert index > first_run >= last_index
+        assert image.shape == (HEIGHT, WIDTH, 3)
+        assert source.connects == 2
+        assert adb.calls.count("spawn_shell") == 2
+    finally:
+        source.stop()
+
+
+def test_loop_uses_screencap_while_stream_cannot_restart():
+    import main
+    from adb.adb_controller import AdbError
+
+    class DownSource:
+        finished = True
+        error = "server killed"
+
+        def restart(self):
+            raise AdbError("no video stream on tcp:27183 within 5s")
+
+    class ScreencapAdb:
+        device_id = "emu-1"
+
+        def ensure_device(self, preferred_device_id=None):
+            return preferred_device_id
+
+        def capture_screen(self):
+            return "screencap frame"
+
+    assert main.read_stream_frame(DownSource(), ScreencapAdb(), 7) == (7, "screencap frame")
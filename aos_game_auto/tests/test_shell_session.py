@@ -0,0 +1,41 @@
+import sys
+
+import pytest
+
+from adb.adb_controller import AdbError
+from adb.shell_session import AdbShellSession, AdbShellSessionError
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="runs a local POSIX sh as the session")
+
+
+@pytest.fixture
+def session():
+    shell = AdbShellSession(["sh"])
+    yield shell
+    shell.close()
+
+
+def test_output_and_exit_status(session):
+    assert session.run("echo one; echo two", 5) == "one\ntwo\n"
+    with pytest.raises(AdbError, match="nope"):
+        session.run("echo nope >&2; false", 5)
+    assert session.run("echo still alive", 5) == "still alive\n"
+
+
+def test_output_without_final_newline(session):
+    assert session.run("printf abc", 2) == "abc"
+    assert session.run("printf 'x\\ny'", 2) == "x\ny"
+    assert session.run("echo next", 2) == "next\n"
+
+
+def test_timeout_marks_command_as_sent(session):
+    with pytest.raises(AdbShellSessionError) as error:
+        session.run("sleep 5", 0.2)
+    assert error.value.sent
+
+
+def test_dead_session_marks_command_as_not_sent(session):
+    session.close()
+    with pytest.raises(AdbShellSessionError) as error:
+        session.run("echo hi", 2)
+    assert not error.value.sent
@@ -0,0 +1,14 @@
+from utils.stats import percentile, summarize_latency
+
+
+def test_percentile_uses_the_nearest_rank():
+    durations = [float(value) for value in range(20, 0, -1)]
+    assert percentile(durations, 0.50) == 10.0
+    assert percentile(durations, 0.95) == 19.0
+    assert percentile(durations, 1.0) == 20.0
+    assert percentile([4.0], 0.95) == 4.0
+
+
+def test_latency_summary():
+    durations = [float(value) for value in range(1, 21)]
+    assert summarize_latency(durations) == {"mean_ms": 10.5, "p50_ms": 10.0, "p95_ms": 19.0}
@@ -0,0 +1,65 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import main
+from vision.image_matcher import ImageMatcher
+from vision.template_bundle import TemplateBundle, write_bundle
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "button.png"
+    cv2.imwrite(str(path), np.random.default_rng(1).integers(0, 256, (36, 120, 3), dtype=np.uint8))
+    return path
+
+
+def test_round_trip_and_freshness(template, tmp_path):
+    color = cv2.imread(str(template), cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+    bundle_path = tmp_path / "templates.bundle"
+    assert write_bundle(bundle_path, {template.resolve(): {"color": color, "gray_pyramid_1": gray[::2, ::2]}}) == 1
+
+    bundle = TemplateBundle.open(bundle_path)
+    assert sorted(bundle.variants(template)) == ["color", "gray_pyramid_1"]
+    assert np.array_equal(bundle.image(template), color)
+    assert np.array_equal(bundle.read_image(template, "gray_pyramid_1"), gray[::2, ::2])
+    assert bundle.image(template, "scale_2.0000") is None
+    assert bundle.image(tmp_path / "other.png") is None
+    assert bundle.is_fresh(template)
+
+    # A touched file with the same content is still fresh; new content is not.
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    assert bundle.is_fresh(template)
+    cv2.imwrite(str(template), 255 - color)
+    assert not bundle.is_fresh(template)
+    assert bundle.stale_paths([template, tmp_path / "missing.png"]) == [template]
+    bundle.close()
+
+
+def test_open_rejects_other_files(tmp_path):
+    path = tmp_path / "templates.bundle"
+    assert TemplateBundle.open(path) is None
+    path.write_bytes(b"PNG not a bundle")
+    assert TemplateBundle.open(path) is None
+
+
+def scaled_variants(bundle, path):
+    return sorted(variant for variant in bundle.variants(path) if variant.startswith("scale_"))
+
+
+def test_rebuild_keeps_the_compiled_resolutions(template, tmp_path):
+    config = {"scenarios": [{"name": "button", "template": str(template), "capture_resolution": [1280, 720]}]}
+    bundle_path = tmp_path / "templates.bundle"
+    matcher = ImageMatcher()
+    main.compile_template_bundle(config, matcher, bundle_path, [(2400, 1080)])
+    assert TemplateBundle.open(bundle_path).resolutions == [(2400, 1080)]
+
+    cv2.imwrite(str(template), np.random.default_rng(2).integers(0, 256, (36, 120, 3), dtype=np.uint8))
+    bundle = main.refresh_template_bundle(config, matcher, bundle_path, (1600, 900))
+    assert bundle.resolutions == [(2400, 1080), (1600, 900)]
+    assert scaled_variants(bundle, template) == ["scale_1.2500", "scale_1.5000"]
+    assert bundle.is_fresh(template)
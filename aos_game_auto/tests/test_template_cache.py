@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+
+from vision.image_matcher import TemplateCache
+
+
+def write(path, size, mtime_ns=None):
+    path.write_bytes(b"x" * size)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def counting_loader(loads, nbytes=100):
+    def load(path):
+        loads.append(path.name)
+        return np.zeros(nbytes, dtype=np.uint8)
+
+    return load
+
+
+def test_changed_file_is_decoded_again(tmp_path):
+    path = tmp_path / "button.png"
+    write(path, 10, mtime_ns=1_000_000_000)
+    cache, loads = TemplateCache(), []
+    first = cache.get(path, counting_loader(loads))
+    assert cache.get(path, counting_loader(loads)) is first
+    assert loads == ["button.png"]
+
+    write(path, 10, mtime_ns=2_000_000_000)
+    assert cache.get(path, counting_loader(loads)) is not first
+    assert loads == ["button.png", "button.png"]
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 100
+
+
+def test_variants_are_cached_separately(tmp_path):
+    path = tmp_path / "button.png"
+    write(path, 10)
+    cache, loads = TemplateCache(), []
+    cache.get(path, counting_loader(loads), variant="color")
+    cache.get(path, counting_loader(loads), variant="scale_1.5000")
+    cache.get(path, counting_loader(loads), variant="color")
+    assert len(loads) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path):
+    paths = [tmp_path / f"t{index}.png" for index in range(3)]
+    for path in paths:
+        write(path, 10)
+    cache, loads = TemplateCache(max_bytes=250), []
+    cache.get(paths[0], counting_loader(loads))
+    cache.get(paths[1], counting_loader(loads))
+    cache.get(paths[0], counting_loader(loads))
+    cache.get(paths[2], counting_loader(loads))
+    stats = cache.stats()
+    assert stats["bytes"] == 200 and stats["evictions"] == 1
+
+    cache.get(paths[0], counting_loader(loads))
+    cache.get(paths[1], counting_loader(loads))
+    assert loads == ["t0.png", "t1.png", "t2.png", "t1.png"]
+
+
+def test_image_larger_than_budget_is_not_cached(tmp_path):
+    path = tmp_path / "huge.png"
+    write(path, 10)
+    cache, loads = TemplateCache(max_bytes=50), []
+    assert cache.get(path, counting_loader(loads)) is not None
+    cache.get(path, counting_loader(loads))
+    assert len(loads) == 2
+    assert cache.stats()["bytes"] == 0
+
+
+def test_missing_file_returns_none(tmp_path):
+    assert TemplateCache().get(tmp_path / "gone.png", counting_loader([])) is None
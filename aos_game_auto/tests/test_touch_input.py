@@ -0,0 +1,108 @@
+import pytest
+
+from adb.gesture_script import GestureScript
+from adb.touch_input import SendeventTouch, find_touchscreen, parse_display_rotation, parse_getevent_devices
+
+GETEVENT = """\
+add device 1: /dev/input/event4
+  name:     "gpio-keys"
+  events:
+    KEY (0001): 0072  0073  0074
+  input props:
+    <none>
+add device 2: /dev/input/event2
+  name:     "sec_touchscreen"
+  events:
+    KEY (0001): 014a
+    ABS (0003): 002f  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+                0030  : value 0, min 0, max 255, fuzz 0, flat 0, resolution 0
+                0035  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 65535, fuzz 0, flat 0, resolution 0
+  input props:
+    INPUT_PROP_DIRECT
+"""
+
+PROTOCOL_A = """\
+add device 3: /dev/input/event1
+  name:     "old_ts"
+  events:
+    ABS (0003): 0035  : value 0, min 0, max 1079, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 1919, fuzz 0, flat 0, resolution 0
+  input props:
+    INPUT_PROP_DIRECT
+"""
+
+
+@pytest.fixture
+def device():
+    return find_touchscreen(parse_getevent_devices(GETEVENT))
+
+
+def test_getevent_parsing_picks_the_touchscreen(device):
+    assert device.path == "/dev/input/event2"
+    assert device.name == "sec_touchscreen"
+    assert device.direct and 0x14A in device.keys
+    assert (device.axes[0x35].minimum, device.axes[0x35].maximum) == (0, 4095)
+
+
+@pytest.mark.parametrize(
+    "text, rotation",
+    [("SurfaceOrientation: 1", 1), ("orientation=ROTATION_270", 3), ("orientation=2", 2), ("no display", 0)],
+)
+def test_display_rotation(text, rotation):
+    assert parse_display_rotation(text) == rotation
+
+
+def test_tap_renders_a_protocol_b_slot(device):
+    touch = SendeventTouch(device, (1080, 2400))
+    path = "sendevent /dev/input/event2"
+    assert touch.tap(540, 1200).split(" && ") == [
+        f"{path} 3 47 0",
+        f"{path} 3 57 1",
+        f"{path} 1 330 1",
+        f"{path} 3 48 127",
+        f"{path} 3 53 2048",
+        f"{path} 3 54 2048",
+        f"{path} 0 0 0",
+        f"{path} 3 47 0",
+        f"{path} 3 57 -1",
+        f"{path} 1 330 0",
+        f"{path} 0 0 0",
+    ]
+    assert f"{path} 3 57 2" in touch.tap(0, 0)
+
+
+@pytest.mark.parametrize(
+    "rotation, point, raw",
+    [(0, (0, 0), (0, 0)), (1, (0, 0), (1079, 0)), (2, (0, 0), (1079, 2399)), (3, (0, 0), (0, 2399))],
+)
+def test_coordinates_are_rotated_to_the_natural_panel(device, rotation, point, raw):
+    touch = SendeventTouch(device, (1080, 2400), rotation)
+    scale_x, scale_y = 4096 / 1080, 4096 / 2400
+    assert touch.to_raw(*point) == (int(raw[0] * scale_x), int(raw[1] * scale_y))
+
+
+def test_protocol_a_uses_mt_reports_and_swipe_steps():
+    touch = SendeventTouch(find_touchscreen(parse_getevent_devices(PROTOCOL_A)), (1080, 1920))
+    swipe = touch.swipe(0, 0, 100, 200, duration_ms=100).split(" && ")
+    assert swipe.count("sleep 0.020") == 5
+    assert "sendevent /dev/input/event1 3 53 100" in swipe and "sendevent /dev/input/event1 3 54 200" in swipe
+    assert swipe[-2:] == ["sendevent /dev/input/event1 0 2 0", "sendevent /dev/input/event1 0 0 0"]
+    assert not any(" 3 57 " in command for command in swipe)
+
+
+def test_gesture_script_renders_taps_with_sendevent(device):
+    touch = SendeventTouch(device, (1080, 2400))
+    script = GestureScript().tap(540, 1200).sleep(0.1).text("hi")
+    rendered = script.to_shell(touch)
+    assert rendered.startswith("sendevent /dev/input/event2 ")
+    assert rendered.endswith(" && sleep 0.1 && input text hi")
+    assert "input tap" not in rendered
+
+
+def test_device_without_position_axes_is_rejected():
+    keys_only = parse_getevent_devices(GETEVENT)[0]
+    assert find_touchscreen([keys_only]) is None
+    with pytest.raises(ValueError, match="multi-touch"):
+        SendeventTouch(keys_only, (1080, 2400))
@@ -0,0 +1,21 @@
+"""Latency statistics shared by the run report and the benchmark scripts."""
+
+import math
+import statistics
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    # Rounding off float noise first keeps an exact rank such as 0.95 * 20 from stepping up to the next value.
+    rank = max(0, min(len(ordered) - 1, math.ceil(round(fraction * len(ordered), 9)) - 1))
+    return ordered[rank]
+
+
+def summarize_latency(durations: list[float]) -> dict[str, float]:
+    """Return mean, p50 and p95 of a non-empty list of millisecond durations."""
+    return {
+        "mean_ms": statistics.fmean(durations),
+        "p50_ms": percentile(durations, 0.50),
+        "p95_ms": percentile(durations, 0.95),
+    }
@@ -0,0 +1,121 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+import cv2
+import numpy as np
+
+ORB_PATCH_SIZE = 15
+TEMPLATE_KEYPOINTS = 500
+FRAME_KEYPOINTS = 3000
+RATIO_TEST = 0.75
+
+
+def create_orb(keypoints: int) -> Any:
+    # A smaller patch than the OpenCV default keeps keypoints on small UI buttons.
+    return cv2.ORB_create(nfeatures=int(keypoints), edgeThreshold=ORB_PATCH_SIZE, patchSize=ORB_PATCH_SIZE)
+
+
+@dataclass
+class TemplateFeatures:
+    """ORB keypoints and descriptors of one template image."""
+
+    path: str
+    width: int
+    height: int
+    points: Any
+    descriptors: Any
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.points.nbytes + self.descriptors.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.descriptors)
+
+
+def compute_template_features(path: str, image: Any, keypoints: int = TEMPLATE_KEYPOINTS) -> TemplateFeatures:
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    found, descriptors = create_orb(keypoints).detectAndCompute(gray, None)
+    if descriptors is None:
+        descriptors = np.empty((0, 32), dtype=np.uint8)
+    points = np.array([keypoint.pt for keypoint in found], dtype=np.float32).reshape(-1, 2)
+    return TemplateFeatures(path=path, width=int(gray.shape[1]), height=int(gray.shape[0]), points=points, descriptors=descriptors)
+
+
+@dataclass
+class FeatureCorrespondences:
+    """Point pairs (template point, frame point) that passed the ratio test, per template path."""
+
+    pairs: Dict[str, tuple[Any, Any]]
+
+    def for_template(self, path: str) -> tuple[Any, Any]:
+        empty = np.empty((0, 2), dtype=np.float32)
+        return self.pairs.get(path, (empty, empty))
+
+
+class FeatureIndex:
+    """The set of `features` templates that frames are matched against.
+
+    A frame's ORB keypoints are detected once and its correspondences are cached per
+    index version, so every template in the index shares one detection per frame.
+
+    Lowe's ratio test is applied per template: a frame descriptor's nearest neighbour
+    in a template is rejected when the second nearest descriptor of that same template
+    is almost as close. A template therefore gets the same correspondences whatever
+    else is indexed; near-duplicate templates (for example two states of one button)
+    neither cancel each other out nor flood each other with unfiltered matches.
+    """
+
+    def __init__(self, ratio: float = RATIO_TEST):
+        self.ratio = float(ratio)
+        self.version = 0
+        self._templates: list[TemplateFeatures] = []
+        self._lock = threading.Lock()
+
+    def sync(self, templates: Iterable[TemplateFeatures]) -> None:
+        """Replace the indexed templates when the set of template feature objects changed."""
+        unique: Dict[int, TemplateFeatures] = {}
+        for features in templates:
+            if len(features):
+                unique.setdefault(id(features), features)
+        with self._lock:
+            if [id(features) for features in self._templates] == list(unique):
+                return
+            self._templates = list(unique.values())
+            self.version += 1
+
+    def include(self, templates: Iterable[TemplateFeatures]) -> None:
+        """Add templates that are not indexed yet, keeping the ones already there."""
+        with self._lock:
+            current = list(self._templates)
+        indexed = {id(features) for features in current}
+        missing = [features for features in templates if len(features) and id(features) not in indexed]
+        if missing:
+            self.sync(current + missing)
+
+    def match(self, frame_points: Any, frame_descriptors: Optional[Any]) -> FeatureCorrespondences:
+        with self._lock:
+            templates = self._templates
+        if frame_descriptors is None or len(frame_descriptors) == 0 or not templates:
+            return FeatureCorrespondences({})
+
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        pairs: Dict[str, tuple[Any, Any]] = {}
+        for features in templates:
+            template_points: list[Any] = []
+            matched_points: list[Any] = []
+            for candidates in matcher.knnMatch(frame_descriptors, features.descriptors, k=2):
+                if not candidates:
+                    continue
+                best = candidates[0]
+                if len(candidates) > 1 and best.distance >= self.ratio * candidates[1].distance:
+                    continue
+                template_points.append(features.points[best.trainIdx])
+                matched_points.append(frame_points[best.queryIdx])
+            if template_points:
+                pairs[features.path] = (
+                    np.array(template_points, dtype=np.float32),
+                    np.array(matched_points, dtype=np.float32),
+                )
+        return FeatureCorrespondences(pairs)
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+
+THUMBNAIL_SIZE = (64, 36)
+
+
+@dataclass(frozen=True)
+class FrameFingerprint:
+    """Perceptual fingerprint of one screenshot: a 64-bit dHash plus a small grayscale thumbnail."""
+
+    shape: tuple[int, int]
+    dhash: int
+    thumbnail: Any
+
+
+def fingerprint_frame(image: Any) -> FrameFingerprint:
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    hash_source = cv2.resize(thumbnail, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(hash_source[:, 1:] > hash_source[:, :-1])
+    return FrameFingerprint(
+        shape=(int(image.shape[0]), int(image.shape[1])),
+        dhash=int.from_bytes(bits.tobytes(), "big"),
+        thumbnail=thumbnail,
+    )
+
+
+class FrameChangeDetector:
+    """Decides whether a new screenshot differs enough from the previous one to be matched again.
+
+    A frame counts as unchanged when its dHash is within `max_hash_distance` bits of the
+    previous frame and at most `max_changed_pixels` thumbnail pixels differ by more than
+    `pixel_tolerance` gray levels. The dHash rejects layout changes cheaply, and the
+    per-pixel thumbnail check still notices a small button appearing on a static screen.
+    """
+
+    def __init__(self, pixel_tolerance: float = 8.0, max_changed_pixels: int = 0, max_hash_distance: int = 2):
+        self.pixel_tolerance = max(0.0, float(pixel_tolerance))
+        self.max_changed_pixels = max(0, int(max_changed_pixels))
+        self.max_hash_distance = max(0, int(max_hash_distance))
+
+    def is_unchanged(self, previous: Optional[FrameFingerprint], current: FrameFingerprint) -> bool:
+        if previous is None or previous.shape != current.shape:
+            return False
+        if bin(previous.dhash ^ current.dhash).count("1") > self.max_hash_distance:
+            return False
+        difference = cv2.absdiff(previous.thumbnail, current.thumbnail)
+        return int(np.count_nonzero(difference > self.pixel_tolerance)) <= self.max_changed_pixels
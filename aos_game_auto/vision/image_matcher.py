@@ -1,14 +1,35 @@
+import csv
 import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
 
 import cv2
+import numpy as np
 
-try:
-    import pytesseract
-except ImportError:  # Optional OCR dependency.
-    pytesseract = None
+from vision.feature_index import (
+    FRAME_KEYPOINTS,
+    FeatureCorrespondences,
+    FeatureIndex,
+    TemplateFeatures,
+    compute_template_features,
+    create_orb,
+)
+from vision.ocr_backend import OcrBackend, OcrBackendError, create_ocr_backend
+from vision.ocr_cache import OcrResultCache
+from vision.screen_state import ScreenStateClassifier, scenario_states
+from vision.template_bundle import TemplateBundle
+
+
+PYRAMID_MIN_TEMPLATE_SIDE = 12
+PYRAMID_MAX_LEVELS = 3
+PYRAMID_CANDIDATES = 3
+PYRAMID_COARSE_MARGIN = 0.3
+PREFILTER_BINS = 8
 
 
 @dataclass
@@ -24,60 +45,794 @@ class MatchResult:
     matched_text: str = ""
 
 
+@dataclass
+class OcrLine:
+    text: str
+    normalized: str
+    score: float
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+
+class OcrIndex:
+    """OCR lines recognized in one screenshot region, indexed by normalized text."""
+
+    def __init__(self, lines: list[OcrLine]):
+        self.lines = lines
+        self.by_text: Dict[str, list[OcrLine]] = {}
+        for line in lines:
+            self.by_text.setdefault(line.normalized, []).append(line)
+
+    def candidates(self, normalized_target: str, contains: bool) -> list[OcrLine]:
+        if not contains:
+            return self.by_text.get(normalized_target, [])
+        return [line for line in self.lines if normalized_target in line.normalized]
+
+
+class FrameViews:
+    """Lazily derived views of one screenshot, shared by every match config in a frame."""
+
+    def __init__(self, image: Any):
+        self.image = image
+        self._views: Dict[Any, Any] = {}
+        self._key_locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, builder: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._views:
+                return self._views[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._views:
+                    return self._views[key]
+            value = builder()
+            with self._lock:
+                self._views[key] = value
+        return value
+
+    def gray(self) -> Any:
+        return self.get("gray", lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    def region(self, left: int, top: int, right: int, bottom: int) -> "FrameViews":
+        height, width = self.image.shape[:2]
+        if (left, top, right, bottom) == (0, 0, width, height):
+            return self
+        return self.get(("region", left, top, right, bottom), lambda: FrameViews(self.image[top:bottom, left:right]))
+
+
+def _pyramid_down(image: Any, levels: int) -> Any:
+    for _ in range(levels):
+        image = cv2.pyrDown(image)
+    return image
+
+
+def _color_histogram(image: Any) -> Any:
+    """Return a coarse 3D BGR histogram with raw pixel counts."""
+    return cv2.calcHist([image], [0, 1, 2], None, [PREFILTER_BINS] * 3, [0, 256] * 3)
+
+
+def _pyramid_levels(template: Any, max_levels: int) -> int:
+    """Return how many pyrDown steps keep the template's short side above the minimum."""
+    short_side = min(template.shape[:2])
+    levels = 0
+    while levels < max_levels and short_side >> (levels + 1) >= PYRAMID_MIN_TEMPLATE_SIDE:
+        levels += 1
+    return levels
+
+
+def _non_max_suppression(candidates: list[tuple[MatchResult, int, int]], overlap: float) -> list[MatchResult]:
+    """Greedy NMS: keep the best-scoring boxes and drop any box whose IoU with a kept one exceeds `overlap`."""
+    kept: list[tuple[MatchResult, int, int]] = []
+    for match, width, height in sorted(candidates, key=lambda item: item[0].score, reverse=True):
+        box = (match.top_left_x, match.top_left_y, match.top_left_x + width, match.top_left_y + height)
+        suppressed = False
+        for other, other_width, other_height in kept:
+            other_box = (other.top_left_x, other.top_left_y, other.top_left_x + other_width, other.top_left_y + other_height)
+            inter_w = min(box[2], other_box[2]) - max(box[0], other_box[0])
+            inter_h = min(box[3], other_box[3]) - max(box[1], other_box[1])
+            if inter_w <= 0 or inter_h <= 0:
+                continue
+            intersection = inter_w * inter_h
+            union = width * height + other_width * other_height - intersection
+            if intersection / max(1, union) > overlap:
+                suppressed = True
+                break
+        if not suppressed:
+            kept.append((match, width, height))
+    return [match for match, _, _ in kept]
+
+
+class TemplateCache:
+    """Bounded LRU cache of decoded template images.
+
+    Entries are keyed by resolved path and variant name and remember the file's
+    mtime/size, so a template overwritten by the capture GUI is decoded again.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries: "OrderedDict[tuple[str, str], tuple[tuple[int, int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, loader: Callable[[Path], Any], variant: str = "color") -> Any:
+        """Return the cached image for path/variant, calling loader on a miss or stale entry."""
+        try:
+            resolved = path.resolve()
+            stat = resolved.stat()
+        except OSError:
+            return None
+        key = (str(resolved), variant)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._discard(key)
+            self.misses += 1
+
+        image = loader(resolved)
+        if image is None:
+            return None
+        self._store(key, signature, image)
+        return image
+
+    def put(self, path: Path, image: Any, variant: str, signature: tuple[int, int]) -> None:
+        """Seed an entry decoded elsewhere (e.g. a compiled bundle) for the given source signature.
+
+        If the file on disk no longer matches the signature, the next `get` treats the
+        entry as stale and calls its loader as usual.
+        """
+        try:
+            resolved = path.resolve()
+        except OSError:
+            return
+        self._store((str(resolved), variant), signature, image)
+
+    def _store(self, key: tuple[str, str], signature: tuple[int, int], image: Any) -> None:
+        size = int(getattr(image, "nbytes", 0))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (signature, image)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._discard(oldest_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        _, image = self._entries.pop(key)
+        self.current_bytes -= int(getattr(image, "nbytes", 0))
+
+
 class ImageMatcher:
     """Finds template or OCR text matches in screenshots."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        template_cache_mb: float = 256,
+        match_strategy: str = "full",
+        match_workers: int = 0,
+        adaptive_roi: bool = False,
+        roi_padding: int = 48,
+        early_exit_score: Optional[float] = None,
+        prefilter: bool = False,
+        prefilter_margin: float = 0.25,
+        ocr_backend: str = "pytesseract",
+        ocr_cache_entries: int = 512,
+        ocr_cache_path: Optional[Path] = None,
+        template_resolution: Optional[Iterable[int]] = None,
+        feature_keypoints: int = FRAME_KEYPOINTS,
+    ):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.template_cache = TemplateCache(int(max(0.0, float(template_cache_mb)) * 1024 * 1024))
+        self.match_strategy = str(match_strategy or "full").lower()
+        self.adaptive_roi = bool(adaptive_roi)
+        self.roi_padding = max(0, int(roi_padding))
+        self.early_exit_score = early_exit_score
+        self.prefilter = bool(prefilter)
+        self.prefilter_margin = min(1.0, max(0.0, float(prefilter_margin)))
+        self.template_resolution = list(template_resolution) if template_resolution else None
+        self.tesseract_cmd: Optional[str] = None
+        self.ocr_backend_name = str(ocr_backend or "pytesseract").lower()
+        self.ocr_backend: Optional[OcrBackend] = create_ocr_backend(self.ocr_backend_name)
+        self.ocr_cache = OcrResultCache(ocr_cache_entries, ocr_cache_path)
+        self.feature_keypoints = max(1, int(feature_keypoints))
+        self.feature_index = FeatureIndex()
+        self.state_classifier: Optional[ScreenStateClassifier] = None
+        self.hit_regions: Dict[str, tuple[int, int]] = {}
+        self.counters: Dict[str, Dict[str, int]] = {
+            "adaptive_roi": {"prior_hits": 0, "prior_misses": 0},
+            "ocr": {"runs": 0, "lookups": 0},
+            "features": {"frame_passes": 0, "lookups": 0},
+            "prefilter": {"checked": 0, "skipped": 0},
+            "pyramid": {"searches": 0, "full_fallbacks": 0},
+            "screen_state": {"recognized": 0, "unknown": 0, "scenarios_skipped": 0},
+        }
+        self._hit_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.match_workers = max(1, int(match_workers) if match_workers else (os.cpu_count() or 1))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Stop the matching worker pool. The matcher can still be used afterwards."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if self.ocr_backend is not None:
+            self.ocr_backend.close()
+        self.ocr_cache.save()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.match_workers, thread_name_prefix="matcher")
+            return self._executor
 
     def configure_tesseract(self, command_path: Optional[str]) -> None:
-        if command_path and pytesseract is not None:
-            pytesseract.pytesseract.tesseract_cmd = command_path
+        self.tesseract_cmd = command_path or None
+        self.configure_ocr_backend(self.ocr_backend_name)
+
+    def configure_ocr_backend(self, name: str) -> None:
+        """Select the OCR backend: `pytesseract`, `tesserocr` (engine kept in-process) or `auto`."""
+        previous = self.ocr_backend
+        self.ocr_backend_name = str(name or "pytesseract").lower()
+        self.ocr_backend = create_ocr_backend(self.ocr_backend_name, self.tesseract_cmd)
+        if previous is not None:
+            previous.close()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return matcher counters grouped by stage for the run report."""
+        with self._counter_lock:
+            stats: Dict[str, Dict[str, Any]] = {section: dict(values) for section, values in self.counters.items()}
+        stats["template_cache"] = self.template_cache.stats()
+        stats["ocr_cache"] = self.ocr_cache.stats()
+        return stats
+
+    def load_template(self, template_path: Path) -> Any:
+        return self.template_cache.get(template_path, self._read_color_image)
+
+    @staticmethod
+    def _read_color_image(path: Path) -> Any:
+        return cv2.imread(str(path), cv2.IMREAD_COLOR)
+
+    def load_scaled_template(self, template_path: Path, scale: float) -> Any:
+        """Return the template resized for the current screen, cached once per scale."""
+        if scale == 1.0:
+            return self.load_template(template_path)
+        return self.template_cache.get(
+            template_path,
+            lambda path: self._build_scaled_template(path, scale),
+            variant=f"scale_{scale:.4f}",
+        )
+
+    def _build_scaled_template(self, path: Path, scale: float) -> Any:
+        template = self.load_template(path)
+        if template is None:
+            return None
+        height, width = template.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return cv2.resize(template, size, interpolation=interpolation)
+
+    def _build_gray_pyramid(self, path: Path, levels: int, scale: float = 1.0) -> Any:
+        template = self.load_scaled_template(path, scale)
+        if template is None:
+            return None
+        return _pyramid_down(cv2.cvtColor(template, cv2.COLOR_BGR2GRAY), levels)
+
+    def template_scale(self, match_config: Dict[str, Any], screen_shape: tuple[int, ...]) -> float:
+        """Return the resize factor from the capture resolution to the current screen.
+
+        Game UIs usually scale with the short side of the screen, so the ratio of the
+        short sides is used. This also keeps the factor the same in both orientations.
+        """
+        resolution = match_config.get("capture_resolution") or self.template_resolution
+        if not resolution:
+            return 1.0
+        try:
+            capture_short_side = min(int(resolution[0]), int(resolution[1]))
+        except (TypeError, ValueError, IndexError):
+            return 1.0
+        if capture_short_side <= 0:
+            return 1.0
+        scale = min(int(screen_shape[0]), int(screen_shape[1])) / capture_short_side
+        return 1.0 if abs(scale - 1.0) < 0.01 else round(scale, 4)
+
+    def prepare_template_bank(
+        self,
+        scenarios: Iterable[Dict[str, Any]],
+        base_dir: Path,
+        device_resolution: tuple[int, int],
+    ) -> int:
+        """Pre-scale every template for the device resolution so frames need a single-scale match."""
+        screen_shape = (int(device_resolution[1]), int(device_resolution[0]))
+        prepared = 0
+        for scenario in scenarios:
+            for match_config in self._scenario_match_configs(scenario):
+                if str(match_config.get("type", "template")).lower() != "template":
+                    continue
+                scale = self.template_scale(match_config, screen_shape)
+                if scale == 1.0:
+                    continue
+                for template_path in self._template_paths(match_config, base_dir):
+                    if self.load_scaled_template(template_path, scale) is not None:
+                        prepared += 1
+        return prepared
+
+    def template_bundle_sources(
+        self,
+        scenarios: Iterable[Dict[str, Any]],
+        base_dir: Path,
+        device_resolutions: Iterable[tuple[int, int]] = (),
+    ) -> Dict[Path, set[float]]:
+        """Collect every template file the scenarios use with the scales needed per resolution."""
+        resolutions = list(device_resolutions)
+        sources: Dict[Path, set[float]] = {}
+        for scenario in scenarios:
+            for match_config in self._scenario_match_configs(scenario):
+                if str(match_config.get("type", "template")).lower() != "template":
+                    continue
+                scales = {1.0}
+                for width, height in resolutions:
+                    scales.add(self.template_scale(match_config, (int(height), int(width))))
+                for template_path in self._template_paths(match_config, base_dir):
+                    if template_path.exists():
+                        sources.setdefault(template_path.resolve(), set()).update(scales)
+        return sources
+
+    def compile_template_variants(self, template_path: Path, scales: Iterable[float] = (1.0,)) -> Dict[str, Any]:
+        """Decode a template into the cache variants a bundle stores for it.
+
+        The variant names match the ones `load_template`, `load_scaled_template` and the
+        pyramid strategy look up, so bundle arrays can be seeded straight into the cache.
+        """
+        color = self.load_template(template_path)
+        if color is None:
+            return {}
+        variants: Dict[str, Any] = {"color": color}
+        for scale in sorted(set(scales)):
+            scaled = self.load_scaled_template(template_path, scale)
+            if scaled is None:
+                continue
+            if scale != 1.0:
+                variants[f"scale_{scale:.4f}"] = scaled
+            levels = _pyramid_levels(scaled, PYRAMID_MAX_LEVELS)
+            if levels:
+                variants[f"gray_pyramid_{levels}_scale_{scale:.4f}"] = self._build_gray_pyramid(template_path, levels, scale)
+        return variants
+
+    def load_template_bundle(self, bundle: TemplateBundle) -> int:
+        """Seed the template cache from a compiled bundle, skipping templates changed since it was built."""
+        loaded = 0
+        for entry in bundle.entries.values():
+            path = Path(entry.path)
+            if not bundle.is_fresh(path):
+                continue
+            stat = path.stat()
+            for variant in entry.arrays:
+                image = bundle.image(path, variant)
+                if image is not None:
+                    self.template_cache.put(path, image, variant, (stat.st_mtime_ns, stat.st_size))
+            loaded += 1
+        return loaded
 
     def find_template(
         self,
-        screenshot_path: Path,
+        screenshot_path: Optional[Path],
         template_path: Path,
         threshold: float,
         screenshot_image: Any = None,
+        strategy: Optional[str] = None,
     ) -> Optional[MatchResult]:
         screenshot = screenshot_image
         if screenshot is None:
-            screenshot = cv2.imread(str(screenshot_path), cv2.IMREAD_COLOR)
-        if screenshot is None:
-            raise ValueError(f"Could not read screenshot: {screenshot_path}")
+            screenshot = self.read_screenshot(screenshot_path)
+        match = self._match_template(FrameViews(screenshot), template_path, threshold, {"strategy": strategy})
+        self._remember_hit(match)
+        return match
 
-        template = cv2.imread(str(template_path), cv2.IMREAD_COLOR)
+    def _match_template(
+        self,
+        frame: "FrameViews",
+        template_path: Path,
+        threshold: float,
+        match_config: Dict[str, Any],
+    ) -> Optional[MatchResult]:
+        scale = self.template_scale(match_config, frame.image.shape)
+        template = self.load_scaled_template(template_path, scale)
         if template is None:
             self.logger.warning("Template image could not be read: %s", template_path)
             return None
 
-        if template.shape[0] > screenshot.shape[0] or template.shape[1] > screenshot.shape[1]:
-            self.logger.warning("Template is larger than screenshot: %s", template_path)
+        template_height, template_width = template.shape[:2]
+        area_left, area_top, area_right, area_bottom = self._search_bounds(frame.image, match_config.get("search_area"))
+        if template_height > area_bottom - area_top or template_width > area_right - area_left:
+            self.logger.warning("Template is larger than screenshot search area: %s", template_path)
+            return None
+        search_frame = frame.region(area_left, area_top, area_right, area_bottom)
+        if self._prefilter_rejects(search_frame, template_path, scale, match_config):
             return None
 
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        _, max_value, _, max_location = cv2.minMaxLoc(result)
+        adaptive_roi = match_config.get("adaptive_roi")
+        if adaptive_roi is None:
+            adaptive_roi = self.adaptive_roi
+        if adaptive_roi:
+            padding = match_config.get("roi_padding")
+            padding = self.roi_padding if padding is None else max(0, int(padding))
+            prior = self._prior_bounds(template_path, template_width, template_height, padding)
+            if prior is not None:
+                left = max(area_left, prior[0])
+                top = max(area_top, prior[1])
+                right = min(area_right, prior[2])
+                bottom = min(area_bottom, prior[3])
+                if right - left >= template_width and bottom - top >= template_height:
+                    max_value, (x, y) = self._locate_template(
+                        frame.region(left, top, right, bottom), template, template_path, match_config, scale, threshold
+                    )
+                    if max_value >= threshold:
+                        self._count("adaptive_roi", "prior_hits")
+                        return self._template_result(template_path, template, max_value, left + x, top + y)
+                self._count("adaptive_roi", "prior_misses")
 
+        max_value, (x, y) = self._locate_template(search_frame, template, template_path, match_config, scale, threshold)
         if max_value < threshold:
             return None
+        return self._template_result(template_path, template, max_value, area_left + x, area_top + y)
+
+    def find_all_matches(
+        self,
+        screenshot_path: Optional[Path],
+        scenario: Dict[str, Any],
+        base_dir: Path,
+        screenshot_image: Any = None,
+        max_results: int = 20,
+        overlap: float = 0.3,
+    ) -> list[MatchResult]:
+        """Return every location of the scenario's targets above threshold, best first.
+
+        Each template contributes all of its peaks, and overlapping hits from different
+        templates or OCR lines are merged by non-maximum suppression.
+        """
+        screenshot = screenshot_image
+        if screenshot is None:
+            screenshot = self.read_screenshot(screenshot_path)
+        frame = FrameViews(screenshot)
+        max_results = max(1, int(max_results))
+        self._sync_feature_index([scenario], base_dir, keep_existing=True)
+
+        candidates: list[tuple[MatchResult, int, int]] = []
+        for match_config in self._scenario_match_configs(scenario):
+            match_type = str(match_config.get("type", "template")).lower()
+            if match_type == "ocr":
+                for line in self._ocr_candidates(frame, match_config):
+                    match = self._ocr_result(match_config, line)
+                    candidates.append((match, line.right - line.left, line.bottom - line.top))
+            elif match_type == "features":
+                match = self._match_features(frame, match_config, base_dir)
+                if match is not None:
+                    width = 2 * (match.center_x - match.top_left_x)
+                    height = 2 * (match.center_y - match.top_left_y)
+                    candidates.append((match, width, height))
+            else:
+                threshold = float(match_config.get("threshold", 0.85))
+                for template_path in self._template_paths(match_config, base_dir):
+                    candidates.extend(self._match_template_all(frame, template_path, threshold, match_config, max_results))
+
+        matches = _non_max_suppression(candidates, overlap)[:max_results]
+        for match in matches:
+            match.scenario = scenario
+        return matches
+
+    def _match_template_all(
+        self,
+        frame: "FrameViews",
+        template_path: Path,
+        threshold: float,
+        match_config: Dict[str, Any],
+        max_results: int,
+    ) -> list[tuple[MatchResult, int, int]]:
+        """Collect up to `max_results` peaks of one template's full-resolution score map."""
+        scale = self.template_scale(match_config, frame.image.shape)
+        template = self.load_scaled_template(template_path, scale)
+        if template is None:
+            self.logger.warning("Template image could not be read: %s", template_path)
+            return []
+
+        template_height, template_width = template.shape[:2]
+        left, top, right, bottom = self._search_bounds(frame.image, match_config.get("search_area"))
+        if template_height > bottom - top or template_width > right - left:
+            return []
+
+        search_frame = frame.region(left, top, right, bottom)
+        if self._prefilter_rejects(search_frame, template_path, scale, match_config):
+            return []
+        result = cv2.matchTemplate(search_frame.image, template, cv2.TM_CCOEFF_NORMED)
+        suppress_w = max(1, template_width // 2)
+        suppress_h = max(1, template_height // 2)
+        found: list[tuple[MatchResult, int, int]] = []
+        while len(found) < max_results:
+            _, max_value, _, (x, y) = cv2.minMaxLoc(result)
+            if max_value < threshold:
+                break
+            match = MatchResult(
+                scenario={},
+                template_path=template_path,
+                score=float(max_value),
+                center_x=int(left + x + template_width / 2),
+                center_y=int(top + y + template_height / 2),
+                top_left_x=int(left + x),
+                top_left_y=int(top + y),
+            )
+            found.append((match, template_width, template_height))
+            result[max(0, y - suppress_h) : y + suppress_h + 1, max(0, x - suppress_w) : x + suppress_w + 1] = -1.0
+        return found
+
+    def _prefilter_rejects(self, frame: "FrameViews", template_path: Path, scale: float, match_config: Dict[str, Any]) -> bool:
+        """Return True when the search area cannot contain the template, so matchTemplate can be skipped.
+
+        If the template is on screen, every one of its pixels is also a pixel of the search
+        area, so the area's coarse color histogram covers the template's histogram bin by
+        bin. The check measures which share of the template's pixels the area can explain
+        and rejects the template only when that share is below `1 - prefilter_margin`.
+        The margin absorbs compression noise, scaling and colors near bin edges.
+        """
+        enabled = match_config.get("prefilter")
+        if enabled is None:
+            enabled = self.prefilter
+        if not enabled:
+            return False
+
+        margin = match_config.get("prefilter_margin")
+        margin = self.prefilter_margin if margin is None else min(1.0, max(0.0, float(margin)))
+        template_histogram = self.template_cache.get(
+            template_path,
+            lambda path: self._build_template_histogram(path, scale),
+            variant=f"histogram_scale_{scale:.4f}",
+        )
+        if template_histogram is None:
+            return False
+        frame_histogram = frame.get("histogram", lambda: _color_histogram(frame.image))
+        template_pixels = float(template_histogram.sum())
+        explained = float(np.minimum(template_histogram, frame_histogram).sum()) / max(1.0, template_pixels)
+
+        self._count("prefilter", "checked")
+        if explained >= 1.0 - margin:
+            return False
+        self._count("prefilter", "skipped")
+        return True
+
+    def _build_template_histogram(self, path: Path, scale: float) -> Any:
+        template = self.load_scaled_template(path, scale)
+        if template is None:
+            return None
+        return _color_histogram(template)
+
+    def _locate_template(
+        self,
+        frame: "FrameViews",
+        template: Any,
+        template_path: Path,
+        match_config: Dict[str, Any],
+        scale: float = 1.0,
+        threshold: Optional[float] = None,
+    ) -> tuple[float, tuple[int, int]]:
+        strategy = str(match_config.get("strategy") or self.match_strategy).lower()
+        if strategy == "pyramid":
+            return self._match_pyramid(frame, template, template_path, match_config, scale, threshold)
+        result = cv2.matchTemplate(frame.image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_value, _, max_location = cv2.minMaxLoc(result)
+        return float(max_value), max_location
 
+    def _template_result(self, template_path: Path, template: Any, score: float, top_left_x: int, top_left_y: int) -> MatchResult:
         template_height, template_width = template.shape[:2]
-        top_left_x, top_left_y = max_location
         return MatchResult(
             scenario={},
             template_path=template_path,
-            score=float(max_value),
+            score=float(score),
             center_x=int(top_left_x + template_width / 2),
             center_y=int(top_left_y + template_height / 2),
             top_left_x=int(top_left_x),
             top_left_y=int(top_left_y),
         )
 
-    def find_first_match(self, screenshot_path: Path, scenarios: Iterable[Dict[str, Any]], base_dir: Path) -> Optional[MatchResult]:
+    def _remember_hit(self, match: Optional[MatchResult]) -> None:
+        """Keep the winning template's position as the adaptive ROI prior for the next frames."""
+        if match is None or match.match_type != "template":
+            return
+        with self._hit_lock:
+            self.hit_regions[str(match.template_path)] = (match.center_x, match.center_y)
+
+    def _prior_bounds(
+        self,
+        template_path: Path,
+        template_width: int,
+        template_height: int,
+        padding: int,
+    ) -> Optional[tuple[int, int, int, int]]:
+        with self._hit_lock:
+            center = self.hit_regions.get(str(template_path))
+        if center is None:
+            return None
+        center_x, center_y = center
+        left = center_x - template_width // 2 - padding
+        top = center_y - template_height // 2 - padding
+        return left, top, left + template_width + padding * 2, top + template_height + padding * 2
+
+    def _count(self, section: str, key: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            values = self.counters.setdefault(section, {})
+            values[key] = values.get(key, 0) + amount
+
+    def load_hit_history(self, csv_paths: Iterable[Path]) -> int:
+        """Seed template hit regions from previous results CSV files, oldest first."""
+        loaded = 0
+        for csv_path in csv_paths:
+            try:
+                with Path(csv_path).open("r", newline="", encoding="utf-8-sig") as file:
+                    rows = list(csv.DictReader(file))
+            except (OSError, csv.Error) as exc:
+                self.logger.warning("Could not read match history %s: %s", csv_path, exc)
+                continue
+            for row in rows:
+                if row.get("match_type") != "template" or not row.get("template_path"):
+                    continue
+                try:
+                    center = (int(row["match_x"]), int(row["match_y"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                with self._hit_lock:
+                    self.hit_regions[row["template_path"]] = center
+                loaded += 1
+        return loaded
+
+    def _match_pyramid(
+        self,
+        frame: "FrameViews",
+        template: Any,
+        template_path: Path,
+        match_config: Dict[str, Any],
+        scale: float = 1.0,
+        threshold: Optional[float] = None,
+    ) -> tuple[float, tuple[int, int]]:
+        """Locate candidates on downscaled grayscale images, then score them at full resolution.
+
+        The returned score is the full-resolution color TM_CCOEFF_NORMED value inside a
+        small window, so it is directly comparable to the `full` strategy thresholds.
+        On flat or gradient backgrounds the coarse map can be nearly 1.0 everywhere and
+        the true location may not be among the refined peaks. When no refined peak
+        reaches `threshold` but an unrefined coarse peak is still within
+        PYRAMID_COARSE_MARGIN of it, the full-resolution map decides instead.
+        """
+        template_height, template_width = template.shape[:2]
+        levels = _pyramid_levels(template, int(match_config.get("pyramid_levels", PYRAMID_MAX_LEVELS)))
+        if levels == 0:
+            result = cv2.matchTemplate(frame.image, template, cv2.TM_CCOEFF_NORMED)
+            _, max_value, _, max_location = cv2.minMaxLoc(result)
+            return float(max_value), max_location
+
+        small_screen = frame.get(("gray_pyramid", levels), lambda: _pyramid_down(frame.gray(), levels))
+        small_template = self.template_cache.get(
+            template_path,
+            lambda path: self._build_gray_pyramid(path, levels, scale),
+            variant=f"gray_pyramid_{levels}_scale_{scale:.4f}",
+        )
+        if (
+            small_template is None
+            or small_template.shape[0] > small_screen.shape[0]
+            or small_template.shape[1] > small_screen.shape[1]
+        ):
+            result = cv2.matchTemplate(frame.image, template, cv2.TM_CCOEFF_NORMED)
+            _, max_value, _, max_location = cv2.minMaxLoc(result)
+            return float(max_value), max_location
+
+        self._count("pyramid", "searches")
+        coarse = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED)
+        factor = 1 << levels
+        padding = factor * 2
+        screen_height, screen_width = frame.image.shape[:2]
+        candidate_count = max(1, int(match_config.get("pyramid_candidates", PYRAMID_CANDIDATES)))
+        suppress_w = max(1, small_template.shape[1] // 2)
+        suppress_h = max(1, small_template.shape[0] // 2)
+
+        best_value = -1.0
+        best_location = (0, 0)
+        for _ in range(candidate_count):
+            _, coarse_value, _, (coarse_x, coarse_y) = cv2.minMaxLoc(coarse)
+            if coarse_value <= -1.0:
+                break
+            left = max(0, coarse_x * factor - padding)
+            top = max(0, coarse_y * factor - padding)
+            right = min(screen_width, coarse_x * factor + template_width + padding)
+            bottom = min(screen_height, coarse_y * factor + template_height + padding)
+            if right - left >= template_width and bottom - top >= template_height:
+                window = frame.image[top:bottom, left:right]
+                refined = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+                _, value, _, (x, y) = cv2.minMaxLoc(refined)
+                if value > best_value:
+                    best_value = float(value)
+                    best_location = (left + x, top + y)
+            coarse[
+                max(0, coarse_y - suppress_h) : coarse_y + suppress_h + 1,
+                max(0, coarse_x - suppress_w) : coarse_x + suppress_w + 1,
+            ] = -1.0
+
+        if threshold is not None and best_value < threshold:
+            _, unrefined_value, _, _ = cv2.minMaxLoc(coarse)
+            if unrefined_value >= threshold - PYRAMID_COARSE_MARGIN:
+                self._count("pyramid", "full_fallbacks")
+                result = cv2.matchTemplate(frame.image, template, cv2.TM_CCOEFF_NORMED)
+                _, max_value, _, max_location = cv2.minMaxLoc(result)
+                return float(max_value), max_location
+        return best_value, best_location
+
+    def read_screenshot(self, screenshot_path: Any) -> Any:
+        """Load a screenshot file. An in-memory BGR frame is returned as is.
+
+        The find_* methods take either a file path or `screenshot_image`; with an
+        in-memory frame the path may be None and nothing touches the disk.
+        """
+        if isinstance(screenshot_path, np.ndarray):
+            return screenshot_path
+        if screenshot_path is None:
+            raise ValueError("No screenshot file or in-memory frame was given.")
         screenshot = cv2.imread(str(screenshot_path), cv2.IMREAD_COLOR)
         if screenshot is None:
             raise ValueError(f"Could not read screenshot: {screenshot_path}")
+        return screenshot
+
+    def find_first_match(
+        self,
+        screenshot_path: Optional[Path],
+        scenarios: Iterable[Dict[str, Any]],
+        base_dir: Path,
+        screenshot_image: Any = None,
+    ) -> Optional[MatchResult]:
+        screenshot = screenshot_image
+        if screenshot is None:
+            screenshot = self.read_screenshot(screenshot_path)
+        frame = FrameViews(screenshot)
+        scenarios = list(scenarios)
+        self._sync_feature_index(scenarios, base_dir)
+        scenarios = self._plausible_scenarios(frame, scenarios)
+
+        if self.match_workers > 1:
+            return self._find_first_match_parallel(frame, scenarios, base_dir)
 
         for scenario in scenarios:
             match_configs = self._scenario_match_configs(scenario)
@@ -89,44 +844,269 @@ class ImageMatcher:
             for match_config in match_configs:
                 match_type = str(match_config.get("type", "template")).lower()
                 if match_type == "ocr":
-                    match = self.find_ocr_text(screenshot_path, screenshot, match_config)
+                    match = self._match_ocr(frame, match_config)
+                elif match_type == "features":
+                    match = self._match_features(frame, match_config, base_dir)
                 else:
-                    match = self._find_best_template_match(screenshot_path, screenshot, match_config, base_dir)
+                    match = self._find_best_template_match(frame, match_config, base_dir)
                 if match and (best_match is None or match.score > best_match.score):
                     best_match = match
+                if self._is_early_exit(match, match_config):
+                    break
 
             if best_match:
                 best_match.scenario = scenario
+                self._remember_hit(best_match)
                 return best_match
 
         return None
 
+    def _plausible_scenarios(self, frame: "FrameViews", scenarios: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Keep only scenarios that can appear on the recognized screen state.
+
+        Scenarios without a `state` (for example global error popups) are always kept, and
+        nothing is dropped when the classifier does not recognize the screen.
+        """
+        if self.state_classifier is None or not len(self.state_classifier):
+            return scenarios
+        prediction = frame.get("screen_state", lambda: self.state_classifier.predict(frame.image))
+        if prediction is None:
+            self._count("screen_state", "unknown")
+            return scenarios
+        self._count("screen_state", "recognized")
+        plausible = [
+            scenario
+            for scenario in scenarios
+            if not scenario_states(scenario) or scenario_states(scenario) & prediction.states
+        ]
+        self._count("screen_state", "scenarios_skipped", len(scenarios) - len(plausible))
+        return plausible
+
+    def _find_first_match_parallel(
+        self,
+        frame: "FrameViews",
+        scenarios: Iterable[Dict[str, Any]],
+        base_dir: Path,
+    ) -> Optional[MatchResult]:
+        """Evaluate scenarios on the worker pool, at most `match_workers` scenarios ahead.
+
+        Scenarios are submitted in order while earlier ones are being decided, and nothing
+        more is submitted once a scenario has matched, so a scan does little more work than
+        the serial loop. Results are consumed in scenario order and compared in submission
+        order, so the selected match is the same one the serial loop would return.
+        """
+        executor = self._get_executor()
+        remaining = iter(scenarios)
+        window: deque[tuple[Dict[str, Any], list[tuple[Future, Dict[str, Any]]]]] = deque()
+        try:
+            while True:
+                while len(window) < self.match_workers:
+                    scenario = next(remaining, None)
+                    if scenario is None:
+                        break
+                    futures = self._submit_scenario(executor, frame, scenario, base_dir)
+                    if futures:
+                        window.append((scenario, futures))
+                if not window:
+                    return None
+
+                scenario, futures = window[0]
+                best_match: Optional[MatchResult] = None
+                for future, match_config in futures:
+                    match = future.result()
+                    if match and (best_match is None or match.score > best_match.score):
+                        best_match = match
+                    if self._is_early_exit(match, match_config):
+                        break
+                if best_match:
+                    best_match.scenario = scenario
+                    self._remember_hit(best_match)
+                    return best_match
+                window.popleft()
+        finally:
+            for _, futures in window:
+                for future, _ in futures:
+                    future.cancel()
+
+    def _submit_scenario(
+        self,
+        executor: ThreadPoolExecutor,
+        frame: "FrameViews",
+        scenario: Dict[str, Any],
+        base_dir: Path,
+    ) -> list[tuple[Future, Dict[str, Any]]]:
+        """Submit one scenario's template, feature and OCR checks, in config order."""
+        match_configs = self._scenario_match_configs(scenario)
+        if not match_configs:
+            self.logger.warning("Scenario '%s' has no match configuration.", scenario.get("name", "unnamed"))
+            return []
+
+        futures: list[tuple[Future, Dict[str, Any]]] = []
+        for match_config in match_configs:
+            match_type = str(match_config.get("type", "template")).lower()
+            if match_type == "ocr":
+                futures.append((executor.submit(self._match_ocr, frame, match_config), match_config))
+            elif match_type == "features":
+                futures.append((executor.submit(self._match_features, frame, match_config, base_dir), match_config))
+            else:
+                threshold = float(match_config.get("threshold", 0.85))
+                for template_path in self._template_paths(match_config, base_dir):
+                    future = executor.submit(self._match_template, frame, template_path, threshold, match_config)
+                    futures.append((future, match_config))
+        return futures
+
     def _find_best_template_match(
         self,
-        screenshot_path: Path,
-        screenshot: Any,
+        frame: "FrameViews",
         match_config: Dict[str, Any],
         base_dir: Path,
     ) -> Optional[MatchResult]:
-        template_values = self._template_values_from_config(match_config)
-        if not template_values:
+        template_paths = self._template_paths(match_config, base_dir)
+        if not template_paths:
             return None
 
         threshold = float(match_config.get("threshold", 0.85))
         best_match: Optional[MatchResult] = None
-        for template_value in template_values:
+        for template_path in template_paths:
+            match = self._match_template(frame, template_path, threshold, match_config)
+            if match and (best_match is None or match.score > best_match.score):
+                best_match = match
+            if self._is_early_exit(match, match_config):
+                break
+        return best_match
+
+    def _is_early_exit(self, match: Optional[MatchResult], match_config: Dict[str, Any]) -> bool:
+        """Return True when a match is confident enough to skip the remaining templates."""
+        if match is None:
+            return False
+        early_exit_score = match_config.get("early_exit_score")
+        if early_exit_score is None:
+            early_exit_score = self.early_exit_score
+        return early_exit_score is not None and match.score >= float(early_exit_score)
+
+    def _template_paths(self, match_config: Dict[str, Any], base_dir: Path) -> list[Path]:
+        template_paths: list[Path] = []
+        for template_value in self._template_values_from_config(match_config):
             template_path = Path(template_value)
             if not template_path.is_absolute():
                 template_path = base_dir / template_path
+            template_paths.append(template_path)
+        return template_paths
 
-            match = self.find_template(screenshot_path, template_path, threshold, screenshot_image=screenshot)
-            if match and (best_match is None or match.score > best_match.score):
+    def _template_features(self, template_path: Path) -> Optional[TemplateFeatures]:
+        return self.template_cache.get(template_path, self._build_template_features, variant="orb")
+
+    def _build_template_features(self, path: Path) -> Optional[TemplateFeatures]:
+        template = self.load_template(path)
+        if template is None:
+            return None
+        features = compute_template_features(str(path), template)
+        if len(features) < 8:
+            self.logger.warning("Features template has only %s keypoints and will rarely match: %s", len(features), path)
+        return features
+
+    def _sync_feature_index(self, scenarios: list[Dict[str, Any]], base_dir: Path, keep_existing: bool = False) -> None:
+        """Make the shared descriptor index hold exactly the `features` templates of these scenarios.
+
+        With keep_existing, templates are only added, so a pass over a subset of the
+        scenarios does not rebuild the index (and every frame's matches) built for all of them.
+        """
+        templates: list[TemplateFeatures] = []
+        for scenario in scenarios:
+            for match_config in self._scenario_match_configs(scenario):
+                if str(match_config.get("type", "template")).lower() != "features":
+                    continue
+                for template_path in self._template_paths(match_config, base_dir):
+                    features = self._template_features(template_path)
+                    if features is not None:
+                        templates.append(features)
+        if keep_existing:
+            self.feature_index.include(templates)
+        else:
+            self.feature_index.sync(templates)
+
+    def _frame_correspondences(self, frame: "FrameViews") -> FeatureCorrespondences:
+        """Detect the frame's ORB features and match them against the whole index, once per frame."""
+
+        def build() -> FeatureCorrespondences:
+            self._count("features", "frame_passes")
+            keypoints, descriptors = create_orb(self.feature_keypoints).detectAndCompute(frame.gray(), None)
+            points = np.array([keypoint.pt for keypoint in keypoints], dtype=np.float32).reshape(-1, 2)
+            return self.feature_index.match(points, descriptors)
+
+        return frame.get(("features", self.feature_index.version), build)
+
+    def _match_features(self, frame: "FrameViews", match_config: Dict[str, Any], base_dir: Path) -> Optional[MatchResult]:
+        """Match templates by ORB keypoints, tolerating scale, rotation and partly animated UI.
+
+        A template matches when a RANSAC similarity transform explains at least
+        `min_inliers` keypoint matches and the inlier share reaches `threshold`. The
+        score is that inlier share.
+        """
+        threshold = float(match_config.get("threshold", 0.5))
+        min_inliers = max(3, int(match_config.get("min_inliers", 12)))
+        left, top, right, bottom = self._search_bounds(frame.image, match_config.get("search_area"))
+        correspondences = self._frame_correspondences(frame)
+
+        best_match: Optional[MatchResult] = None
+        for template_path in self._template_paths(match_config, base_dir):
+            features = self._template_features(template_path)
+            if features is None:
+                continue
+            self._count("features", "lookups")
+            template_points, frame_points = correspondences.for_template(features.path)
+            inside = (
+                (frame_points[:, 0] >= left)
+                & (frame_points[:, 0] < right)
+                & (frame_points[:, 1] >= top)
+                & (frame_points[:, 1] < bottom)
+            )
+            template_points, frame_points = template_points[inside], frame_points[inside]
+            if len(template_points) < min_inliers:
+                continue
+            transform, inlier_mask = cv2.estimateAffinePartial2D(
+                template_points, frame_points, method=cv2.RANSAC, ransacReprojThreshold=5.0
+            )
+            if transform is None:
+                continue
+            inliers = int(inlier_mask.sum())
+            score = inliers / len(template_points)
+            if inliers < min_inliers or score < threshold:
+                continue
+
+            corners = np.array(
+                [[0, 0], [features.width, 0], [features.width, features.height], [0, features.height]],
+                dtype=np.float32,
+            )
+            projected = corners @ transform[:, :2].T + transform[:, 2]
+            center_x, center_y = projected.mean(axis=0)
+            match = MatchResult(
+                scenario={},
+                template_path=template_path,
+                score=float(score),
+                center_x=int(round(center_x)),
+                center_y=int(round(center_y)),
+                top_left_x=int(round(projected[:, 0].min())),
+                top_left_y=int(round(projected[:, 1].min())),
+                match_type="features",
+            )
+            if best_match is None or match.score > best_match.score:
                 best_match = match
+            if self._is_early_exit(match, match_config):
+                break
         return best_match
 
-    def find_ocr_text(self, screenshot_path: Path, screenshot: Any, match_config: Dict[str, Any]) -> Optional[MatchResult]:
-        if pytesseract is None:
-            self.logger.warning("OCR scenario configured but pytesseract is not installed.")
+    def find_ocr_text(self, screenshot_path: Optional[Path], screenshot: Any, match_config: Dict[str, Any]) -> Optional[MatchResult]:
+        return self._match_ocr(FrameViews(screenshot), match_config)
+
+    def _match_ocr(self, frame: "FrameViews", match_config: Dict[str, Any]) -> Optional[MatchResult]:
+        """Answer one OCR config from the frame's shared OCR index.
+
+        Tesseract runs at most once per frame for each distinct search area and language;
+        every other OCR config with the same area and language reuses that result.
+        """
+        if self.ocr_backend is None:
+            self.logger.warning("OCR scenario configured but neither tesserocr nor pytesseract is installed.")
             return None
 
         target = str(match_config.get("text", "")).strip()
@@ -134,20 +1114,59 @@ class ImageMatcher:
             self.logger.warning("OCR scenario has no target text.")
             return None
 
+        best: Optional[OcrLine] = None
+        for line in self._ocr_candidates(frame, match_config):
+            if best is None or line.score > best.score:
+                best = line
+
+        if best is None:
+            return None
+        return self._ocr_result(match_config, best)
+
+    def _ocr_candidates(self, frame: "FrameViews", match_config: Dict[str, Any]) -> list[OcrLine]:
+        """Return the OCR lines in the frame's shared index that match the config's text and threshold."""
+        target = str(match_config.get("text", "")).strip()
+        if self.ocr_backend is None or not target:
+            return []
         threshold = float(match_config.get("threshold", 0.6))
         lang = str(match_config.get("lang", "kor+eng"))
         contains = bool(match_config.get("contains", True))
-        x_offset, y_offset, roi = self._crop_search_area(screenshot, match_config.get("search_area"))
+        bounds = self._search_bounds(frame.image, match_config.get("search_area"))
+        self._count("ocr", "lookups")
+        index = frame.get(("ocr", bounds, lang), lambda: self._build_ocr_index(frame.image, bounds, lang))
+        if index is None:
+            return []
+        return [line for line in index.candidates(self._normalize_text(target), contains) if line.score >= threshold]
+
+    def _ocr_result(self, match_config: Dict[str, Any], line: OcrLine) -> MatchResult:
+        target = str(match_config.get("text", "")).strip()
+        return MatchResult(
+            scenario={},
+            template_path=Path(f"ocr:{target}"),
+            score=float(line.score),
+            center_x=int((line.left + line.right) / 2),
+            center_y=int((line.top + line.bottom) / 2),
+            top_left_x=int(line.left),
+            top_left_y=int(line.top),
+            match_type="ocr",
+            matched_text=line.text,
+        )
 
+    def _build_ocr_index(self, image: Any, bounds: tuple[int, int, int, int], lang: str) -> Optional["OcrIndex"]:
+        x_offset, y_offset, right, bottom = bounds
+        roi = image[y_offset:bottom, x_offset:right]
         gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
         gray = cv2.bilateralFilter(gray, 5, 50, 50)
-        try:
-            data = pytesseract.image_to_data(gray, lang=lang, output_type=pytesseract.Output.DICT)
-        except (pytesseract.TesseractNotFoundError, pytesseract.TesseractError) as exc:
-            self.logger.warning("OCR failed: %s", exc)
-            return None
+        cache_key = self.ocr_cache.key(gray, lang, self.ocr_backend.name)
+        data = self.ocr_cache.get(cache_key)
+        if data is None:
+            self._count("ocr", "runs")
+            try:
+                data = self.ocr_cache.put(cache_key, self.ocr_backend.image_to_data(gray, lang))
+            except OcrBackendError as exc:
+                self.logger.warning("OCR failed: %s", exc)
+                return None
 
-        best: Optional[tuple[float, str, tuple[int, int, int, int]]] = None
         line_groups: dict[tuple[int, int, int], list[int]] = {}
         for index, text in enumerate(data.get("text", [])):
             if str(text).strip():
@@ -158,16 +1177,12 @@ class ImageMatcher:
                 )
                 line_groups.setdefault(key, []).append(index)
 
+        lines: list[OcrLine] = []
         for indexes in line_groups.values():
             texts = [str(data["text"][index]).strip() for index in indexes if str(data["text"][index]).strip()]
             if not texts:
                 continue
             line_text = " ".join(texts)
-            normalized_line = self._normalize_text(line_text)
-            normalized_target = self._normalize_text(target)
-            is_match = normalized_target in normalized_line if contains else normalized_target == normalized_line
-            if not is_match:
-                continue
 
             confidences = []
             lefts, tops, rights, bottoms = [], [], [], []
@@ -187,44 +1202,36 @@ class ImageMatcher:
                 rights.append(left + width)
                 bottoms.append(top + height)
 
-            score = (sum(confidences) / len(confidences) / 100.0) if confidences else 0.0
-            if score < threshold:
-                continue
-            bbox = (min(lefts), min(tops), max(rights), max(bottoms))
-            if best is None or score > best[0]:
-                best = (score, line_text, bbox)
-
-        if best is None:
-            return None
-
-        score, matched_text, (left, top, right, bottom) = best
-        absolute_left = x_offset + left
-        absolute_top = y_offset + top
-        absolute_right = x_offset + right
-        absolute_bottom = y_offset + bottom
-        return MatchResult(
-            scenario={},
-            template_path=Path(f"ocr:{target}"),
-            score=float(score),
-            center_x=int((absolute_left + absolute_right) / 2),
-            center_y=int((absolute_top + absolute_bottom) / 2),
-            top_left_x=int(absolute_left),
-            top_left_y=int(absolute_top),
-            match_type="ocr",
-            matched_text=matched_text,
-        )
+            lines.append(
+                OcrLine(
+                    text=line_text,
+                    normalized=self._normalize_text(line_text),
+                    score=(sum(confidences) / len(confidences) / 100.0) if confidences else 0.0,
+                    left=x_offset + min(lefts),
+                    top=y_offset + min(tops),
+                    right=x_offset + max(rights),
+                    bottom=y_offset + max(bottoms),
+                )
+            )
+        return OcrIndex(lines)
 
     def _crop_search_area(self, image: Any, search_area: Any) -> tuple[int, int, Any]:
         if not isinstance(search_area, dict):
             return 0, 0, image
+        x, y, right, bottom = self._search_bounds(image, search_area)
+        return x, y, image[y:bottom, x:right]
+
+    def _search_bounds(self, image: Any, search_area: Any) -> tuple[int, int, int, int]:
         height, width = image.shape[:2]
+        if not isinstance(search_area, dict):
+            return 0, 0, width, height
         x = max(0, min(int(search_area.get("x", 0)), width - 1))
         y = max(0, min(int(search_area.get("y", 0)), height - 1))
         w = max(1, int(search_area.get("w", width - x)))
         h = max(1, int(search_area.get("h", height - y)))
         right = max(x + 1, min(x + w, width))
         bottom = max(y + 1, min(y + h, height))
-        return x, y, image[y:bottom, x:right]
+        return x, y, right, bottom
 
     def _normalize_text(self, text: str) -> str:
         return "".join(str(text).lower().split())
@@ -232,11 +1239,11 @@ class ImageMatcher:
     def _scenario_match_configs(self, scenario: Dict[str, Any]) -> list[Dict[str, Any]]:
         match_any = scenario.get("match_any")
         if isinstance(match_any, list):
-            return [value for value in match_any if isinstance(value, dict)]
+            return [self._with_capture_resolution(value, scenario) for value in match_any if isinstance(value, dict)]
 
         match_value = scenario.get("match")
         if isinstance(match_value, dict):
-            return [match_value]
+            return [self._with_capture_resolution(match_value, scenario)]
 
         if scenario.get("ocr_text"):
             return [
@@ -246,6 +1253,7 @@ class ImageMatcher:
                     "threshold": scenario.get("ocr_threshold", scenario.get("threshold", 0.6)),
                     "lang": scenario.get("ocr_lang", "kor+eng"),
                     "search_area": scenario.get("search_area"),
+                    "early_exit_score": scenario.get("early_exit_score"),
                 }
             ]
 
@@ -257,10 +1265,23 @@ class ImageMatcher:
                     "template": scenario.get("template"),
                     "templates": scenario.get("templates"),
                     "threshold": scenario.get("threshold", 0.85),
+                    "strategy": scenario.get("strategy"),
+                    "search_area": scenario.get("search_area"),
+                    "adaptive_roi": scenario.get("adaptive_roi"),
+                    "prefilter": scenario.get("prefilter"),
+                    "prefilter_margin": scenario.get("prefilter_margin"),
+                    "early_exit_score": scenario.get("early_exit_score"),
+                    "capture_resolution": scenario.get("capture_resolution"),
                 }
             ]
         return []
 
+    def _with_capture_resolution(self, match_config: Dict[str, Any], scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Let match/match_any configs inherit the scenario-level capture_resolution."""
+        if "capture_resolution" in match_config or not scenario.get("capture_resolution"):
+            return match_config
+        return {**match_config, "capture_resolution": scenario["capture_resolution"]}
+
     def _template_values_from_config(self, match_config: Dict[str, Any]) -> list[str]:
         values: list[str] = []
         templates_value = match_config.get("templates")
@@ -0,0 +1,173 @@
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import pytesseract
+except ImportError:  # Optional OCR dependency.
+    pytesseract = None
+
+try:
+    import tesserocr
+except ImportError:  # Optional in-process OCR dependency.
+    tesserocr = None
+
+TSV_COLUMNS = [
+    "level",
+    "page_num",
+    "block_num",
+    "par_num",
+    "line_num",
+    "word_num",
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "text",
+]
+
+
+class OcrBackendError(RuntimeError):
+    """Raised when an OCR backend cannot recognize an image."""
+
+
+class OcrBackend(ABC):
+    """Runs tesseract on a grayscale image and returns pytesseract-style `image_to_data` columns."""
+
+    name = "base"
+
+    @abstractmethod
+    def image_to_data(self, image: Any, lang: str) -> Dict[str, list]:
+        """Return the recognized words with their boxes and confidences."""
+
+    def close(self) -> None:
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    """Spawns tesseract through pytesseract for every call. Slow, but needs only tesseract.exe."""
+
+    name = "pytesseract"
+
+    def __init__(self, command_path: Optional[str] = None):
+        if pytesseract is None:
+            raise OcrBackendError("pytesseract is not installed.")
+        if command_path:
+            pytesseract.pytesseract.tesseract_cmd = command_path
+
+    def image_to_data(self, image: Any, lang: str) -> Dict[str, list]:
+        try:
+            return pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+        except (pytesseract.TesseractNotFoundError, pytesseract.TesseractError) as exc:
+            raise OcrBackendError(str(exc)) from exc
+
+
+class TesserocrBackend(OcrBackend):
+    """Keeps tesseract engines loaded in-process through the tesserocr binding.
+
+    Engines are not thread-safe, so each call borrows an idle engine for its language
+    and a new one is created only when every engine for that language is busy.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, tessdata_dir: Optional[str] = None):
+        if tesserocr is None:
+            raise OcrBackendError("tesserocr is not installed.")
+        self.tessdata_dir = tessdata_dir
+        self._idle: Dict[str, list[Any]] = {}
+        self._all: list[Any] = []
+        self._lock = threading.Lock()
+
+    def image_to_data(self, image: Any, lang: str) -> Dict[str, list]:
+        api = self._acquire(lang)
+        try:
+            height, width = image.shape[:2]
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            tsv = api.GetTSVText(0)
+        except RuntimeError as exc:
+            raise OcrBackendError(str(exc)) from exc
+        finally:
+            self._release(lang, api)
+        return parse_tsv(tsv)
+
+    def close(self) -> None:
+        with self._lock:
+            engines, self._all = self._all, []
+            self._idle.clear()
+        for api in engines:
+            api.End()
+
+    def _acquire(self, lang: str) -> Any:
+        with self._lock:
+            idle = self._idle.setdefault(lang, [])
+            if idle:
+                return idle.pop()
+        kwargs: Dict[str, Any] = {"lang": lang}
+        if self.tessdata_dir:
+            kwargs["path"] = self.tessdata_dir
+        try:
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+        except RuntimeError as exc:
+            raise OcrBackendError(f"Could not start tesseract engine for '{lang}': {exc}") from exc
+        with self._lock:
+            self._all.append(api)
+        return api
+
+    def _release(self, lang: str, api: Any) -> None:
+        with self._lock:
+            if api in self._all:
+                self._idle.setdefault(lang, []).append(api)
+
+
+def parse_tsv(tsv: str) -> Dict[str, list]:
+    """Convert tesseract TSV output into the dict layout of `pytesseract.Output.DICT`."""
+    data: Dict[str, list] = {column: [] for column in TSV_COLUMNS}
+    for raw_line in tsv.splitlines():
+        parts = raw_line.split("\t")
+        if len(parts) < len(TSV_COLUMNS) - 1 or parts[0] == "level":
+            continue
+        parts += [""] * (len(TSV_COLUMNS) - len(parts))
+        for column, value in zip(TSV_COLUMNS, parts):
+            if column == "text":
+                data[column].append(value)
+            elif column == "conf":
+                data[column].append(float(value) if value else -1.0)
+            else:
+                data[column].append(int(value) if value else 0)
+    return data
+
+
+def tessdata_dir_for(command_path: Optional[str]) -> Optional[str]:
+    """Return the tessdata folder next to tesseract.exe, or TESSDATA_PREFIX when set."""
+    env_value = os.environ.get("TESSDATA_PREFIX")
+    if env_value:
+        return env_value
+    if command_path:
+        candidate = Path(command_path).parent / "tessdata"
+        if candidate.is_dir():
+            return str(candidate)
+    return None
+
+
+OCR_BACKENDS = ("pytesseract", "tesserocr", "auto")
+
+
+def create_ocr_backend(name: str = "pytesseract", command_path: Optional[str] = None) -> Optional[OcrBackend]:
+    """Create the requested OCR backend. `auto` prefers the in-process engine when available."""
+    logger = logging.getLogger("OcrBackend")
+    name = str(name or "pytesseract").lower()
+    if name not in OCR_BACKENDS:
+        logger.warning("Unknown ocr_backend '%s'. Using 'pytesseract'.", name)
+        name = "pytesseract"
+    if name in ("auto", "tesserocr") and tesserocr is not None:
+        return TesserocrBackend(tessdata_dir_for(command_path))
+    if name == "tesserocr":
+        logger.warning("tesserocr is not installed. Falling back to pytesseract.")
+    if pytesseract is not None:
+        return PytesseractBackend(command_path)
+    return None
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHED_COLUMNS = ("block_num", "par_num", "line_num", "left", "top", "width", "height", "conf", "text")
+CACHE_FILE_VERSION = 1
+
+
+class OcrResultCache:
+    """LRU cache of OCR output keyed by a hash of the preprocessed ROI pixels, language and backend.
+
+    When `persist_path` is set, entries are loaded from that JSON file at startup and
+    written back by `save()`, so screens seen in earlier runs skip tesseract entirely.
+    """
+
+    def __init__(self, max_entries: int = 512, persist_path: Optional[Path] = None):
+        self.max_entries = max(0, int(max_entries))
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        if self.persist_path and self.max_entries:
+            self.load()
+
+    @staticmethod
+    def key(image: Any, lang: str, config: str = "") -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{image.shape}|{image.dtype}|{lang}|{config}|".encode("utf-8"))
+        digest.update(memoryview(image).cast("B") if image.flags.c_contiguous else image.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, list]]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: Dict[str, Any]) -> Dict[str, list]:
+        """Store the columns OCR matching needs and return that trimmed copy."""
+        trimmed = {column: list(data.get(column, [])) for column in CACHED_COLUMNS}
+        if not self.max_entries:
+            return trimmed
+        with self._lock:
+            self._entries[key] = trimmed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return trimmed
+
+    def load(self) -> None:
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with self.persist_path.open("r", encoding="utf-8") as file:
+                payload = json.load(file)
+        except (OSError, json.JSONDecodeError) as exc:
+            self.logger.warning("Could not read OCR cache %s: %s", self.persist_path, exc)
+            return
+        if payload.get("version") != CACHE_FILE_VERSION:
+            return
+        with self._lock:
+            for key, data in payload.get("entries", [])[-self.max_entries :]:
+                self._entries[str(key)] = data
+
+    def save(self) -> None:
+        if not self.persist_path or not self.max_entries:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.persist_path.open("w", encoding="utf-8") as file:
+                json.dump({"version": CACHE_FILE_VERSION, "entries": entries}, file, ensure_ascii=False)
+        except OSError as exc:
+            self.logger.warning("Could not write OCR cache %s: %s", self.persist_path, exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
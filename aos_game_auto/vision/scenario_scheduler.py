@@ -0,0 +1,49 @@
+from typing import Any, Dict, Iterable, Optional
+
+
+class ScenarioScheduler:
+    """Orders scan-mode scenarios so frequently and recently matched ones are checked first.
+
+    Scenarios are grouped by their `priority` field (higher first, default 0). Inside one
+    priority level they are sorted by an exponentially decayed hit count, and ties keep
+    config order. Scenarios that must always be checked before others should use a
+    higher `priority` instead of relying on the learned order.
+    """
+
+    def __init__(self, decay: float = 0.95):
+        self.decay = min(max(float(decay), 0.0), 1.0)
+        self._scores: Dict[int, float] = {}
+        self.hits = 0
+        self.iterations = 0
+
+    def order(self, scenarios: Iterable[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        indexed = list(enumerate(scenarios))
+        indexed.sort(
+            key=lambda item: (
+                -self._priority(item[1]),
+                -self._scores.get(id(item[1]), 0.0),
+                item[0],
+            )
+        )
+        return [scenario for _, scenario in indexed]
+
+    def record(self, matched_scenario: Optional[Dict[str, Any]]) -> None:
+        """Decay every score by one iteration and credit the matched scenario, if any."""
+        self.iterations += 1
+        for key in list(self._scores):
+            score = self._scores[key] * self.decay
+            if score < 1e-6:
+                del self._scores[key]
+            else:
+                self._scores[key] = score
+        if matched_scenario is not None:
+            self.hits += 1
+            key = id(matched_scenario)
+            self._scores[key] = self._scores.get(key, 0.0) + 1.0
+
+    @staticmethod
+    def _priority(scenario: Dict[str, Any]) -> float:
+        try:
+            return float(scenario.get("priority", 0))
+        except (TypeError, ValueError):
+            return 0.0
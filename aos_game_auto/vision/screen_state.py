@@ -0,0 +1,120 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import cv2
+import numpy as np
+
+EMBEDDING_SIZE = (32, 18)
+
+
+def embed_screen(image: Any) -> Any:
+    """Return a unit-length, zero-mean 32x18 grayscale vector of a screenshot.
+
+    The dot product of two embeddings is their correlation, so lighting changes and
+    small overlays barely move it while a different screen layout does.
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    vector = cv2.resize(gray, EMBEDDING_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    vector -= vector.mean()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+def scenario_states(scenario: Dict[str, Any]) -> set[str]:
+    """Return the states a scenario declares with `state` (a string or a list of strings)."""
+    value = scenario.get("state")
+    if isinstance(value, str):
+        return {value} if value else set()
+    if isinstance(value, list):
+        return {str(item) for item in value if item}
+    return set()
+
+
+@dataclass
+class ScreenStatePrediction:
+    states: set[str]
+    distance: float
+
+
+class ScreenStateClassifier:
+    """k-nearest-neighbour screen recognizer over tiny frame embeddings.
+
+    A frame gets the union of the labels of its `neighbors` nearest samples that lie
+    within `max_distance` (1 - correlation). When no sample is that close, the state is
+    unknown and callers should not narrow anything.
+    """
+
+    def __init__(self, neighbors: int = 3, max_distance: float = 0.2):
+        self.neighbors = max(1, int(neighbors))
+        self.max_distance = float(max_distance)
+        self.labels: list[set[str]] = []
+        self._embeddings: list[Any] = []
+        self._matrix: Optional[Any] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, image: Any, states: Iterable[str]) -> None:
+        labels = {str(state) for state in states if state}
+        if not labels:
+            return
+        self._embeddings.append(embed_screen(image))
+        self.labels.append(labels)
+        self._matrix = None
+
+    def add_file(self, path: Path, states: Iterable[str]) -> bool:
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            self.logger.warning("Screen state sample could not be read: %s", path)
+            return False
+        self.add(image, states)
+        return True
+
+    def predict(self, image: Any) -> Optional[ScreenStatePrediction]:
+        if not self.labels:
+            return None
+        if self._matrix is None:
+            self._matrix = np.stack(self._embeddings)
+        distances = 1.0 - self._matrix @ embed_screen(image)
+        nearest = np.argsort(distances)[: self.neighbors]
+        states: set[str] = set()
+        for index in nearest:
+            if distances[index] <= self.max_distance:
+                states |= self.labels[int(index)]
+        if not states:
+            return None
+        return ScreenStatePrediction(states=states, distance=float(distances[nearest[0]]))
+
+
+def build_state_classifier(
+    scenarios: Iterable[Dict[str, Any]],
+    base_dir: Path,
+    states_dir: Optional[Path],
+    neighbors: int = 3,
+    max_distance: float = 0.2,
+) -> ScreenStateClassifier:
+    """Collect labeled screenshots for the classifier.
+
+    Samples are every PNG in `states_dir/<state>/` plus the `reference_screen` the
+    template capture GUI stores with each scenario, labeled with that scenario's states.
+    """
+    classifier = ScreenStateClassifier(neighbors, max_distance)
+    if states_dir is not None and states_dir.is_dir():
+        for state_dir in sorted(path for path in states_dir.iterdir() if path.is_dir()):
+            for sample in sorted(state_dir.glob("*.png")):
+                classifier.add_file(sample, [state_dir.name])
+
+    for scenario in scenarios:
+        states = scenario_states(scenario)
+        reference = scenario.get("reference_screen")
+        if not states or not reference:
+            continue
+        path = Path(str(reference))
+        if not path.is_absolute():
+            path = base_dir / path
+        if path.exists():
+            classifier.add_file(path, states)
+    return classifier
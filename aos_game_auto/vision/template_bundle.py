@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+BUNDLE_MAGIC = b"AOSTPLB1"
+BUNDLE_VERSION = 1
+ALIGNMENT = 64
+
+
+@dataclass
+class BundleEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    sha1: str
+    arrays: Dict[str, Dict[str, Any]]
+
+
+def file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with path.open("rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_bundle(
+    bundle_path: Path,
+    templates: Dict[Path, Dict[str, Any]],
+    resolutions: Iterable[Tuple[int, int]] = (),
+) -> int:
+    """Write decoded template variants into one memory-mappable bundle file.
+
+    `templates` maps each resolved template path to its variants (variant name -> ndarray).
+    `resolutions` are the device resolutions the scaled variants were made for; they are
+    kept in the manifest so a rebuild can keep them.
+    The file is an 8-byte magic, a little-endian u64 header length, a JSON manifest and
+    the raw arrays, each aligned to 64 bytes. It is written to a temp file first and
+    then moved into place.
+    """
+    entries: list[Dict[str, Any]] = []
+    blobs: list[tuple[int, bytes]] = []
+    offset = 0
+    for path, variants in templates.items():
+        stat = path.stat()
+        arrays: Dict[str, Dict[str, Any]] = {}
+        for variant, image in variants.items():
+            data = np.ascontiguousarray(image)
+            offset = _align(offset)
+            arrays[variant] = {"offset": offset, "shape": list(data.shape), "dtype": data.dtype.str}
+            blobs.append((offset, data.tobytes()))
+            offset += data.nbytes
+        entries.append(
+            {
+                "path": str(path),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": file_sha1(path),
+                "arrays": arrays,
+            }
+        )
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "resolutions": [[int(width), int(height)] for width, height in resolutions],
+        "templates": entries,
+    }
+    header = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+    data_start = _align(len(BUNDLE_MAGIC) + 8 + len(header))
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = bundle_path.with_name(bundle_path.name + ".tmp")
+    with temp_path.open("wb") as file:
+        file.write(BUNDLE_MAGIC)
+        file.write(struct.pack("<Q", len(header)))
+        file.write(header)
+        for blob_offset, blob in blobs:
+            file.seek(data_start + blob_offset)
+            file.write(blob)
+        file.truncate(data_start + _align(offset))
+    os.replace(temp_path, bundle_path)
+    return len(entries)
+
+
+class TemplateBundle:
+    """Read side of a compiled template bundle.
+
+    Opening reads only the manifest. `image()` memory-maps the file on first use and
+    returns read-only views, while `read_image()` copies one array without mapping so
+    short-lived readers such as the capture GUI do not keep the file locked on Windows.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        entries: Dict[str, BundleEntry],
+        data_start: int,
+        resolutions: Optional[list[Tuple[int, int]]] = None,
+    ):
+        self.path = path
+        self.entries = entries
+        self.data_start = data_start
+        self.resolutions = list(resolutions or [])
+        self._mapped: Optional[np.memmap] = None
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["TemplateBundle"]:
+        try:
+            with path.open("rb") as file:
+                if file.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+                    return None
+                (header_length,) = struct.unpack("<Q", file.read(8))
+                header = json.loads(file.read(header_length).decode("utf-8"))
+        except (OSError, struct.error, UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if header.get("version") != BUNDLE_VERSION:
+            return None
+        entries = {
+            entry["path"]: BundleEntry(
+                path=entry["path"],
+                mtime_ns=int(entry["mtime_ns"]),
+                size=int(entry["size"]),
+                sha1=str(entry["sha1"]),
+                arrays=entry["arrays"],
+            )
+            for entry in header.get("templates", [])
+        }
+        resolutions = [(int(width), int(height)) for width, height in header.get("resolutions", [])]
+        return cls(path, entries, _align(len(BUNDLE_MAGIC) + 8 + header_length), resolutions)
+
+    def entry(self, path: Path) -> Optional[BundleEntry]:
+        try:
+            return self.entries.get(str(path.resolve()))
+        except OSError:
+            return None
+
+    def is_fresh(self, path: Path) -> bool:
+        """Return True when the bundle holds this template and the source has not changed.
+
+        A different mtime/size falls back to comparing the content hash, so a checkout
+        that only touches files does not force a rebuild.
+        """
+        entry = self.entry(path)
+        if entry is None:
+            return False
+        try:
+            stat = path.resolve().stat()
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+            return True
+        return stat.st_size == entry.size and file_sha1(path.resolve()) == entry.sha1
+
+    def stale_paths(self, paths: Iterable[Path]) -> list[Path]:
+        return [path for path in paths if path.exists() and not self.is_fresh(path)]
+
+    def image(self, path: Path, variant: str = "color") -> Any:
+        entry = self.entry(path)
+        if entry is None or variant not in entry.arrays:
+            return None
+        if self._mapped is None:
+            self._mapped = np.memmap(self.path, dtype=np.uint8, mode="r")
+        spec = entry.arrays[variant]
+        return np.ndarray(
+            tuple(spec["shape"]),
+            dtype=np.dtype(spec["dtype"]),
+            buffer=self._mapped,
+            offset=self.data_start + int(spec["offset"]),
+        )
+
+    def read_image(self, path: Path, variant: str = "color") -> Any:
+        entry = self.entry(path)
+        if entry is None or variant not in entry.arrays:
+            return None
+        spec = entry.arrays[variant]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        with self.path.open("rb") as file:
+            file.seek(self.data_start + int(spec["offset"]))
+            data = np.fromfile(file, dtype=dtype, count=count)
+        return data.reshape(tuple(spec["shape"]))
+
+    def variants(self, path: Path) -> list[str]:
+        entry = self.entry(path)
+        return list(entry.arrays) if entry else []
+
+    def close(self) -> None:
+        self._mapped = None
+
+
+def _align(value: int) -> int:
+    return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -6,6 +6,8 @@ import tempfile
 from dataclasses import dataclass
 from pathlib import Path
 
+from adb_protocol import AdbHostClient, AdbProtocolError, AdbServerUnavailable, DeviceTracker
+
 
 @dataclass
 class CommandResult:
@@ -39,6 +41,8 @@ class AdbClient:
         self.adb_path = self.load_adb_path()
         self.aapt_path = self.load_aapt_path()
         self.label_cache = self.load_label_cache()
+        self.host_client = AdbHostClient() if self.read_config().get("adb_native_protocol") else None
+        self.device_tracker = None
 
     def load_adb_path(self):
         configured_path = self.read_config().get("adb_path")
@@ -109,6 +113,14 @@ class AdbClient:
             json.dump(self.label_cache, f, ensure_ascii=False, indent=2)
 
     def run(self, args, timeout=20, check=False):
+        command_result = self.run_native(args, timeout) if self.host_client else None
+        if command_result is None:
+            command_result = self.run_process(args, timeout)
+        if check and command_result.returncode != 0:
+            raise AdbError(command_result.stderr.strip() or "ADB 명령 실행에 실패했습니다.")
+        return command_result
+
+    def run_process(self, args, timeout):
         try:
             result = subprocess.run(
                 [self.adb_path, *args],
@@ -123,15 +135,65 @@ class AdbClient:
         except subprocess.TimeoutExpired as exc:
             raise AdbError("ADB 명령 시간이 초과되었습니다.") from exc
 
-        command_result = CommandResult(result.returncode, result.stdout, result.stderr)
-        if check and result.returncode != 0:
-            raise AdbError(result.stderr.strip() or "ADB 명령 실행에 실패했습니다.")
-        return command_result
+        return CommandResult(result.returncode, result.stdout, result.stderr)
+
+    def run_native(self, args, timeout):
+        # adb.exe 없이 adb 서버(127.0.0.1:5037)에 직접 요청합니다. 지원하지 않는 명령이거나
+        # 서버가 아직 실행 전이거나 연결이 끊기면 None을 돌려주고, adb.exe 실행(서버 자동 시작 포함)으로 넘어갑니다.
+        args = list(args)
+        device_id = None
+        if args[:1] == ["-s"] and len(args) >= 2:
+            device_id, args = args[1], args[2:]
+        if not args:
+            return None
+
+        try:
+            if args == ["devices"]:
+                stdout = "List of devices attached\n" + self.host_client.devices(long=False)
+                return CommandResult(0, stdout, "")
+            if args[0] in ("shell", "logcat"):
+                command = " ".join(args if args[0] == "logcat" else args[1:])
+                exit_code, stdout, stderr = self.host_client.shell(device_id, command, timeout=timeout)
+                return CommandResult(exit_code or 0, self.decode_output(stdout), self.decode_output(stderr))
+            if args[0] == "pull" and len(args) == 3:
+                size = self.host_client.pull(device_id, args[1], Path(args[2]), timeout=timeout)
+                return CommandResult(0, f"{args[1]}: 1 file pulled ({size} bytes)\n", "")
+        except AdbServerUnavailable:
+            return None
+        except AdbProtocolError as exc:
+            return CommandResult(1, "", str(exc))
+        return None
+
+    def decode_output(self, data):
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
 
     def shell(self, device_id, command, timeout=20, check=False):
         return self.run(["-s", device_id, "shell", *command], timeout=timeout, check=check)
 
+    def start_device_watch(self, on_change):
+        # adb 서버의 track-devices 알림으로 디바이스 목록을 메모리에 유지합니다.
+        # 연결/해제 시 on_change(온라인 디바이스 목록)가 백그라운드 스레드에서 호출됩니다.
+        if not self.host_client or self.device_tracker:
+            return False
+        self.device_tracker = DeviceTracker(
+            self.host_client,
+            on_change=lambda table: on_change(self.online_devices(table)),
+        ).start()
+        return True
+
+    def stop_device_watch(self):
+        if self.device_tracker:
+            self.device_tracker.stop()
+            self.device_tracker = None
+
+    def online_devices(self, table):
+        return [serial for serial, entry in table.items() if entry.get("state") == "device"]
+
     def list_devices(self):
+        table = self.device_tracker.table() if self.device_tracker else None
+        if table is not None:
+            return self.online_devices(table)
+
         result = self.run(["devices"], check=True)
         devices = []
         for line in result.stdout.splitlines()[1:]:
@@ -329,6 +391,17 @@ class AdbClient:
         return info
 
     def capture_screenshot(self, device_id, output_path):
+        if self.host_client:
+            try:
+                data = self.host_client.exec_out(device_id, "screencap -p", timeout=20)
+            except AdbServerUnavailable:
+                data = None
+            except AdbProtocolError as exc:
+                raise AdbError(str(exc) or "스크린샷 저장에 실패했습니다.") from exc
+            if data is not None:
+                Path(output_path).write_bytes(data)
+                return
+
         with Path(output_path).open("wb") as f:
             result = subprocess.run(
                 [self.adb_path, "-s", device_id, "exec-out", "screencap", "-p"],
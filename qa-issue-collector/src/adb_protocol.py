@@ -0,0 +1,325 @@
+"""Minimal client for the adb server's host protocol (the socket adb.exe itself talks to).
+
+Talking to the server directly avoids starting an adb.exe process for every command.
+Only the standard library is used, so this file can be copied as-is into other tools
+(qa-issue-collector ships the same file as src/adb_protocol.py, and
+tests/test_host_protocol.py fails when the two copies differ).
+
+Protocol summary: every request is a 4-digit hex length plus the service name, answered
+by `OKAY` or `FAIL` + hex length + message. `host:transport:<serial>` switches the
+socket to a device, after which one device service (`shell:`, `exec:`, `sync:`) runs on
+it until the socket closes.
+"""
+
+import os
+import socket
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+SYNC_CHUNK = 64 * 1024
+
+SHELL_V2_STDOUT = 1
+SHELL_V2_STDERR = 2
+SHELL_V2_EXIT = 3
+
+
+class AdbProtocolError(RuntimeError):
+    """Raised when the adb server answers FAIL or the connection breaks."""
+
+
+class AdbServerUnavailable(AdbProtocolError):
+    """Raised when nothing listens on the adb server port (the server is not started)."""
+
+
+class AdbConnectionLost(AdbServerUnavailable):
+    """Raised when the adb server resets or drops a connection (killed or restarting)."""
+
+
+def parse_device_table(text: str) -> Dict[str, Dict[str, str]]:
+    """Parse `devices -l` lines into {serial: {"state": ..., "model": ..., ...}}."""
+    table: Dict[str, Dict[str, str]] = {}
+    for raw_line in text.splitlines():
+        parts = raw_line.split()
+        if len(parts) < 2 or raw_line.startswith(("*", "List of devices")):
+            continue
+        entry = {"state": parts[1]}
+        for part in parts[2:]:
+            if ":" in part:
+                key, value = part.split(":", 1)
+                entry[key] = value
+        table[parts[0]] = entry
+    return table
+
+
+class AdbHostClient:
+    """Runs adb host services over the local adb server socket."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: Optional[int] = None, timeout: float = 15.0):
+        self.host = host
+        self.port = int(port or os.environ.get("ANDROID_ADB_SERVER_PORT") or DEFAULT_PORT)
+        self.timeout = timeout
+        self._features: Dict[str, set] = {}
+
+    def connect(self, timeout: Optional[float] = None) -> socket.socket:
+        try:
+            connection = socket.create_connection((self.host, self.port), timeout=timeout or self.timeout)
+        except ConnectionRefusedError as exc:
+            raise AdbServerUnavailable(f"adb server is not running on {self.host}:{self.port}") from exc
+        except OSError as exc:
+            raise AdbProtocolError(f"Cannot connect to adb server on {self.host}:{self.port}: {exc}") from exc
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    def host_command(self, service: str, timeout: Optional[float] = None) -> str:
+        """Run a `host:` service that answers with one length-prefixed payload."""
+        with self.connect(timeout) as connection:
+            self._send_request(connection, service)
+            return self._read_length_prefixed(connection).decode("utf-8", errors="replace")
+
+    def devices(self, long: bool = True) -> str:
+        """Return the device list in the same line format as `adb devices [-l]`, without the header."""
+        return self.host_command("host:devices-l" if long else "host:devices")
+
+    def open_device_tracking(self) -> socket.socket:
+        """Start `host:track-devices-l`; read each pushed device list with read_message."""
+        connection = self.connect()
+        try:
+            self._send_request(connection, "host:track-devices-l")
+        except BaseException:
+            connection.close()
+            raise
+        connection.settimeout(None)
+        return connection
+
+    def read_message(self, connection: socket.socket) -> str:
+        return self._read_length_prefixed(connection).decode("utf-8", errors="replace")
+
+    def features(self, serial: Optional[str]) -> set:
+        key = serial or ""
+        if key not in self._features:
+            prefix = f"host-serial:{serial}" if serial else "host"
+            try:
+                text = self.host_command(f"{prefix}:features")
+            except AdbProtocolError:
+                text = ""
+            self._features[key] = {feature for feature in text.strip().split(",") if feature}
+        return self._features[key]
+
+    def open_device_service(self, serial: Optional[str], service: str, timeout: Optional[float] = None) -> socket.socket:
+        """Switch a new connection to the device and start a device service on it."""
+        connection = self.connect(timeout)
+        try:
+            self._send_request(connection, f"host:transport:{serial}" if serial else "host:transport-any")
+            self._send_request(connection, service)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def shell(self, serial: Optional[str], command: str, timeout: Optional[float] = None) -> Tuple[Optional[int], bytes, bytes]:
+        """Run a shell command and return (exit code, stdout, stderr).
+
+        Devices with the `shell_v2` feature report the exit code and keep stderr separate.
+        Older devices return everything as stdout and the exit code is None.
+        """
+        if "shell_v2" not in self.features(serial):
+            with self.open_device_service(serial, f"shell:{command}", timeout) as connection:
+                return None, self._read_to_end(connection), b""
+
+        stdout = bytearray()
+        stderr = bytearray()
+        exit_code: Optional[int] = None
+        with self.open_device_service(serial, f"shell,v2,raw:{command}", timeout) as connection:
+            while True:
+                header = self._read_exact(connection, 5, allow_eof=True)
+                if not header:
+                    break
+                packet_id, length = struct.unpack("<BI", header)
+                payload = self._read_exact(connection, length)
+                if packet_id == SHELL_V2_STDOUT:
+                    stdout += payload
+                elif packet_id == SHELL_V2_STDERR:
+                    stderr += payload
+                elif packet_id == SHELL_V2_EXIT:
+                    exit_code = payload[0] if payload else 0
+                    break
+        return exit_code, bytes(stdout), bytes(stderr)
+
+    def exec_out(self, serial: Optional[str], command: str, timeout: Optional[float] = None) -> bytes:
+        """Run a command with a raw binary stdout, like `adb exec-out`."""
+        with self.open_device_service(serial, f"exec:{command}", timeout) as connection:
+            return self._read_to_end(connection)
+
+    def pull(self, serial: Optional[str], remote_path: str, local_path: Path, timeout: Optional[float] = None) -> int:
+        """Copy a device file to local_path with the sync protocol and return the byte count."""
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = local_path.with_name(local_path.name + ".part")
+        received = 0
+        try:
+            with self.open_device_service(serial, "sync:", timeout) as connection:
+                encoded = remote_path.encode("utf-8")
+                self._send_all(connection, b"RECV" + struct.pack("<I", len(encoded)) + encoded)
+                with temp_path.open("wb") as file:
+                    while True:
+                        header = self._read_exact(connection, 8)
+                        kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+                        if kind == b"DATA":
+                            data = self._read_exact(connection, length)
+                            file.write(data)
+                            received += len(data)
+                        elif kind == b"DONE":
+                            break
+                        elif kind == b"FAIL":
+                            message = self._read_exact(connection, length).decode("utf-8", errors="replace")
+                            raise AdbProtocolError(f"pull {remote_path} failed: {message}")
+                        else:
+                            raise AdbProtocolError(f"Unexpected sync reply {kind!r}")
+                self._send_all(connection, b"QUIT" + struct.pack("<I", 0))
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        os.replace(temp_path, local_path)
+        return received
+
+    def _send_request(self, connection: socket.socket, service: str) -> None:
+        payload = service.encode("utf-8")
+        self._send_all(connection, f"{len(payload):04x}".encode("ascii") + payload)
+        status = self._read_exact(connection, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = self._read_length_prefixed(connection).decode("utf-8", errors="replace")
+            raise AdbProtocolError(message)
+        raise AdbProtocolError(f"Unexpected adb server reply {status!r} to {service}")
+
+    def _send_all(self, connection: socket.socket, data: bytes) -> None:
+        try:
+            connection.sendall(data)
+        except OSError as exc:
+            raise AdbConnectionLost(f"adb server connection failed: {exc}") from exc
+
+    def _read_length_prefixed(self, connection: socket.socket) -> bytes:
+        length = int(self._read_exact(connection, 4).decode("ascii"), 16)
+        return self._read_exact(connection, length)
+
+    def _read_exact(self, connection: socket.socket, size: int, allow_eof: bool = False) -> bytes:
+        chunks = bytearray()
+        while len(chunks) < size:
+            try:
+                chunk = connection.recv(min(SYNC_CHUNK, size - len(chunks)))
+            except socket.timeout as exc:
+                raise AdbProtocolError("adb server connection timed out") from exc
+            except OSError as exc:
+                raise AdbConnectionLost(f"adb server connection failed: {exc}") from exc
+            if not chunk:
+                if allow_eof and not chunks:
+                    return b""
+                raise AdbProtocolError("adb server closed the connection")
+            chunks += chunk
+        return bytes(chunks)
+
+    def _read_to_end(self, connection: socket.socket) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = connection.recv(SYNC_CHUNK)
+            except socket.timeout as exc:
+                raise AdbProtocolError("adb server connection timed out") from exc
+            except OSError as exc:
+                raise AdbConnectionLost(f"adb server connection failed: {exc}") from exc
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+class DeviceTracker:
+    """Keeps an in-memory device table current from the adb server's track-devices pushes.
+
+    The server sends the full list on connect and again on every change, so the table
+    is replaced per message and readers never wait on a command. When the connection
+    drops (for example on an adb server restart) it reconnects every `retry_seconds`.
+    `snapshot()` is None until a list arrives and while disconnected, so callers can
+    fall back to a normal device listing meanwhile. `on_change` is called from the tracker thread.
+    """
+
+    def __init__(
+        self,
+        client: AdbHostClient,
+        on_change: Optional[Callable[[Dict[str, Dict[str, str]]], None]] = None,
+        retry_seconds: float = 1.0,
+    ):
+        self.client = client
+        self.on_change = on_change
+        self.retry_seconds = retry_seconds
+        self._text: Optional[str] = None
+        self._generation = 0
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._connection: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "DeviceTracker":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._track, name="adb-device-tracker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def snapshot(self) -> Optional[Tuple[int, str]]:
+        """Return (generation, device list text), or None before the first update."""
+        with self._condition:
+            return None if self._text is None else (self._generation, self._text)
+
+    def table(self) -> Optional[Dict[str, Dict[str, str]]]:
+        snapshot = self.snapshot()
+        return None if snapshot is None else parse_device_table(snapshot[1])
+
+    def wait_for_change(self, generation: int, timeout: float) -> bool:
+        """Block until the table is newer than generation. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._generation > generation, timeout)
+
+    def _track(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._connection = self.client.open_device_tracking()
+                while not self._stopping.is_set():
+                    self._publish(self.client.read_message(self._connection))
+            except (AdbProtocolError, OSError):
+                pass
+            finally:
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
+            with self._condition:
+                if self._text is not None:
+                    self._text = None
+                    self._generation += 1
+                    self._condition.notify_all()
+            self._stopping.wait(self.retry_seconds)
+
+    def _publish(self, text: str) -> None:
+        with self._condition:
+            if text == self._text:
+                return
+            self._text = text
+            self._generation += 1
+            self._condition.notify_all()
+        if self.on_change is not None:
+            self.on_change(parse_device_table(text))
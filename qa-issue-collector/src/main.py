@@ -53,6 +53,7 @@ class QaIssueCollectorApp:
 
         self.configure_styles()
         self.build_ui()
+        self.adb.start_device_watch(lambda devices: self.ui_queue.put(("devices_changed", devices)))
         self.root.after(100, self.process_ui_queue)
 
     def configure_styles(self):
@@ -325,6 +326,18 @@ class QaIssueCollectorApp:
         self.selected_device.set(devices[0] if devices else "")
         self.log_status(f"디바이스 {len(devices)}개를 찾았습니다." if devices else "연결된 디바이스가 없습니다.")
 
+    def apply_devices(self, devices):
+        previous = list(self.device_combo["values"])
+        self.device_combo["values"] = devices
+        if self.selected_device.get() not in devices:
+            self.selected_device.set(devices[0] if devices else "")
+        for device_id in devices:
+            if device_id not in previous:
+                self.log_status(f"디바이스 연결됨: {device_id}")
+        for device_id in previous:
+            if device_id not in devices:
+                self.log_status(f"디바이스 연결 해제됨: {device_id}")
+
     def load_packages(self):
         device_id = self.require_device()
         if not device_id:
@@ -748,6 +761,8 @@ class QaIssueCollectorApp:
             event = item[0]
             if event == "status":
                 self.log_status(item[1])
+            elif event == "devices_changed":
+                self.apply_devices(item[1])
             elif event == "error":
                 self.set_collect_buttons_state("normal")
                 self.set_package_buttons_state("normal")